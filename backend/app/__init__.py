@@ -2,7 +2,16 @@
 Market Mind backend package.
 """
 
-# Re-export FastAPI app for ASGI servers.
-from app.main import app
+from typing import Any
 
 __all__ = ["app"]
+
+
+def __getattr__(name: str) -> Any:
+    # Re-export FastAPI app for ASGI servers, imported on first access so scripts
+    # and tests that only need part of the package do not load the whole app.
+    if name == "app":
+        from app.main import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,36 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.config import get_settings
-from app.core.rate_limiter import RateLimiter
-from app.db import SessionLocal
+from app.core.config import Settings, get_settings
+from app.core.rate_limiter import (
+    GcraRateLimitBackend,
+    RateLimitBackend,
+    RateLimiter,
+    SqlRateLimitBackend,
+)
+from app.db import AsyncSessionLocal, SessionLocal, async_engine
 
 settings = get_settings()
-rate_limiter = RateLimiter(
-    hourly_limit=settings.hourly_request_limit,
-    daily_limit=settings.daily_request_limit,
-)
+
+
+def build_rate_limiter(settings: Settings) -> RateLimiter:
+    backend: RateLimitBackend
+    if settings.rate_limit_backend == "database":
+        backend = SqlRateLimitBackend(async_engine)
+    else:
+        backend = GcraRateLimitBackend(
+            shards=settings.rate_limit_shards, max_keys=settings.rate_limit_max_keys
+        )
+    return RateLimiter(
+        hourly_limit=settings.hourly_request_limit,
+        daily_limit=settings.daily_request_limit,
+        backend=backend,
+    )
+
+
+rate_limiter = build_rate_limiter(settings)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -21,5 +41,10 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_rate_limiter() -> RateLimiter:
     return rate_limiter
@@ -1,69 +1,215 @@
 from __future__ import annotations
 
-from typing import Annotated
+import json
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_rate_limiter
+from app.api.deps import get_async_db, get_rate_limiter
 from app.core.config import get_settings
-from app.core.rate_limiter import RateLimiter
+from app.core.pagination import Cursor, InvalidCursorError
+from app.core.rate_limiter import RateLimiter, RateLimitResult
+from app.models import Message
 from app.repositories import ChatRepository
 from app.schemas import (
     ChatResponse,
     ChatSessionCreate,
     ChatSessionDetail,
+    ChatSessionPage,
     ChatSessionResponse,
     MessageCreate,
+    MessagePage,
     MessageResponse,
 )
-from app.services import AgentService
+from app.services import AgentResponse, aget_agent_service, get_agent_service
+from app.services.context_blobs import CONTEXT_FIELDS, decode_context, encode_context
+from app.services.conversation import (
+    TITLE_HISTORY_MESSAGES,
+    build_history_text,
+    format_messages,
+    generate_chat_title,
+    refresh_chat_summary,
+)
+from app.services.title_scheduler import TitleScheduler, should_refresh_title
 
 router = APIRouter(prefix="/chats")
 
+# Assistant message context a client can ask to have included with ``expand``.
+ContextField = Literal["search_results", "vector_context"]
+ExpandQuery = Annotated[
+    list[ContextField],
+    Query(description="Context fields to include in assistant message metadata."),
+]
+
 settings = get_settings()
-agent_service = AgentService(settings=settings)
 
 
-@router.get("", response_model=list[ChatSessionResponse])
-def list_chats(db: Session = Depends(get_db)) -> list[ChatSessionResponse]:
-    print("Listing chat sessions")
+async def _generate_title(chat_id: str) -> None:
+    await generate_chat_title(await aget_agent_service(), chat_id)
+
+
+title_scheduler = TitleScheduler(
+    _generate_title,
+    debounce_seconds=settings.title_debounce_seconds,
+    max_concurrency=settings.title_max_concurrency,
+    is_busy=lambda: get_agent_service().llm_limiter.waiting > 0,
+)
+
+
+def _page_limit(limit: int | None) -> int:
+    return min(limit or settings.page_default_limit, settings.page_max_limit)
+
+
+def _decode_cursor(cursor: str | None) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+
+
+@router.get("", response_model=ChatSessionPage)
+async def list_chats(
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> ChatSessionPage:
+    """List chats newest-first, one keyset page at a time."""
     repo = ChatRepository(db)
-    return [ChatSessionResponse.model_validate(chat) for chat in repo.list_sessions()]
+    chats, next_cursor = await repo.list_sessions_page(
+        _page_limit(limit), after=_decode_cursor(cursor)
+    )
+    return ChatSessionPage(
+        items=[ChatSessionResponse.model_validate(chat) for chat in chats],
+        next_cursor=next_cursor.encode() if next_cursor else None,
+    )
 
 
 @router.post(
     "", response_model=ChatSessionResponse, status_code=status.HTTP_201_CREATED
 )
-def create_chat(
+async def create_chat(
     payload: ChatSessionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ChatSessionResponse:
     repo = ChatRepository(db)
-    chat = repo.create_session(title=payload.title)
+    chat = await repo.create_session(title=payload.title)
     return ChatSessionResponse.model_validate(chat)
 
 
+def _with_context(message: Message, context: dict[str, Any]) -> MessageResponse:
+    response = MessageResponse.model_validate(message)
+    if not context:
+        return response
+    return response.model_copy(update={"metadata": {**(response.metadata or {}), **context}})
+
+
+async def _message_responses(
+    repo: ChatRepository, messages: Sequence[Message], expand: Sequence[ContextField]
+) -> list[MessageResponse]:
+    """Serialize messages, including only the context fields named in ``expand``.
+
+    Context is stored once per distinct value in context_blobs; the blobs for the
+    whole list are loaded in one query.
+    """
+    columns = {field: CONTEXT_FIELDS[field] for field in expand}
+    blobs = await repo.load_context_blobs(
+        hash_
+        for message in messages
+        for column in columns.values()
+        if (hash_ := getattr(message, column))
+    )
+    responses = []
+    for message in messages:
+        context = {}
+        for field, column in columns.items():
+            blob = blobs.get(getattr(message, column) or "")
+            if blob is not None:
+                context[field] = decode_context(blob)
+        responses.append(_with_context(message, context))
+    return responses
+
+
 @router.get("/{chat_id}", response_model=ChatSessionDetail)
-def get_chat(chat_id: str, db: Session = Depends(get_db)) -> ChatSessionDetail:
+async def get_chat(
+    chat_id: str,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    expand: ExpandQuery = [],
+    db: AsyncSession = Depends(get_async_db),
+) -> ChatSessionDetail:
+    """A chat with its latest ``limit`` messages, oldest first.
+
+    ``older_messages_cursor`` continues backwards through
+    ``GET /chats/{chat_id}/messages?order=desc``.
+    """
     repo = ChatRepository(db)
-    chat = repo.get_session(chat_id)
+    chat = await repo.get_session(chat_id)
     if not chat:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found."
         )
+    messages, older = await repo.list_messages_page(chat_id, _page_limit(limit), order="desc")
+    messages.reverse()
     return ChatSessionDetail(
         **ChatSessionResponse.model_validate(chat).model_dump(),
-        messages=[
-            MessageResponse.model_validate(m) for m in repo.list_messages(chat_id)
-        ],
+        messages=await _message_responses(repo, messages, expand),
+        older_messages_cursor=older.encode() if older else None,
+    )
+
+
+@router.get("/{chat_id}/messages", response_model=MessagePage)
+async def list_chat_messages(
+    chat_id: str,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    cursor: str | None = None,
+    order: Literal["asc", "desc"] = "asc",
+    include_metadata: bool = True,
+    expand: ExpandQuery = [],
+    db: AsyncSession = Depends(get_async_db),
+) -> MessagePage:
+    """Page through a chat's messages; ``order=desc`` starts from the latest."""
+    repo = ChatRepository(db)
+    if not await repo.get_session(chat_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found."
+        )
+    messages, next_cursor = await repo.list_messages_page(
+        chat_id, _page_limit(limit), after=_decode_cursor(cursor), order=order
+    )
+    if include_metadata:
+        items = await _message_responses(repo, messages, expand)
+    else:
+        items = [
+            MessageResponse.model_validate(m).model_copy(update={"metadata": None})
+            for m in messages
+        ]
+    return MessagePage(
+        items=items,
+        next_cursor=next_cursor.encode() if next_cursor else None,
     )
 
 
 @router.delete("/{chat_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_chat(chat_id: str, db: Session = Depends(get_db)) -> Response:
+async def delete_chat(
+    chat_id: str, db: AsyncSession = Depends(get_async_db)
+) -> Response:
     repo = ChatRepository(db)
-    deleted = repo.delete_session(chat_id)
+    deleted = await repo.delete_session(chat_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found."
@@ -72,28 +218,29 @@ def delete_chat(chat_id: str, db: Session = Depends(get_db)) -> Response:
 
 
 @router.post("/{chat_id}/title", response_model=ChatSessionResponse)
-def refresh_chat_title(
-    chat_id: str, db: Session = Depends(get_db)
+async def refresh_chat_title(
+    chat_id: str, db: AsyncSession = Depends(get_async_db)
 ) -> ChatSessionResponse:
     repo = ChatRepository(db)
-    chat = repo.get_session(chat_id)
+    chat = await repo.get_session(chat_id)
     if not chat:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found."
         )
 
-    messages = repo.list_messages(chat_id)
-    if not messages:
+    recent_messages = await repo.list_recent_messages(
+        chat_id, limit=TITLE_HISTORY_MESSAGES
+    )
+    if not recent_messages:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot generate a title without conversation history.",
         )
 
-    recent_messages = list(messages)[-12:]
-    history_text = "\n".join(f"{msg.role}: {msg.content}" for msg in recent_messages)
-    title = agent_service.suggest_title(history_text)
+    agent_service = await aget_agent_service()
+    title = await agent_service.suggest_title(format_messages(recent_messages))
 
-    updated = repo.update_session_title(chat_id, title)
+    updated = await repo.update_session_title(chat_id, title)
     if not updated:  # pragma: no cover - defensive
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -102,51 +249,200 @@ def refresh_chat_title(
     return ChatSessionResponse.model_validate(updated)
 
 
-@router.post("/{chat_id}/messages", response_model=ChatResponse)
-def post_message(
+async def _start_turn(
+    repo: ChatRepository,
     chat_id: str,
-    payload: MessageCreate,
-    db: Session = Depends(get_db),
-    limiter: RateLimiter = Depends(get_rate_limiter),
-    user_id: Annotated[str | None, Header(alias="X-User-Id")] = None,
-) -> ChatResponse:
-    repo = ChatRepository(db)
-    chat = repo.get_session(chat_id)
+    content: str,
+    limiter: RateLimiter,
+    identifier: str,
+) -> tuple[Message, str, RateLimitResult, int]:
+    """Validate the chat, build the prompt history and the pending user message.
+
+    The user's message is only stored with its answer (see ``_record_answer``).
+    Also returns how many messages the chat will hold once the turn is answered.
+    """
+    chat = await repo.get_session(chat_id)
     if not chat:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found."
         )
 
-    identifier = user_id or chat_id
-    limiter.check(identifier)
+    # Shed load before doing any more work when the LLM queue is already full.
+    agent_service = await aget_agent_service()
+    agent_service.llm_limiter.admission_check()
+    limit = await limiter.acheck(identifier)
+
+    # Everything the summary does not cover yet. Folding keeps this to roughly the
+    # window plus one summary batch; the new question is passed separately.
+    unsummarized = chat.message_count - (chat.summarized_message_count or 0)
+    recent_messages = (
+        await repo.list_recent_messages(chat_id, limit=unsummarized)
+        if unsummarized > 0
+        else []
+    )
+    history_text = build_history_text(chat, recent_messages)
+    answered_count = chat.message_count + 2
+    await repo.release()
+
+    user_message = repo.pending_message(chat_id, "user", content)
+    return user_message, history_text, limit, answered_count
 
-    user_message = repo.add_message(
-        chat_id=chat_id, role="user", content=payload.content
+
+async def _record_answer(
+    repo: ChatRepository,
+    chat_id: str,
+    identifier: str,
+    user_message: Message,
+    agent_result: AgentResponse,
+) -> tuple[Message, Message]:
+    """Store the turn in one transaction and index it into vector memory.
+
+    Both messages are only written here, once the turn has been answered, so a
+    rejected turn leaves nothing behind in the database or in memory. Returns the
+    stored user and assistant messages.
+    """
+    context = {
+        field: encode_context(getattr(agent_result, field), settings.context_blob_compression)
+        for field in CONTEXT_FIELDS
+    }
+    ai_message = repo.pending_message(
+        chat_id,
+        "assistant",
+        agent_result.answer,
+        metadata={"answer_cache": agent_result.answer_cache or {"hit": False}},
+        context=context,
+    )
+    user_message, ai_message = await repo.record_turn(
+        user_message, ai_message, context.values()
+    )
+    agent_service = await aget_agent_service()
+    await agent_service.persist_memory(
+        chat_id, "user", user_message.content, user_id=identifier
+    )
+    await agent_service.persist_memory(
+        chat_id, "assistant", agent_result.answer, user_id=identifier
     )
-    agent_service.persist_memory(chat_id, "user", payload.content)
+    return user_message, ai_message
+
+
+def _schedule_summary_refresh(background_tasks: BackgroundTasks, chat_id: str) -> None:
+    background_tasks.add_task(
+        refresh_chat_summary,
+        get_agent_service(),
+        chat_id,
+        window=settings.history_window_messages,
+        batch_size=settings.history_summary_batch_messages,
+    )
+
+
+def _schedule_title_refresh(chat_id: str, message_count: int) -> None:
+    if settings.title_auto_generate and should_refresh_title(
+        message_count, settings.title_refresh_every_messages
+    ):
+        title_scheduler.schedule(chat_id)
 
-    history_messages = repo.list_messages(chat_id)
-    history_text = "\n".join(f"{msg.role}: {msg.content}" for msg in history_messages)
 
-    agent_result = agent_service.generate_response(
+def _format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/{chat_id}/messages", response_model=ChatResponse)
+async def post_message(
+    chat_id: str,
+    payload: MessageCreate,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    expand: ExpandQuery = [],
+    db: AsyncSession = Depends(get_async_db),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+    user_id: Annotated[str | None, Header(alias="X-User-Id")] = None,
+) -> ChatResponse:
+    repo = ChatRepository(db)
+    identifier = user_id or chat_id
+    user_message, history_text, limit, message_count = await _start_turn(
+        repo, chat_id, payload.content, limiter, identifier
+    )
+    response.headers.update(limit.headers())
+
+    # A timeout in the LLM queue raises LLMOverloadedError (a 503) before anything
+    # of the turn has been stored.
+    agent_service = await aget_agent_service()
+    agent_result = await agent_service.generate_response(
         chat_id=chat_id,
         user_id=identifier,
         history=history_text,
         prompt=payload.content,
     )
-
-    ai_message = repo.add_message(
-        chat_id=chat_id,
-        role="assistant",
-        content=agent_result.answer,
-        metadata={
-            "search_results": agent_result.search_results,
-            "vector_context": agent_result.vector_context,
-        },
+    user_message, ai_message = await _record_answer(
+        repo, chat_id, identifier, user_message, agent_result
     )
-    agent_service.persist_memory(chat_id, "assistant", agent_result.answer)
+    _schedule_summary_refresh(background_tasks, chat_id)
+    _schedule_title_refresh(chat_id, message_count)
 
     return ChatResponse(
         message=MessageResponse.model_validate(user_message),
-        ai_response=MessageResponse.model_validate(ai_message),
+        ai_response=_with_context(
+            ai_message, {field: getattr(agent_result, field) for field in expand}
+        ),
+    )
+
+
+@router.post("/{chat_id}/messages/stream")
+async def stream_message(
+    chat_id: str,
+    payload: MessageCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+    user_id: Annotated[str | None, Header(alias="X-User-Id")] = None,
+) -> StreamingResponse:
+    """Stream search/memory progress and answer tokens as Server-Sent Events."""
+    repo = ChatRepository(db)
+    identifier = user_id or chat_id
+    user_message, history_text, limit, message_count = await _start_turn(
+        repo, chat_id, payload.content, limiter, identifier
+    )
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield _format_sse(
+            "message", MessageResponse.model_validate(user_message).model_dump(mode="json")
+        )
+
+        agent_result: AgentResponse | None = None
+        agent_service = await aget_agent_service()
+        async for event in agent_service.stream_response(
+            chat_id=chat_id,
+            user_id=identifier,
+            history=history_text,
+            prompt=payload.content,
+        ):
+            if event.response is not None:
+                agent_result = event.response
+                continue
+            yield _format_sse(event.event, event.data)
+
+        if agent_result is None:
+            # Rejected by the LLM queue; the error event has already been sent and
+            # nothing of the turn was stored.
+            return
+        stored_message, ai_message = await _record_answer(
+            repo, chat_id, identifier, user_message, agent_result
+        )
+        _schedule_title_refresh(chat_id, message_count)
+        done = ChatResponse(
+            message=MessageResponse.model_validate(stored_message),
+            ai_response=MessageResponse.model_validate(ai_message),
+        )
+        yield _format_sse("done", done.model_dump(mode="json"))
+
+    # Runs once the stream has finished and the assistant message is stored.
+    _schedule_summary_refresh(background_tasks, chat_id)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            **limit.headers(),
+        },
     )
@@ -1,7 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response, status
 
+from app.api.routes import chats
 from app.core.config import get_settings
-from app.schemas import HealthResponse
+from app.services import get_agent_service
+from app.services.embedding_cache import CachedEmbeddings
+from app.schemas import (
+    AgentStatsResponse,
+    AnswerCacheStatsResponse,
+    EmbeddingCacheStatsResponse,
+    HealthResponse,
+    LLMLimiterStatsResponse,
+    MarketSnapshotStatsResponse,
+    MemoryIndexerStatsResponse,
+    ReadinessResponse,
+    SearchCacheStatsResponse,
+    SearchProviderStatsResponse,
+    TitleSchedulerStatsResponse,
+    VectorMemoryStatsResponse,
+)
 
 router = APIRouter()
 
@@ -10,3 +26,65 @@ router = APIRouter()
 def read_health() -> HealthResponse:
     settings = get_settings()
     return HealthResponse(environment=settings.environment)
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}},
+)
+def read_readiness(request: Request, response: Response) -> ReadinessResponse:
+    """Readiness probe: 503 until the agent has been built and warmed up.
+
+    ``/health`` stays a liveness check and answers as soon as the app is serving.
+    """
+    readiness = getattr(request.app.state, "readiness", None) or ReadinessResponse(
+        status="starting"
+    )
+    if readiness.status != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
+
+
+@router.get("/health/agent", response_model=AgentStatsResponse)
+def read_agent_stats() -> AgentStatsResponse:
+    agent_service = get_agent_service()
+    embeddings = agent_service.embeddings
+    return AgentStatsResponse(
+        search_cache=SearchCacheStatsResponse.model_validate(
+            agent_service.search_cache.stats()
+        ),
+        search_providers=[
+            SearchProviderStatsResponse.model_validate(stats)
+            for stats in agent_service.market_search.stats()
+        ],
+        memory_indexer=MemoryIndexerStatsResponse.model_validate(
+            agent_service.memory_indexer.stats()
+        ),
+        vector_memory=(
+            VectorMemoryStatsResponse.model_validate(agent_service.memory.stats())
+            if agent_service.memory
+            else None
+        ),
+        llm_limiter=LLMLimiterStatsResponse.model_validate(
+            agent_service.llm_limiter.stats()
+        ),
+        embedding_cache=(
+            EmbeddingCacheStatsResponse.model_validate(embeddings.stats())
+            if isinstance(embeddings, CachedEmbeddings)
+            else None
+        ),
+        answer_cache=(
+            AnswerCacheStatsResponse.model_validate(agent_service.answer_cache.stats())
+            if agent_service.answer_cache
+            else None
+        ),
+        market_snapshots=(
+            MarketSnapshotStatsResponse.model_validate(agent_service.market_snapshots.stats())
+            if agent_service.market_snapshots
+            else None
+        ),
+        title_scheduler=TitleSchedulerStatsResponse.model_validate(
+            chats.title_scheduler.stats()
+        ),
+    )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.metrics import LLM_CALLS_ACTIVE, LLM_CALLS_WAITING, MEMORY_INDEX_QUEUE_DEPTH
+from app.services import agent_service_built, get_agent_service
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics() -> Response:
+    """Prometheus exposition of the process's metrics."""
+    # Queue state lives on the services; sample it at scrape time. Scrapes during
+    # startup must not build the agent themselves.
+    if agent_service_built():
+        agent_service = get_agent_service()
+        LLM_CALLS_ACTIVE.set(agent_service.llm_limiter.active)
+        LLM_CALLS_WAITING.set(agent_service.llm_limiter.waiting)
+        MEMORY_INDEX_QUEUE_DEPTH.set(agent_service.memory_indexer.queue_depth)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
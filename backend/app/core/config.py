@@ -31,14 +31,132 @@ class Settings(BaseSettings):
     database_url: str = f"sqlite:///{_default_db_path.as_posix()}"
     chroma_persist_directory: Path = _ROOT_DIR / "data" / "chroma"
 
+    page_default_limit: int = 20
+    page_max_limit: int = 100
+
+    history_window_messages: int = 8
+    history_summary_batch_messages: int = 4
+
+    # Background chat titles: made after the first exchange and then every
+    # ``title_refresh_every_messages`` messages (0 disables the refresh), once the
+    # chat has been quiet for ``title_debounce_seconds``.
+    title_auto_generate: bool = True
+    title_debounce_seconds: float = 5.0
+    title_refresh_every_messages: int = 10
+    title_max_concurrency: int = 1
+
+    # Assistant message context (search results, vector memory) is stored once per
+    # distinct value in context_blobs, zlib-compressed when that makes it smaller.
+    context_blob_compression: bool = True
+
+    memory_index_batch_size: int = 32
+    memory_index_flush_seconds: float = 1.0
+    memory_index_max_queue: int = 5000
+
+    embedding_model: str = "text-embedding-3-small"
+    embedding_cache_max_entries: int = 10000
+    embedding_cache_on_disk: bool = True
+
+    # Vector memory retrieval: which messages are eligible, how many to return and
+    # how. The score threshold applies to plain similarity search, not MMR.
+    # The scope defaults to "chat": only the current chat's messages are recalled.
+    # Before it existed every chat's messages were searched; set "global" for that,
+    # or "user" for every chat of the same user.
+    memory_scope: Literal["chat", "user", "global"] = "chat"
+    memory_top_k: int = 4
+    memory_use_mmr: bool = False
+    memory_mmr_fetch_k: int = 20
+    memory_mmr_lambda: float = 0.5
+    memory_score_threshold: float | None = None
+    # Vector memory writes. Messages are keyed by a hash of their chat, role and
+    # text, so indexing one again only refreshes it. A new message at least this
+    # cosine-similar to a stored one from the same chat and role is skipped
+    # (None disables the check). Memories older than the TTL are left out of
+    # retrieval and swept (None keeps them); compact_memory rewrites the collection.
+    memory_near_duplicate_threshold: float | None = None
+    memory_ttl_seconds: float | None = None
+    # HNSW index parameters, applied when the Chroma collection is created.
+    chroma_hnsw_space: Literal["l2", "cosine", "ip"] = "l2"
+    chroma_hnsw_ef_construction: int | None = None
+    chroma_hnsw_ef_search: int | None = None
+    chroma_hnsw_max_neighbors: int | None = None
+
+    # Semantic answer cache: reuse a recent answer when a new question embeds within
+    # the cosine similarity threshold. Keep the TTL short; market data moves.
+    answer_cache_enabled: bool = True
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl_seconds: float = 300.0
+
+    # Concurrent OpenAI chat calls per process, and how many more may wait (and
+    # for how long) before requests are turned away with a 503.
+    llm_max_concurrency: int = 8
+    llm_max_queue: int = 32
+    llm_queue_timeout_seconds: float = 20.0
+
+    # Token budget for the question, search results, history and vector memory in
+    # the answer prompt. Sections are filled in that order, each up to its cap.
+    prompt_token_budget: int = 6000
+    prompt_search_max_tokens: int = 1500
+    prompt_history_max_tokens: int = 3000
+    prompt_memory_max_tokens: int = 1000
+
     duckduckgo_region: str = "wt-wt"
+    # Market search providers in priority order ("duckduckgo", "duckduckgo_news").
+    # "parallel" queries all at once; "hedged" starts the next provider when the
+    # current one fails or is slower than the hedge delay. Results arriving within
+    # the merge window of the first answer are merged and de-duplicated. A provider
+    # failing repeatedly is skipped until its circuit breaker resets.
+    search_providers: list[str] = ["duckduckgo", "duckduckgo_news"]
+    search_strategy: Literal["parallel", "hedged"] = "hedged"
+    search_max_results: int = 3
+    search_provider_timeout_seconds: float = 5.0
+    search_hedge_delay_seconds: float = 1.0
+    search_merge_window_seconds: float = 0.2
+    search_breaker_failure_threshold: int = 3
+    search_breaker_reset_seconds: float = 30.0
+    search_timeout_seconds: float = 8.0
+    # Watchlist topics kept in market_snapshots by the snapshot ingester, as
+    # "query|alias|alias". A question mentioning a topic (or several) is answered
+    # from their snapshots while all are younger than the max age; otherwise it is
+    # searched live. An empty watchlist turns snapshot lookups off.
+    market_watchlist: list[str] = [
+        "bitcoin|BTC",
+        "ethereum|ETH|ether",
+        "S&P 500|SPX|S&P",
+        "Nasdaq|Nasdaq 100|NDX",
+        "Dow Jones|DJIA",
+        "Federal Reserve interest rates|Fed|FOMC",
+        "oil prices|crude oil|WTI|Brent",
+        "gold price|gold",
+    ]
+    market_snapshot_max_age_seconds: float = 900.0
+    search_cache_ttl_seconds: float = 120.0
+    search_cache_max_entries: int = 1024
+    memory_timeout_seconds: float = 3.0
 
     langfuse_public_key: str = "changeme"
     langfuse_secret_key: str = "changeme"
     langfuse_host: str = "https://cloud.langfuse.com"
 
+    # Load testing: replace OpenAI and DuckDuckGo with offline fakes. Latencies are
+    # distributions in seconds: "fixed:0.2", "uniform:low,high", "normal:mean,sd"
+    # or "lognormal:median,sigma". The token delay paces streamed answers.
+    fake_services: bool = False
+    fake_llm_latency: str = "lognormal:0.8,0.4"
+    fake_llm_token_delay_seconds: float = 0.02
+    fake_embedding_latency: str = "lognormal:0.05,0.3"
+    fake_search_latency: str = "lognormal:0.6,0.5"
+    fake_search_failure_rate: float = 0.0
+    fake_seed: int | None = None
+
     hourly_request_limit: int = 60
     daily_request_limit: int = 500
+    # "memory" counts per process; "database" shares sliding-window counters in
+    # DATABASE_URL so limits hold across replicas and workers.
+    rate_limit_backend: Literal["memory", "database"] = "memory"
+    # In-process limiter sizing: lock shards and the most users tracked at once.
+    rate_limit_shards: int = 64
+    rate_limit_max_keys: int = 100000
 
     model_config = SettingsConfigDict(
         env_file=_env_files,
@@ -50,6 +168,12 @@ class Settings(BaseSettings):
     def chroma_persist_path(self) -> Path:
         return Path(self.chroma_persist_directory).resolve()
 
+    @property
+    def embedding_cache_path(self) -> Path:
+        """On-disk embedding cache, stored next to the Chroma directory."""
+        chroma_path = self.chroma_persist_path
+        return chroma_path.with_name(f"{chroma_path.name}-embedding-cache.sqlite3")
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
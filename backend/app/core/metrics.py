@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Bucket edges for work ranging from in-process lookups to LLM calls.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "market_mind_http_requests_in_flight",
+    "HTTP requests currently being served, including open streams.",
+    ["method"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "market_mind_http_request_duration_seconds",
+    "Time from request start until the last response byte was sent.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_ERRORS = Counter(
+    "market_mind_http_request_errors_total",
+    "HTTP requests that ended in a 5xx response or an unhandled exception.",
+    ["method", "route"],
+)
+STAGE_DURATION = Histogram(
+    "market_mind_stage_duration_seconds",
+    "Latency of pipeline stages: graph nodes, embeddings, Chroma and rate limiting.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "market_mind_stage_errors_total",
+    "Pipeline stage calls that raised.",
+    ["stage"],
+)
+REPOSITORY_DURATION = Histogram(
+    "market_mind_repository_duration_seconds",
+    "Latency of ChatRepository methods.",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_CALLS_ACTIVE = Gauge(
+    "market_mind_llm_calls_active", "LLM calls currently holding a concurrency slot."
+)
+LLM_CALLS_WAITING = Gauge(
+    "market_mind_llm_calls_waiting", "LLM calls queued for a concurrency slot."
+)
+MEMORY_INDEX_QUEUE_DEPTH = Gauge(
+    "market_mind_memory_index_queue_depth", "Messages waiting to be embedded and indexed."
+)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Time a block under ``stage``, counting it as an error if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_DURATION.labels(stage).observe(time.perf_counter() - started)
+
+
+def timed_stage(stage: str) -> Callable[[F], F]:
+    """Decorator form of ``observe_stage`` for coroutine functions."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with observe_stage(stage):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_repository(cls: type) -> type:
+    """Record the latency of every public coroutine method of a repository class."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(attr):
+            continue
+
+        def wrap(func: Callable[..., Any], method: str) -> Callable[..., Any]:
+            histogram = REPOSITORY_DURATION.labels(method)
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+
+            return wrapper
+
+        setattr(cls, name, wrap(attr, name))
+    return cls
+
+
+def _route_template(scope: Scope) -> str:
+    """The matched route's full path template, e.g. ``/api/chats/{chat_id}``.
+
+    Routes of an included router report their path without the router prefix,
+    so the prefix is taken from the leading segments of the concrete path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    if ":path}" in template:
+        return template
+    segments = scope["path"].rstrip("/").split("/")
+    depth = len([segment for segment in template.split("/") if segment])
+    return "/".join(segments[: len(segments) - depth]) + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests, latency and 5xx errors.
+
+    Latency runs until the final body chunk is sent, so streamed responses are
+    measured in full. Routes are labelled by their path template, not the raw
+    path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            path = _route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, path, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            if status_code >= 500:
+                HTTP_REQUEST_ERRORS.labels(method, path).inc()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Keyset position: the sort timestamp and id of the last row on a page.
+
+    Cursors are opaque to clients; they are URL-safe base64 encoded JSON.
+    """
+
+    timestamp: datetime
+    id: str
+
+    def encode(self) -> str:
+        payload = json.dumps({"ts": self.timestamp.isoformat(), "id": self.id})
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> Cursor:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            return cls(timestamp=datetime.fromisoformat(payload["ts"]), id=str(payload["id"]))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+            raise InvalidCursorError("Invalid pagination cursor.") from exc
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import math
 import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from dataclasses import dataclass
 
-from cachetools import TTLCache
 from fastapi import HTTPException, status
+from sqlalchemy import case, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import observe_stage
+from app.models import RateLimitCounter
 
 
 @dataclass
@@ -12,33 +21,247 @@ class RateLimitResult:
     remaining_hourly: int
     remaining_daily: int
 
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Remaining-Hourly": str(self.remaining_hourly),
+            "X-RateLimit-Remaining-Daily": str(self.remaining_daily),
+        }
+
+
+@dataclass(frozen=True)
+class RateWindow:
+    limit: int
+    seconds: int
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of counting one request: remaining allowance per window and, when
+    rejected, how many seconds until the next request would be accepted."""
+
+    allowed: bool
+    remaining: list[int]
+    retry_after: float = 0.0
+
+
+class RateLimitBackend(ABC):
+    """Storage for request counters.
+
+    ``acquire`` counts one request against every window. Rejected requests are
+    not counted.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, windows: Sequence[RateWindow]) -> RateLimitDecision:
+        ...
+
+
+class _Shard:
+    __slots__ = ("lock", "entries")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # Theoretical arrival time per window, keyed by user.
+        self.entries: dict[str, list[float]] = {}
+
+
+class GcraRateLimitBackend(RateLimitBackend):
+    """Per-process GCRA limiter, lock-sharded by key hash.
+
+    Each user costs one small list of theoretical arrival times (one per window);
+    a window with ``limit`` requests per ``seconds`` emits one request every
+    ``seconds / limit`` and tolerates a burst of the full limit. Requests for
+    different users only contend when their keys hash to the same shard.
+    Entries expire once every TAT has passed, and each shard holds at most
+    ``max_keys / shards`` users.
+    """
+
+    def __init__(self, shards: int = 64, max_keys: int = 100_000) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._shard_capacity = max(1, max_keys // len(self._shards))
+
+    def acquire_sync(self, key: str, windows: Sequence[RateWindow]) -> RateLimitDecision:
+        now = time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            stored = shard.entries.get(key)
+            new_tats: list[float] = []
+            remaining: list[int] = []
+            retry_after = 0.0
+            for index, window in enumerate(windows):
+                interval = window.seconds / window.limit if window.limit > 0 else math.inf
+                tat = max(stored[index], now) if stored else now
+                new_tat = tat + interval
+                # Allowed while the backlog stays within one window length.
+                excess = new_tat - now - window.seconds
+                if excess > 1e-9:
+                    retry_after = max(retry_after, excess)
+                    remaining.append(0)
+                    continue
+                new_tats.append(new_tat)
+                # Round first: float drift in the TAT would otherwise floor 2.9999.. to 2.
+                remaining.append(math.floor(round((window.seconds - (new_tat - now)) / interval, 6)))
+            if retry_after:
+                return RateLimitDecision(False, remaining, retry_after)
+            if stored is None and len(shard.entries) >= self._shard_capacity:
+                self._evict(shard, now)
+            shard.entries[key] = new_tats
+        return RateLimitDecision(True, remaining)
+
+    def _evict(self, shard: _Shard, now: float) -> None:
+        expired = [key for key, tats in shard.entries.items() if max(tats) <= now]
+        for key in expired:
+            del shard.entries[key]
+        if len(shard.entries) >= self._shard_capacity:
+            # Drop the user closest to a full allowance; forgetting them costs least.
+            del shard.entries[min(shard.entries, key=lambda k: max(shard.entries[k]))]
+
+    async def acquire(self, key: str, windows: Sequence[RateWindow]) -> RateLimitDecision:
+        return self.acquire_sync(key, windows)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+class SqlRateLimitBackend(RateLimitBackend):
+    """Sliding-window counters in the application database, shared by all replicas.
+
+    Each window keeps the count of the current and previous fixed window; the
+    previous one is weighted by how much of it still overlaps the sliding window.
+    All windows are incremented with a single ``INSERT .. ON CONFLICT .. RETURNING``
+    statement, so the database serialises concurrent requests per key.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    def _insert(self):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(RateLimitCounter)
+        if dialect == "sqlite":
+            return sqlite.insert(RateLimitCounter)
+        raise RuntimeError(f"Rate limiting is not supported on {dialect!r} databases.")
+
+    async def acquire(self, key: str, windows: Sequence[RateWindow]) -> RateLimitDecision:
+        now = time.time()
+        starts = {w.seconds: int(now // w.seconds) * w.seconds for w in windows}
+        table = RateLimitCounter.__table__
+        stmt = self._insert().values(
+            [
+                {
+                    "key": key,
+                    "window_seconds": w.seconds,
+                    "window_start": starts[w.seconds],
+                    "current_count": 1,
+                    "previous_count": 0,
+                }
+                for w in windows
+            ]
+        )
+        same_window = table.c.window_start == stmt.excluded.window_start
+        next_window = table.c.window_start == stmt.excluded.window_start - stmt.excluded.window_seconds
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key, table.c.window_seconds],
+            set_={
+                # Every right-hand side sees the row as it was before this update.
+                "previous_count": case(
+                    (same_window, table.c.previous_count),
+                    (next_window, table.c.current_count),
+                    else_=0,
+                ),
+                "current_count": case(
+                    (same_window, table.c.current_count + 1), else_=1
+                ),
+                "window_start": stmt.excluded.window_start,
+            },
+        ).returning(table.c.window_seconds, table.c.current_count, table.c.previous_count)
+
+        async with self.engine.begin() as conn:
+            rows = (await conn.execute(stmt)).all()
+            counts = {row.window_seconds: (row.current_count, row.previous_count) for row in rows}
+
+            remaining: list[int] = []
+            retry_after = 0.0
+            for window in windows:
+                current, previous = counts[window.seconds]
+                start = starts[window.seconds]
+                overlap = 1 - (now - start) / window.seconds
+                used = math.ceil(current + previous * overlap)
+                remaining.append(max(window.limit - used, 0))
+                if used > window.limit:
+                    retry_after = max(
+                        retry_after,
+                        _sliding_retry_after(window, start, now, current - 1, previous),
+                    )
+            if not retry_after:
+                return RateLimitDecision(True, remaining)
+
+            # Rejected requests should not count against the caller.
+            await conn.execute(
+                update(RateLimitCounter)
+                .where(
+                    RateLimitCounter.key == key,
+                    RateLimitCounter.window_seconds.in_(list(starts)),
+                )
+                .values(current_count=RateLimitCounter.current_count - 1)
+            )
+            return RateLimitDecision(False, remaining, retry_after)
+
+
+def _sliding_retry_after(
+    window: RateWindow, start: int, now: float, current: int, previous: int
+) -> float:
+    """Seconds until one more request fits, assuming no other traffic meanwhile."""
+    room = window.limit - 1 - current
+    if room < 0 or previous == 0:
+        # The current fixed window alone is full; wait for it to roll over.
+        return max(start + window.seconds - now, 1e-3)
+    # The previous window's weight decays linearly; solve for when it fits.
+    fits_at = start + window.seconds * (1 - room / previous)
+    return max(fits_at - now, 1e-3)
+
 
 class RateLimiter:
-    """In-memory request limiter keyed by user identifier."""
+    """Request limiter keyed by user identifier, with hourly and daily windows."""
 
-    def __init__(self, hourly_limit: int, daily_limit: int) -> None:
+    def __init__(
+        self,
+        hourly_limit: int,
+        daily_limit: int,
+        backend: RateLimitBackend | None = None,
+    ) -> None:
         self.hourly_limit = hourly_limit
         self.daily_limit = daily_limit
-        self._hourly_cache: TTLCache[str, int] = TTLCache(maxsize=10000, ttl=3600)
-        self._daily_cache: TTLCache[str, int] = TTLCache(maxsize=10000, ttl=86400)
-        self._lock = threading.Lock()
+        self.windows = (RateWindow(hourly_limit, 3600), RateWindow(daily_limit, 86400))
+        self.backend = backend or GcraRateLimitBackend()
 
     def check(self, user_id: str) -> RateLimitResult:
-        """Increment counters and ensure limits are not exceeded."""
-        with self._lock:
-            hourly_count = self._hourly_cache.get(user_id, 0) + 1
-            daily_count = self._daily_cache.get(user_id, 0) + 1
-
-            if hourly_count > self.hourly_limit or daily_count > self.daily_limit:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded. Please wait before sending more requests.",
-                )
+        """Count a request and ensure limits are not exceeded (in-process backend only)."""
+        if not isinstance(self.backend, GcraRateLimitBackend):
+            raise TypeError("Use acheck() with a shared rate limit backend.")
+        with observe_stage("rate_limit"):
+            decision = self.backend.acquire_sync(user_id, self.windows)
+        return self._result(decision)
 
-            self._hourly_cache[user_id] = hourly_count
-            self._daily_cache[user_id] = daily_count
+    async def acheck(self, user_id: str) -> RateLimitResult:
+        """Count a request and ensure limits are not exceeded."""
+        with observe_stage("rate_limit"):
+            decision = await self.backend.acquire(user_id, self.windows)
+        return self._result(decision)
 
-            return RateLimitResult(
-                remaining_hourly=self.hourly_limit - hourly_count,
-                remaining_daily=self.daily_limit - daily_count,
+    @staticmethod
+    def _result(decision: RateLimitDecision) -> RateLimitResult:
+        result = RateLimitResult(
+            remaining_hourly=decision.remaining[0], remaining_daily=decision.remaining[1]
+        )
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded. Please wait before sending more requests.",
+                headers={
+                    "Retry-After": str(math.ceil(decision.retry_after)),
+                    **result.headers(),
+                },
             )
+        return result
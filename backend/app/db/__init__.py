@@ -1,3 +1,17 @@
-from app.db.session import Base, SessionLocal, engine, session_scope
+from app.db.session import (
+    AsyncSessionLocal,
+    Base,
+    SessionLocal,
+    async_engine,
+    engine,
+    session_scope,
+)
 
-__all__ = ["Base", "SessionLocal", "engine", "session_scope"]
+__all__ = [
+    "AsyncSessionLocal",
+    "Base",
+    "SessionLocal",
+    "async_engine",
+    "engine",
+    "session_scope",
+]
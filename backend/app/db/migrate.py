@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.logging import logger as app_logger
+
+logger = app_logger.getChild(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def build_alembic_config(connection: Connection | None = None) -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _legacy_revision(connection: Connection) -> str | None:
+    """Revision matching a database created by ``create_all`` before migrations existed."""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables or "chat_sessions" not in tables:
+        return None
+    columns = {column["name"] for column in inspector.get_columns("chat_sessions")}
+    if "message_count" in columns:
+        return "0003"
+    if "summary" in columns:
+        return "0002"
+    return "0001"
+
+
+def run_migrations(engine: Engine) -> None:
+    """Upgrade the database to the latest revision, adopting unversioned databases."""
+    with engine.begin() as connection:
+        config = build_alembic_config(connection)
+        legacy_revision = _legacy_revision(connection)
+        if legacy_revision is not None:
+            logger.info("Stamping unversioned database at revision %s.", legacy_revision)
+            command.stamp(config, legacy_revision)
+        command.upgrade(config, "head")
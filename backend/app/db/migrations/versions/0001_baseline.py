@@ -0,0 +1,46 @@
+"""Baseline schema: chat sessions and messages.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_sessions",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column(
+            "chat_session_id",
+            sa.String(length=36),
+            sa.ForeignKey("chat_sessions.id"),
+            nullable=False,
+        ),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("metadata", sa.JSON(), nullable=True),
+    )
+    op.create_index("ix_messages_chat_session_id", "messages", ["chat_session_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_chat_session_id", table_name="messages")
+    op.drop_table("messages")
+    op.drop_table("chat_sessions")
@@ -0,0 +1,34 @@
+"""Rolling chat summary columns.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.add_column(sa.Column("summary", sa.Text(), nullable=True))
+        batch.add_column(
+            sa.Column(
+                "summarized_message_count",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.drop_column("summarized_message_count")
+        batch.drop_column("summary")
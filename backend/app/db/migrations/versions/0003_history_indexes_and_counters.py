@@ -0,0 +1,59 @@
+"""Hot-path indexes and denormalized chat counters.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.add_column(
+            sa.Column("message_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch.add_column(
+            sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    op.execute(
+        """
+        UPDATE chat_sessions SET
+            message_count = (
+                SELECT COUNT(*) FROM messages
+                WHERE messages.chat_session_id = chat_sessions.id
+            ),
+            last_message_at = (
+                SELECT MAX(messages.created_at) FROM messages
+                WHERE messages.chat_session_id = chat_sessions.id
+            )
+        """
+    )
+
+    op.create_index(
+        "ix_chat_sessions_updated_at_id", "chat_sessions", ["updated_at", "id"]
+    )
+    op.create_index(
+        "ix_messages_chat_session_id_created_at_id",
+        "messages",
+        ["chat_session_id", "created_at", "id"],
+    )
+    # Covered by the composite index's leading column.
+    op.drop_index("ix_messages_chat_session_id", table_name="messages")
+
+
+def downgrade() -> None:
+    op.create_index("ix_messages_chat_session_id", "messages", ["chat_session_id"])
+    op.drop_index("ix_messages_chat_session_id_created_at_id", table_name="messages")
+    op.drop_index("ix_chat_sessions_updated_at_id", table_name="chat_sessions")
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.drop_column("last_message_at")
+        batch.drop_column("message_count")
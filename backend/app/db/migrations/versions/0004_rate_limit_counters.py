@@ -0,0 +1,30 @@
+"""Shared sliding-window rate limit counters.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_counters",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("window_seconds", sa.Integer(), primary_key=True),
+        sa.Column("window_start", sa.BigInteger(), nullable=False),
+        sa.Column("current_count", sa.Integer(), nullable=False),
+        sa.Column("previous_count", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_counters")
@@ -0,0 +1,168 @@
+"""Content-addressed storage for assistant message context.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Field moved out of messages.metadata -> column holding its blob's hash.
+CONTEXT_FIELDS = {
+    "search_results": "search_results_hash",
+    "vector_context": "vector_context_hash",
+}
+COMPRESS_MIN_BYTES = 256
+BATCH_SIZE = 500
+
+context_blobs = sa.table(
+    "context_blobs",
+    sa.column("hash", sa.String),
+    sa.column("encoding", sa.String),
+    sa.column("size", sa.Integer),
+    sa.column("data", sa.LargeBinary),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+messages = sa.table(
+    "messages",
+    sa.column("id", sa.String),
+    sa.column("metadata", sa.JSON),
+    sa.column("search_results_hash", sa.String),
+    sa.column("vector_context_hash", sa.String),
+)
+
+
+def _encode(value) -> dict:
+    # Same format as app.services.context_blobs.encode_context, frozen here.
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode()
+    blob = {
+        "hash": hashlib.sha256(raw).hexdigest(),
+        "encoding": "json",
+        "size": len(raw),
+        "data": raw,
+    }
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            blob.update(encoding="zlib", data=packed)
+    return blob
+
+
+def _decode(encoding: str, data: bytes):
+    return json.loads(zlib.decompress(data) if encoding == "zlib" else data)
+
+
+def _batches(bind, where):
+    """Yield ``(id, metadata, hashes...)`` rows in id order, a batch at a time."""
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(
+                messages.c.id,
+                messages.c.metadata,
+                messages.c.search_results_hash,
+                messages.c.vector_context_hash,
+            )
+            .where(where, messages.c.id > last_id)
+            .order_by(messages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def _move_context_to_blobs(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        insert = postgresql.insert(context_blobs)
+    else:
+        insert = sqlite.insert(context_blobs)
+    now = datetime.now(timezone.utc)
+    for rows in _batches(bind, messages.c.metadata.isnot(None)):
+        blobs: dict[str, dict] = {}
+        for row in rows:
+            metadata = dict(row.metadata or {})
+            if not any(field in metadata for field in CONTEXT_FIELDS):
+                continue
+            hashes = {}
+            for field, column in CONTEXT_FIELDS.items():
+                if field in metadata:
+                    blob = _encode(metadata.pop(field))
+                    blobs[blob["hash"]] = {**blob, "created_at": now}
+                    hashes[column] = blob["hash"]
+            bind.execute(
+                messages.update()
+                .where(messages.c.id == row.id)
+                .values(metadata=metadata or None, **hashes)
+            )
+        if blobs:
+            bind.execute(
+                insert.values(list(blobs.values())).on_conflict_do_nothing(
+                    index_elements=["hash"]
+                )
+            )
+
+
+def _inline_blobs(bind) -> None:
+    referenced = sa.or_(
+        messages.c.search_results_hash.isnot(None), messages.c.vector_context_hash.isnot(None)
+    )
+    for rows in _batches(bind, referenced):
+        hashes = {getattr(row, column) for row in rows for column in CONTEXT_FIELDS.values()}
+        blobs = {
+            blob.hash: _decode(blob.encoding, blob.data)
+            for blob in bind.execute(
+                sa.select(context_blobs).where(context_blobs.c.hash.in_(hashes - {None}))
+            )
+        }
+        for row in rows:
+            metadata = dict(row.metadata or {})
+            for field, column in CONTEXT_FIELDS.items():
+                if getattr(row, column) in blobs:
+                    metadata[field] = blobs[getattr(row, column)]
+            bind.execute(
+                messages.update().where(messages.c.id == row.id).values(metadata=metadata)
+            )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "context_blobs",
+        sa.Column("hash", sa.String(length=64), primary_key=True),
+        sa.Column("encoding", sa.String(length=16), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    with op.batch_alter_table("messages") as batch:
+        batch.add_column(sa.Column("search_results_hash", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("vector_context_hash", sa.String(length=64), nullable=True))
+    op.create_index("ix_messages_search_results_hash", "messages", ["search_results_hash"])
+    op.create_index("ix_messages_vector_context_hash", "messages", ["vector_context_hash"])
+
+    _move_context_to_blobs(op.get_bind())
+
+
+def downgrade() -> None:
+    _inline_blobs(op.get_bind())
+
+    op.drop_index("ix_messages_vector_context_hash", table_name="messages")
+    op.drop_index("ix_messages_search_results_hash", table_name="messages")
+    with op.batch_alter_table("messages") as batch:
+        batch.drop_column("vector_context_hash")
+        batch.drop_column("search_results_hash")
+    op.drop_table("context_blobs")
@@ -0,0 +1,31 @@
+"""Market snapshots for watchlist topics.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_snapshots",
+        sa.Column("topic", sa.String(length=255), primary_key=True),
+        sa.Column("query", sa.Text(), nullable=False),
+        sa.Column("results", sa.JSON(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_market_snapshots_fetched_at", "market_snapshots", ["fetched_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_snapshots_fetched_at", table_name="market_snapshots")
+    op.drop_table("market_snapshots")
@@ -0,0 +1,44 @@
+"""Last summarized message, so summary folds seek instead of using OFFSET.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.add_column(
+            sa.Column("summarized_through_id", sa.String(length=36), nullable=True)
+        )
+
+    # The summary covers the first summarized_message_count messages of each chat.
+    op.execute(
+        """
+        UPDATE chat_sessions SET summarized_through_id = (
+            SELECT ranked.id FROM (
+                SELECT id, chat_session_id, ROW_NUMBER() OVER (
+                    PARTITION BY chat_session_id ORDER BY created_at, id
+                ) AS position
+                FROM messages
+            ) AS ranked
+            WHERE ranked.chat_session_id = chat_sessions.id
+                AND ranked.position = chat_sessions.summarized_message_count
+        )
+        WHERE summarized_message_count > 0
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.drop_column("summarized_through_id")
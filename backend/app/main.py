@@ -1,25 +1,63 @@
-from contextlib import asynccontextmanager
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api import api_router
-from app.api.routes import health
+from app.api.routes import chats as chat_routes
+from app.api.routes import health, metrics
 from app.core.config import get_settings
 from app.core.logging import logger as app_logger
-from app.db import Base, engine
+from app.core.metrics import MetricsMiddleware
+from app.db import engine
+from app.db.migrate import run_migrations
+from app.schemas import ReadinessResponse
+from app.services import agent_service_built, get_agent_service
+from app.services.llm_limiter import LLMOverloadedError
 
 logger = app_logger.getChild(__name__)
 settings = get_settings()
 
 
+async def warm_up(app: FastAPI) -> None:
+    """Build and warm the agent after startup; ``/ready`` reports the outcome."""
+    started = time.perf_counter()
+    try:
+        agent_service = await asyncio.to_thread(get_agent_service)
+        await agent_service.memory_indexer.start()
+        await agent_service.warm_up()
+    except Exception as exc:
+        logger.exception("Agent warm-up failed: %s", exc)
+        app.state.readiness = ReadinessResponse(status="failed", detail=str(exc))
+        return
+    elapsed = time.perf_counter() - started
+    app.state.readiness = ReadinessResponse(
+        status="ready", warm_up_seconds=round(elapsed, 3)
+    )
+    logger.info("Agent warmed up in %.2fs.", elapsed)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: ensure DB tables exist
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables ensured.")
+    # Startup: bring the schema up to the latest migration, then start serving
+    # while the agent warms up in the background.
+    app.state.readiness = ReadinessResponse(status="starting")
+    await asyncio.to_thread(run_migrations, engine)
+    logger.info("Database migrations applied.")
+    warm_up_task = asyncio.create_task(warm_up(app))
     yield
-    # Shutdown: add teardown logic here if needed
+    # Shutdown: drop pending titles, flush vector memory still waiting to be indexed.
+    warm_up_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up_task
+    await chat_routes.title_scheduler.stop()
+    if agent_service_built():
+        memory_indexer = get_agent_service().memory_indexer
+        await memory_indexer.stop()
+        logger.info("Memory indexer flushed (%d indexed).", memory_indexer.indexed)
 
 
 app = FastAPI(
@@ -30,6 +68,15 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(LLMOverloadedError)
+async def handle_llm_overloaded(request: Request, exc: LLMOverloadedError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -40,7 +87,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Retry-After",
+        "X-RateLimit-Remaining-Hourly",
+        "X-RateLimit-Remaining-Daily",
+    ],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(api_router, prefix="/api")
@@ -1,3 +1,6 @@
 from app.models.chat import ChatSession, Message
+from app.models.context_blob import ContextBlob
+from app.models.market_snapshot import MarketSnapshot
+from app.models.rate_limit import RateLimitCounter
 
-__all__ = ["ChatSession", "Message"]
+__all__ = ["ChatSession", "ContextBlob", "MarketSnapshot", "Message", "RateLimitCounter"]
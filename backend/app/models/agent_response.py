@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Literal
 
 
 @dataclass
@@ -7,3 +8,13 @@ class AgentResponse:
     answer: str
     search_results: list[str]
     vector_context: str
+    # Set when the answer was served from the semantic answer cache.
+    answer_cache: dict[str, Any] | None = None
+
+
+@dataclass
+class AgentStreamEvent:
+    """A progress update emitted while the agent workflow is running."""
+    event: Literal["search", "memory", "token", "error", "answer"]
+    data: dict[str, Any] = field(default_factory=dict)
+    response: AgentResponse | None = None
@@ -3,6 +3,8 @@ from typing import TypedDict
 
 class AgentState(TypedDict, total=False):
     """Represents the state of an agent during a session."""
+    chat_id: str
+    user_id: str
     question: str
     history: str
     search_results: list[str]
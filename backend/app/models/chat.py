@@ -1,36 +1,67 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String, Text
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
 
 from app.db import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     title: Mapped[str] = mapped_column(String(255), default="Market Mind Chat")
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now())
+    # Client-side timestamps, like Message.created_at: keyset cursors compare against
+    # them, and SQLite's CURRENT_TIMESTAMP is stored in a different text format.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow
     )
+    # Rolling summary of every message before the most recent window, plus how many
+    # messages (in creation order) it already covers and the last of them, which the
+    # next fold seeks from.
+    summary: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    summarized_message_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    summarized_through_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    # Denormalized counters, maintained by ChatRepository.add_message and record_turn.
+    message_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     messages: Mapped[list["Message"]] = relationship("Message", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (Index("ix_chat_sessions_updated_at_id", "updated_at", "id"),)
+
 
 class Message(Base):
     __tablename__ = "messages"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    chat_session_id: Mapped[str] = mapped_column(String(36), ForeignKey("chat_sessions.id"), index=True)
+    chat_session_id: Mapped[str] = mapped_column(String(36), ForeignKey("chat_sessions.id"))
     role: Mapped[str] = mapped_column(String(20))
     content: Mapped[str] = mapped_column(Text())
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now())
+    # Client-side timestamp: SQLite's CURRENT_TIMESTAMP has one-second resolution and
+    # Postgres now() is fixed per transaction, both of which tie messages in a turn.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
     message_metadata: Mapped[dict | None] = mapped_column("metadata", JSON, nullable=True)
+    # Retrieval context of assistant messages, kept once per distinct value in
+    # context_blobs rather than repeated in every row's metadata.
+    search_results_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    vector_context_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     session: Mapped[ChatSession] = relationship("ChatSession", back_populates="messages")
+
+    # The first index serves history reads and keyset pages, and its prefix covers
+    # chat_session_id lookups; the hash indexes let the purge find context blobs no
+    # message points at.
+    __table_args__ = (
+        Index("ix_messages_chat_session_id_created_at_id", "chat_session_id", "created_at", "id"),
+        Index("ix_messages_search_results_hash", "search_results_hash"),
+        Index("ix_messages_vector_context_hash", "vector_context_hash"),
+    )
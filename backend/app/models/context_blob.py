@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ContextBlob(Base):
+    """Retrieval context of assistant messages, stored once per distinct value.
+
+    Keyed by the SHA-256 of the value's canonical JSON, which ``data`` holds,
+    zlib-compressed when ``encoding`` is ``"zlib"``. Messages point at blobs
+    through ``Message.search_results_hash`` and ``Message.vector_context_hash``.
+    """
+
+    __tablename__ = "context_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String(16))
+    # Size of the uncompressed JSON, in bytes.
+    size: Mapped[int] = mapped_column(Integer)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class MarketSnapshot(Base):
+    """Latest search results for a watchlist topic, written by the snapshot ingester.
+
+    Keyed by the topic's normalized search query. Questions that mention a topic
+    are answered from ``results`` while ``fetched_at`` is recent enough, instead
+    of searching the web at request time.
+    """
+
+    __tablename__ = "market_snapshots"
+
+    topic: Mapped[str] = mapped_column(String(255), primary_key=True)
+    query: Mapped[str] = mapped_column(Text)
+    results: Mapped[list[str]] = mapped_column(JSON)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
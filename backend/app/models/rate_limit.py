@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class RateLimitCounter(Base):
+    """Sliding-window counter shared by every backend replica.
+
+    One row per (key, window length): the count for the current fixed window and
+    the one before it, which together approximate a sliding window.
+    """
+
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    window_seconds: Mapped[int] = mapped_column(Integer, primary_key=True)
+    window_start: Mapped[int] = mapped_column(BigInteger)
+    current_count: Mapped[int] = mapped_column(Integer, default=0)
+    previous_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -1,11 +1,14 @@
 """Shared prompt templates used across the Market Mind backend."""
 
 from app.prompts.chat import MARKET_MIND_PROMPT, build_market_mind_prompt
+from app.prompts.summary import CHAT_SUMMARY_PROMPT, build_chat_summary_prompt
 from app.prompts.title import CHAT_TITLE_PROMPT, build_chat_title_prompt
 
 __all__ = [
     "MARKET_MIND_PROMPT",
+    "CHAT_SUMMARY_PROMPT",
     "CHAT_TITLE_PROMPT",
     "build_market_mind_prompt",
+    "build_chat_summary_prompt",
     "build_chat_title_prompt",
 ]
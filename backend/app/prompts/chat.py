@@ -1,7 +1,7 @@
 """Prompt templates for chat interactions with Market Mind."""
 
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 
 MARKET_MIND_SYSTEM_MESSAGE = SystemMessage(
     content=(
@@ -15,13 +15,12 @@ MARKET_MIND_SYSTEM_MESSAGE = SystemMessage(
     )
 )
 
-MARKET_MIND_HUMAN_MESSAGE = HumanMessage(
-    content=(
-        "Conversation so far:\n{history}\n\n"
-        "Relevant knowledge base context:\n{vector_context}\n\n"
-        "Latest market signals:\n{search_results}\n\n"
-        "User request: {question}"
-    )
+# A template (not a literal HumanMessage) so the placeholders are filled per request.
+MARKET_MIND_HUMAN_MESSAGE = HumanMessagePromptTemplate.from_template(
+    "Conversation so far:\n{history}\n\n"
+    "Relevant knowledge base context:\n{vector_context}\n\n"
+    "Latest market signals:\n{search_results}\n\n"
+    "User request: {question}"
 )
 
 
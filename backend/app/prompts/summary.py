@@ -0,0 +1,28 @@
+"""Prompt template for maintaining a rolling conversation summary."""
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+
+
+def build_chat_summary_prompt() -> ChatPromptTemplate:
+    """Create a prompt that folds new messages into an existing chat summary."""
+    return ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(
+                content=(
+                    "You maintain a running summary of a market analysis conversation. "
+                    "Merge the new messages into the existing summary. Keep tickers, figures, "
+                    "user goals and conclusions; drop greetings and repetition. "
+                    "Return only the updated summary in at most 200 words."
+                )
+            ),
+            HumanMessagePromptTemplate.from_template(
+                "Existing summary:\n{summary}\n\n"
+                "New messages:\n{messages}\n\n"
+                "Provide the updated summary."
+            ),
+        ]
+    )
+
+
+CHAT_SUMMARY_PROMPT = build_chat_summary_prompt()
@@ -1,7 +1,7 @@
 """Prompt template for generating concise chat titles."""
 
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 
 
 def build_chat_title_prompt() -> ChatPromptTemplate:
@@ -14,11 +14,9 @@ def build_chat_title_prompt() -> ChatPromptTemplate:
                     "Return only the title text. Keep it under 60 characters, avoid quotation marks, and capitalize major words."
                 )
             ),
-            HumanMessage(
-                content=(
-                    "Conversation transcript:\n{history}\n\n"
-                    "Provide a single title summarizing this conversation."
-                )
+            HumanMessagePromptTemplate.from_template(
+                "Conversation transcript:\n{history}\n\n"
+                "Provide a single title summarizing this conversation."
             ),
         ]
     )
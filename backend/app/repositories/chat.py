@@ -1,52 +1,81 @@
 from __future__ import annotations
 
-from typing import Sequence
+from datetime import datetime, timezone
+from typing import Iterable, Literal, Sequence
+from uuid import uuid4
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import ChatSession, Message
+from app.core.metrics import instrument_repository
+from app.core.pagination import Cursor
+from app.models import ChatSession, ContextBlob, Message
 
 
+@instrument_repository
 class ChatRepository:
     """Data access layer for chat sessions and messages."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    def create_session(self, title: str | None = None) -> ChatSession:
+    async def create_session(self, title: str | None = None) -> ChatSession:
         chat = ChatSession(title=title or "Market Mind Chat")
         self.session.add(chat)
-        self.session.commit()
-        self.session.refresh(chat)
+        await self.session.commit()
+        await self.session.refresh(chat)
         return chat
 
-    def list_sessions(self) -> Sequence[ChatSession]:
-        stmt = select(ChatSession).order_by(ChatSession.updated_at.desc())
-        return list(self.session.scalars(stmt))
+    async def list_sessions_page(
+        self, limit: int, after: Cursor | None = None
+    ) -> tuple[list[ChatSession], Cursor | None]:
+        """Return up to ``limit`` sessions, most recently updated first.
 
-    def get_session(self, chat_id: str) -> ChatSession | None:
-        return self.session.get(ChatSession, chat_id)
+        Pages are keyed on ``(updated_at, id)`` so each query seeks straight to the
+        cursor instead of skipping over earlier rows.
+        """
+        stmt = select(ChatSession).order_by(
+            ChatSession.updated_at.desc(), ChatSession.id.desc()
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(ChatSession.updated_at, ChatSession.id)
+                < tuple_(after.timestamp, after.id)
+            )
+        chats = list(await self.session.scalars(stmt.limit(limit + 1)))
+        if len(chats) <= limit:
+            return chats, None
+        chats = chats[:limit]
+        return chats, Cursor(timestamp=chats[-1].updated_at, id=chats[-1].id)
+
+    async def get_session(self, chat_id: str) -> ChatSession | None:
+        return await self.session.get(ChatSession, chat_id)
 
-    def delete_session(self, chat_id: str) -> bool:
-        chat = self.get_session(chat_id)
+    async def delete_session(self, chat_id: str) -> bool:
+        chat = await self.get_session(chat_id)
         if not chat:
             return False
-        self.session.delete(chat)
-        self.session.commit()
+        await self.session.delete(chat)
+        await self.session.commit()
         return True
 
-    def update_session_title(self, chat_id: str, title: str) -> ChatSession | None:
-        chat = self.get_session(chat_id)
-        if not chat:
+    async def update_session_title(
+        self, chat_id: str, title: str
+    ) -> ChatSession | None:
+        stmt = (
+            update(ChatSession)
+            .where(ChatSession.id == chat_id)
+            # Retitling is not chat activity; keep the chat where it is in the list.
+            .values(title=title, updated_at=ChatSession.updated_at)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        if not result.rowcount:
             return None
-        chat.title = title
-        self.session.add(chat)
-        self.session.commit()
-        self.session.refresh(chat)
-        return chat
+        return await self.session.get(ChatSession, chat_id, populate_existing=True)
 
-    def add_message(
+    async def add_message(
         self,
         chat_id: str,
         role: str,
@@ -60,14 +89,215 @@ class ChatRepository:
             message_metadata=metadata,
         )
         self.session.add(message)
-        self.session.commit()
-        self.session.refresh(message)
+        await self.session.flush()
+        await self.session.execute(
+            update(ChatSession)
+            .where(ChatSession.id == chat_id)
+            .values(
+                message_count=ChatSession.message_count + 1,
+                last_message_at=message.created_at,
+            )
+        )
+        await self.session.commit()
+        await self.session.refresh(message)
         return message
 
-    def list_messages(self, chat_id: str) -> Sequence[Message]:
+    async def release(self) -> None:
+        """End the current transaction and return its connection to the pool.
+
+        Call it between a turn's reads and ``record_turn`` so no connection is held
+        while the LLM answers.
+        """
+        await self.session.close()
+
+    @staticmethod
+    def pending_message(
+        chat_id: str,
+        role: str,
+        content: str,
+        metadata: dict | None = None,
+        context: dict[str, ContextBlob] | None = None,
+    ) -> Message:
+        """A message with its id and timestamp assigned, not yet stored.
+
+        The question of a turn is created this way when the turn starts, so it can
+        be shown (and its timestamp orders it) before ``record_turn`` stores it.
+        ``context`` maps ``search_results``/``vector_context`` to their blobs.
+        """
+        context = context or {}
+        return Message(
+            id=str(uuid4()),
+            chat_session_id=chat_id,
+            role=role,
+            content=content,
+            created_at=datetime.now(timezone.utc),
+            message_metadata=metadata,
+            search_results_hash=_blob_hash(context.get("search_results")),
+            vector_context_hash=_blob_hash(context.get("vector_context")),
+        )
+
+    async def record_turn(
+        self, question: Message, answer: Message, blobs: Iterable[ContextBlob] = ()
+    ) -> tuple[Message, Message]:
+        """Store an answered turn in one transaction.
+
+        Context blobs the answer points at are inserted unless already stored, both
+        messages go in a single ``INSERT ... RETURNING`` and the chat's counters and
+        ``updated_at`` move in one ``UPDATE``, then one commit. A turn that is never
+        answered is never written.
+        """
+        await self._store_blobs(blobs)
+        rows = [
+            {
+                "id": message.id,
+                "chat_session_id": message.chat_session_id,
+                "role": message.role,
+                "content": message.content,
+                "created_at": message.created_at,
+                "message_metadata": message.message_metadata,
+                "search_results_hash": message.search_results_hash,
+                "vector_context_hash": message.vector_context_hash,
+            }
+            for message in (question, answer)
+        ]
+        # render_nulls keeps both rows in one statement although only the answer
+        # has context hashes; otherwise the ORM batches rows by their non-null keys.
+        stored = list(
+            await self.session.scalars(
+                insert(Message).returning(Message, sort_by_parameter_order=True),
+                rows,
+                execution_options={"render_nulls": True},
+            )
+        )
+        await self.session.execute(
+            update(ChatSession)
+            .where(ChatSession.id == question.chat_session_id)
+            .values(
+                message_count=ChatSession.message_count + len(stored),
+                last_message_at=answer.created_at,
+                updated_at=answer.created_at,
+            )
+        )
+        await self.session.commit()
+        return stored[0], stored[1]
+
+    async def _store_blobs(self, blobs: Iterable[ContextBlob]) -> None:
+        unique = {blob.hash: blob for blob in blobs}
+        if not unique:
+            return
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(ContextBlob)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(ContextBlob)
+        else:
+            raise RuntimeError(f"Context blobs are not supported on {dialect!r} databases.")
+        now = datetime.now(timezone.utc)
+        await self.session.execute(
+            stmt.values(
+                [
+                    {
+                        "hash": blob.hash,
+                        "encoding": blob.encoding,
+                        "size": blob.size,
+                        "data": blob.data,
+                        "created_at": now,
+                    }
+                    for blob in unique.values()
+                ]
+            ).on_conflict_do_nothing(index_elements=["hash"])
+        )
+
+    async def load_context_blobs(self, hashes: Iterable[str]) -> dict[str, ContextBlob]:
+        """Fetch context blobs by hash in one query; unknown hashes are left out."""
+        wanted = set(hashes)
+        if not wanted:
+            return {}
+        stmt = select(ContextBlob).where(ContextBlob.hash.in_(wanted))
+        return {blob.hash: blob for blob in await self.session.scalars(stmt)}
+
+    async def list_messages_page(
+        self,
+        chat_id: str,
+        limit: int,
+        after: Cursor | None = None,
+        order: Literal["asc", "desc"] = "asc",
+    ) -> tuple[list[Message], Cursor | None]:
+        """Return up to ``limit`` messages after ``after``, keyed on ``(created_at, id)``."""
+        key = tuple_(Message.created_at, Message.id)
+        stmt = select(Message).where(Message.chat_session_id == chat_id)
+        if order == "desc":
+            stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc())
+        else:
+            stmt = stmt.order_by(Message.created_at.asc(), Message.id.asc())
+        if after is not None:
+            position = tuple_(after.timestamp, after.id)
+            stmt = stmt.where(key < position if order == "desc" else key > position)
+        messages = list(await self.session.scalars(stmt.limit(limit + 1)))
+        if len(messages) <= limit:
+            return messages, None
+        messages = messages[:limit]
+        return messages, Cursor(timestamp=messages[-1].created_at, id=messages[-1].id)
+
+    async def list_recent_messages(self, chat_id: str, limit: int) -> Sequence[Message]:
+        """Return the latest ``limit`` messages in chronological order."""
+        stmt = (
+            select(Message)
+            .where(Message.chat_session_id == chat_id)
+            .order_by(Message.created_at.desc())
+            .limit(limit)
+        )
+        messages = list(await self.session.scalars(stmt))
+        messages.reverse()
+        return messages
+
+    async def list_messages_after(
+        self, chat_id: str, after_id: str | None, limit: int
+    ) -> Sequence[Message]:
+        """Return up to ``limit`` messages following message ``after_id``, or the
+        chat's first ones, keyed on ``(created_at, id)``."""
         stmt = (
             select(Message)
             .where(Message.chat_session_id == chat_id)
-            .order_by(Message.created_at.asc())
+            .order_by(Message.created_at.asc(), Message.id.asc())
+            .limit(limit)
         )
-        return list(self.session.scalars(stmt))
+        if after_id is not None:
+            after_created_at = (
+                select(Message.created_at).where(Message.id == after_id).scalar_subquery()
+            )
+            stmt = stmt.where(
+                tuple_(Message.created_at, Message.id) > tuple_(after_created_at, after_id)
+            )
+        return list(await self.session.scalars(stmt))
+
+    async def update_session_summary(
+        self,
+        chat_id: str,
+        summary: str,
+        summarized_message_count: int,
+        summarized_through_id: str,
+        expected_message_count: int,
+    ) -> bool:
+        """Store a new rolling summary unless another writer advanced it first."""
+        stmt = (
+            update(ChatSession)
+            .where(
+                ChatSession.id == chat_id,
+                ChatSession.summarized_message_count == expected_message_count,
+            )
+            .values(
+                summary=summary,
+                summarized_message_count=summarized_message_count,
+                summarized_through_id=summarized_through_id,
+                # Summaries are bookkeeping, not chat activity.
+                updated_at=ChatSession.updated_at,
+            )
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return bool(result.rowcount)
+
+
+def _blob_hash(blob: ContextBlob | None) -> str | None:
+    return blob.hash if blob is not None else None
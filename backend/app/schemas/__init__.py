@@ -2,18 +2,46 @@ from app.schemas.chat import (
     ChatResponse,
     ChatSessionCreate,
     ChatSessionDetail,
+    ChatSessionPage,
     ChatSessionResponse,
     MessageCreate,
+    MessagePage,
     MessageResponse,
 )
-from app.schemas.health import HealthResponse
+from app.schemas.health import (
+    AgentStatsResponse,
+    AnswerCacheStatsResponse,
+    EmbeddingCacheStatsResponse,
+    HealthResponse,
+    LLMLimiterStatsResponse,
+    MarketSnapshotStatsResponse,
+    MemoryIndexerStatsResponse,
+    ReadinessResponse,
+    SearchCacheStatsResponse,
+    SearchProviderStatsResponse,
+    TitleSchedulerStatsResponse,
+    VectorMemoryStatsResponse,
+)
 
 __all__ = [
+    "AgentStatsResponse",
+    "AnswerCacheStatsResponse",
     "ChatResponse",
     "ChatSessionCreate",
     "ChatSessionDetail",
+    "ChatSessionPage",
     "ChatSessionResponse",
+    "EmbeddingCacheStatsResponse",
     "HealthResponse",
+    "LLMLimiterStatsResponse",
+    "MarketSnapshotStatsResponse",
+    "MemoryIndexerStatsResponse",
     "MessageCreate",
+    "MessagePage",
     "MessageResponse",
+    "ReadinessResponse",
+    "SearchCacheStatsResponse",
+    "SearchProviderStatsResponse",
+    "TitleSchedulerStatsResponse",
+    "VectorMemoryStatsResponse",
 ]
@@ -15,6 +15,8 @@ class ChatSessionResponse(BaseModel):
     title: str
     created_at: datetime
     updated_at: datetime
+    message_count: int = 0
+    last_message_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -37,6 +39,17 @@ class MessageResponse(BaseModel):
 
 class ChatSessionDetail(ChatSessionResponse):
     messages: list[MessageResponse] = []
+    older_messages_cursor: str | None = None
+
+
+class ChatSessionPage(BaseModel):
+    items: list[ChatSessionResponse]
+    next_cursor: str | None = None
+
+
+class MessagePage(BaseModel):
+    items: list[MessageResponse]
+    next_cursor: str | None = None
 
 
 class ChatResponse(BaseModel):
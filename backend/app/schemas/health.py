@@ -1,6 +1,140 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class HealthResponse(BaseModel):
     status: str = "ok"
     environment: str
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["starting", "ready", "failed"]
+    warm_up_seconds: float | None = None
+    detail: str | None = None
+
+
+class SearchCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    coalesced: int
+    size: int
+    max_size: int
+    ttl_seconds: float
+
+    class Config:
+        from_attributes = True
+
+
+class SearchProviderStatsResponse(BaseModel):
+    name: str
+    state: Literal["closed", "open", "half_open"]
+    calls: int
+    succeeded: int
+    failed: int
+    timed_out: int
+    cancelled: int
+    skipped: int
+    avg_latency_ms: float
+
+    class Config:
+        from_attributes = True
+
+
+class MemoryIndexerStatsResponse(BaseModel):
+    running: bool
+    queue_depth: int
+    max_queue: int
+    indexed: int
+    failed: int
+    dropped: int
+    batches: int
+
+    class Config:
+        from_attributes = True
+
+
+class EmbeddingCacheStatsResponse(BaseModel):
+    hits: int
+    disk_hits: int
+    misses: int
+    size: int
+    max_size: int
+    disk_enabled: bool
+
+    class Config:
+        from_attributes = True
+
+
+class VectorMemoryStatsResponse(BaseModel):
+    documents: int | None
+    written: int
+    duplicates: int
+    near_duplicates: int
+    expired: int
+    ttl_seconds: float | None
+    near_duplicate_threshold: float | None
+
+    class Config:
+        from_attributes = True
+
+
+class AnswerCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    stores: int
+    similarity_threshold: float
+    ttl_seconds: float
+
+    class Config:
+        from_attributes = True
+
+
+class MarketSnapshotStatsResponse(BaseModel):
+    topics: int
+    max_age_seconds: float
+    hits: int
+    stale: int
+    unmatched: int
+
+    class Config:
+        from_attributes = True
+
+
+class LLMLimiterStatsResponse(BaseModel):
+    max_concurrency: int
+    max_queue: int
+    active: int
+    waiting: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+    class Config:
+        from_attributes = True
+
+
+class TitleSchedulerStatsResponse(BaseModel):
+    pending: int
+    scheduled: int
+    debounced: int
+    deferred: int
+    generated: int
+    failed: int
+
+    class Config:
+        from_attributes = True
+
+
+class AgentStatsResponse(BaseModel):
+    search_cache: SearchCacheStatsResponse
+    search_providers: list[SearchProviderStatsResponse] = []
+    memory_indexer: MemoryIndexerStatsResponse
+    vector_memory: VectorMemoryStatsResponse | None = None
+    llm_limiter: LLMLimiterStatsResponse
+    embedding_cache: EmbeddingCacheStatsResponse | None = None
+    answer_cache: AnswerCacheStatsResponse | None = None
+    market_snapshots: MarketSnapshotStatsResponse | None = None
+    title_scheduler: TitleSchedulerStatsResponse | None = None
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
+
+from app.core.rate_limiter import GcraRateLimitBackend, RateWindow
+
+WINDOWS = (RateWindow(1_000_000, 3600), RateWindow(1_000_000, 86400))
+
+
+class TTLCacheRateLimitBackend:
+    """The limiter GCRA replaced: fixed-window TTLCache counters behind one lock."""
+
+    def __init__(self, windows: Sequence[RateWindow], max_keys: int) -> None:
+        self._caches: dict[int, TTLCache[str, int]] = {
+            window.seconds: TTLCache(maxsize=max_keys, ttl=window.seconds)
+            for window in windows
+        }
+        self._lock = threading.Lock()
+
+    def acquire_sync(self, key: str, windows: Sequence[RateWindow]) -> list[int] | None:
+        with self._lock:
+            counts = [self._caches[w.seconds].get(key, 0) + 1 for w in windows]
+            if any(count > w.limit for count, w in zip(counts, windows)):
+                return None
+            for count, window in zip(counts, windows):
+                self._caches[window.seconds][key] = count
+            return [w.limit - count for count, w in zip(counts, windows)]
+
+
+def run_benchmark(
+    acquire: Callable[[str, Sequence[RateWindow]], object],
+    threads: int,
+    requests_per_thread: int,
+    users: int,
+) -> float:
+    """Hammer ``acquire`` from ``threads`` workers; return checks per second."""
+
+    def worker(offset: int) -> None:
+        for index in range(requests_per_thread):
+            acquire(f"user-{(offset + index) % users}", WINDOWS)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, [n * 7919 for n in range(threads)]))
+    elapsed = time.perf_counter() - started
+    return threads * requests_per_thread / elapsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure rate limiter throughput under thread contention."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="Threadpool sizes to measure.",
+    )
+    parser.add_argument("--requests", type=int, default=20000, help="Checks per thread.")
+    parser.add_argument("--users", type=int, default=5000, help="Distinct user keys.")
+    parser.add_argument(
+        "--shards", type=int, default=64, help="Lock shards for the sharded run."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    columns = ("TTLCache+lock", "GCRA 1 shard", f"GCRA {args.shards} shards")
+    print(f"{'threads':>8}" + "".join(f"{name + ' (req/s)':>26}" for name in columns), flush=True)
+    for threads in args.threads:
+        backends = (
+            TTLCacheRateLimitBackend(WINDOWS, max_keys=args.users * 2),
+            GcraRateLimitBackend(shards=1, max_keys=args.users * 2),
+            GcraRateLimitBackend(shards=args.shards, max_keys=args.users * 2),
+        )
+        rates = [
+            run_benchmark(backend.acquire_sync, threads, args.requests, args.users)
+            for backend in backends
+        ]
+        print(f"{threads:>8}" + "".join(f"{rate:>26,.0f}" for rate in rates), flush=True)
+
+
+if __name__ == "__main__":
+    main()
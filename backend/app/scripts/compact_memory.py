@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import argparse
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logging import logger as app_logger
+from app.services.vector_memory import memory_id
+
+logger = app_logger.getChild(__name__)
+
+MEMORY_COLLECTION = "market-mind"
+
+
+@dataclass
+class CompactionResult:
+    scanned: int = 0
+    expired: int = 0
+    duplicates: int = 0
+    near_duplicates: int = 0
+    backfilled: int = 0
+    kept: int = 0
+    rewritten: bool = False
+    elapsed_seconds: float = 0.0
+    dry_run: bool = False
+
+
+@dataclass
+class _Document:
+    id: str
+    key: str
+    chat_id: str
+    role: str
+    created_at: float
+    backfill: bool
+
+
+def _scan(collection: Any, page_size: int) -> list[tuple[str, str, dict[str, Any]]]:
+    rows: list[tuple[str, str, dict[str, Any]]] = []
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            return rows
+        rows.extend(zip(page["ids"], page["documents"], page["metadatas"]))
+        offset += len(page["ids"])
+
+
+def _drop_near_duplicates(
+    collection: Any, documents: list[_Document], threshold: float, page_size: int
+) -> list[_Document]:
+    """Keep the newest of each group of near-identical documents per chat and role."""
+    groups: dict[tuple[str, str], list[_Document]] = defaultdict(list)
+    for document in documents:
+        groups[(document.chat_id, document.role)].append(document)
+
+    kept: list[_Document] = []
+    for group in groups.values():
+        if len(group) == 1:
+            kept.extend(group)
+            continue
+        group.sort(key=lambda document: document.created_at, reverse=True)
+        vectors: dict[str, np.ndarray] = {}
+        for start in range(0, len(group), page_size):
+            ids = [document.id for document in group[start : start + page_size]]
+            page = collection.get(ids=ids, include=["embeddings"])
+            vectors.update(zip(page["ids"], np.asarray(page["embeddings"], dtype=float)))
+        accepted: list[np.ndarray] = []
+        for document in group:
+            vector = vectors[document.id]
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+            if accepted and float(np.max(np.stack(accepted) @ vector)) >= threshold:
+                continue
+            accepted.append(vector)
+            kept.append(document)
+    return kept
+
+
+def _copy(
+    source: Any, target: Any, documents: list[_Document], now: float, page_size: int
+) -> None:
+    for start in range(0, len(documents), page_size):
+        chunk = {document.id: document for document in documents[start : start + page_size]}
+        page = source.get(
+            ids=list(chunk), include=["documents", "metadatas", "embeddings"]
+        )
+        target.add(
+            ids=[chunk[old_id].key for old_id in page["ids"]],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=[
+                {**metadata, "created_at": metadata.get("created_at", now)}
+                for metadata in page["metadatas"]
+            ],
+        )
+
+
+def compact_memory(
+    client: Any,
+    name: str = MEMORY_COLLECTION,
+    *,
+    ttl_seconds: float | None = None,
+    near_duplicate_threshold: float | None = None,
+    in_place: bool = False,
+    dry_run: bool = False,
+    page_size: int = 1000,
+) -> CompactionResult:
+    """Drop expired, duplicate and near-duplicate documents from vector memory.
+
+    Documents are regrouped under their ``memory_id``; of each group, and of each
+    set of documents from the same chat and role that are at least
+    ``near_duplicate_threshold`` cosine-similar, the newest is kept. Documents
+    without ``created_at`` get the current time. By default the survivors are
+    copied, with their stored embeddings, into a fresh collection that then
+    replaces the old one, which also rebuilds the HNSW index without the deleted
+    entries; the backend must be restarted afterwards to pick it up. ``in_place``
+    only deletes and backfills, which is safe while the backend is running but
+    leaves old documents under their original IDs.
+    """
+    result = CompactionResult(dry_run=dry_run)
+    started = time.perf_counter()
+    now = time.time()
+    staging = f"{name}-compacted"
+    existing = {collection.name for collection in client.list_collections()}
+    source = name
+    if name not in existing and staging in existing:
+        # A previous rewrite stopped between dropping the old collection and
+        # renaming its replacement.
+        if dry_run:
+            source = staging
+        else:
+            client.get_collection(staging).modify(name=name)
+            existing = {name}
+    collection = client.get_collection(source)
+
+    scanned: list[str] = []
+    newest: dict[str, _Document] = {}
+    for doc_id, text, metadata in _scan(collection, page_size):
+        metadata = metadata or {}
+        scanned.append(doc_id)
+        created_at = metadata.get("created_at")
+        if created_at is None:
+            created_at = now
+        elif ttl_seconds is not None and float(created_at) < now - ttl_seconds:
+            result.expired += 1
+            continue
+        document = _Document(
+            id=doc_id,
+            key=memory_id(text or "", metadata),
+            chat_id=str(metadata.get("chat_id") or ""),
+            role=str(metadata.get("role") or ""),
+            created_at=float(created_at),
+            backfill="created_at" not in metadata,
+        )
+        current = newest.get(document.key)
+        if current is not None:
+            result.duplicates += 1
+            if current.created_at >= document.created_at:
+                continue
+        newest[document.key] = document
+
+    kept = list(newest.values())
+    result.scanned = len(scanned)
+    if near_duplicate_threshold is not None:
+        kept = _drop_near_duplicates(collection, kept, near_duplicate_threshold, page_size)
+        result.near_duplicates = len(newest) - len(kept)
+    result.kept = len(kept)
+    result.backfilled = sum(document.backfill for document in kept)
+    if dry_run:
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+    if in_place:
+        kept_ids = {document.id for document in kept}
+        dropped = [doc_id for doc_id in scanned if doc_id not in kept_ids]
+        for start in range(0, len(dropped), page_size):
+            collection.delete(ids=dropped[start : start + page_size])
+        backfill = [document.id for document in kept if document.backfill]
+        for start in range(0, len(backfill), page_size):
+            ids = backfill[start : start + page_size]
+            collection.update(ids=ids, metadatas=[{"created_at": now}] * len(ids))
+    else:
+        if staging in existing and name in existing:
+            client.delete_collection(staging)
+        configuration = collection.configuration or {}
+        target = client.create_collection(
+            staging,
+            configuration={"hnsw": configuration["hnsw"]} if configuration.get("hnsw") else None,
+            metadata=collection.metadata,
+        )
+        _copy(collection, target, kept, now, page_size)
+        client.delete_collection(name)
+        target.modify(name=name)
+        result.rewritten = True
+
+    result.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        "Compacted %s: kept %d of %d documents.", name, result.kept, result.scanned
+    )
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compact Market Mind vector memory: drop expired (MEMORY_TTL_SECONDS), "
+            "duplicate and near-duplicate (MEMORY_NEAR_DUPLICATE_THRESHOLD) messages."
+        )
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help=(
+            "Only delete and backfill, without rewriting the collection. Safe while "
+            "the backend is running; the default rewrite needs a restart afterwards."
+        ),
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=1000, help="Documents read or written per call."
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count what would be removed."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    import chromadb
+
+    args = parse_args()
+    settings = get_settings()
+    client = chromadb.PersistentClient(path=str(settings.chroma_persist_path))
+    result = compact_memory(
+        client,
+        ttl_seconds=settings.memory_ttl_seconds,
+        near_duplicate_threshold=settings.memory_near_duplicate_threshold,
+        in_place=args.in_place,
+        dry_run=args.dry_run,
+        page_size=args.page_size,
+    )
+    verb = "Would keep" if result.dry_run else "Kept"
+    print(
+        f"{verb} {result.kept} of {result.scanned} memory documents: {result.expired} "
+        f"expired, {result.duplicates} duplicates and {result.near_duplicates} near "
+        f"duplicates removed, {result.backfilled} timestamps backfilled"
+        + (", collection rewritten" if result.rewritten else "")
+        + f" ({result.elapsed_seconds:.1f}s).",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
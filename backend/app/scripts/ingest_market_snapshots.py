@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+from app.core.logging import logger as app_logger
+from app.services.market_search import MarketSearch, SearchUnavailableError, build_market_search
+from app.services.market_snapshots import MarketSnapshots, Watchlist, WatchTopic
+
+logger = app_logger.getChild(__name__)
+
+
+@dataclass
+class IngestResult:
+    topics: int = 0
+    refreshed: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+async def ingest_snapshots(
+    snapshots: MarketSnapshots, search: MarketSearch, *, concurrency: int = 4
+) -> IngestResult:
+    """Search every watchlist topic and store the results as its snapshot.
+
+    Topics go through the same providers, circuit breakers and merging as live
+    searches, ``concurrency`` at a time. A topic whose search fails, comes back
+    empty or cannot be saved keeps its previous snapshot, which lookups ignore
+    once it is too old.
+    """
+    topics = snapshots.watchlist.topics
+    result = IngestResult(topics=len(topics))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+
+    async def refresh(topic: WatchTopic) -> None:
+        async with semaphore:
+            try:
+                results = await search.search(topic.query)
+            except SearchUnavailableError as exc:
+                logger.warning("Snapshot search for %r failed: %s", topic.query, exc)
+                results = []
+            if not results:
+                result.failed.append(topic.query)
+                return
+            try:
+                await snapshots.save(topic, results)
+            except SQLAlchemyError as exc:
+                logger.warning("Saving the %r snapshot failed: %s", topic.query, exc)
+                result.failed.append(topic.query)
+                return
+            result.refreshed += 1
+
+    await asyncio.gather(*(refresh(topic) for topic in topics))
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Refresh market snapshots for the MARKET_WATCHLIST topics, so questions "
+            "about them are answered without a live search."
+        )
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Topics searched at the same time."
+    )
+    parser.add_argument(
+        "--loop-seconds",
+        type=float,
+        default=None,
+        help="Keep running, refreshing this often. Omit to refresh once (for a CronJob).",
+    )
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.db import async_engine
+
+    settings = get_settings()
+    watchlist = Watchlist(settings.market_watchlist)
+    if not watchlist.topics:
+        raise SystemExit("MARKET_WATCHLIST is empty; nothing to ingest.")
+    snapshots = MarketSnapshots(
+        async_engine, watchlist, max_age_seconds=settings.market_snapshot_max_age_seconds
+    )
+    search = build_market_search(settings)
+    try:
+        while True:
+            result = await ingest_snapshots(snapshots, search, concurrency=args.concurrency)
+            print(
+                f"Refreshed {result.refreshed}/{result.topics} market snapshots in "
+                f"{result.elapsed_seconds:.1f}s"
+                + (f"; failed: {', '.join(result.failed)}" if result.failed else "."),
+                flush=True,
+            )
+            if args.loop_seconds is None:
+                if not result.refreshed:
+                    raise SystemExit("No market snapshot was refreshed.")
+                break
+            await asyncio.sleep(args.loop_seconds)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    asyncio.run(_main(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+from collections import Counter
+from collections.abc import Sequence
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+
+import httpx
+
+QUESTIONS = (
+    "What is the market sentiment on BTC today?",
+    "How did the S&P 500 close yesterday?",
+    "Summarise the latest Fed rate expectations.",
+    "Is ETH outperforming BTC this week?",
+    "What moved oil prices this morning?",
+    "Which sectors are leading the Nasdaq today?",
+)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (``q`` in [0, 100])."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LoadTestResult:
+    target_rps: float
+    sent: int = 0
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.succeeded / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.sent if self.sent else 0.0
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "target_rps": self.target_rps,
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "error_rate": round(self.error_rate, 4),
+            "errors": dict(self.errors),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "throughput_rps": round(self.throughput, 2),
+            "latency_seconds": {
+                "p50": round(percentile(self.latencies, 50), 4),
+                "p95": round(percentile(self.latencies, 95), 4),
+                "p99": round(percentile(self.latencies, 99), 4),
+                "max": round(max(self.latencies, default=0.0), 4),
+            },
+        }
+
+
+async def create_chats(client: httpx.AsyncClient, count: int) -> list[str]:
+    chat_ids = []
+    for index in range(count):
+        resp = await client.post("/api/chats", json={"title": f"Load test {index}"})
+        resp.raise_for_status()
+        chat_ids.append(resp.json()["id"])
+    return chat_ids
+
+
+async def _send_message(
+    client: httpx.AsyncClient, chat_id: str, user_id: str, question: str, stream: bool
+) -> str | None:
+    """Send one turn and read the full response; return an error label or ``None``."""
+    path = f"/api/chats/{chat_id}/messages" + ("/stream" if stream else "")
+    headers = {"X-User-Id": user_id}
+    try:
+        if not stream:
+            resp = await client.post(path, json={"content": question}, headers=headers)
+            return None if resp.is_success else str(resp.status_code)
+        async with client.stream(
+            "POST", path, json={"content": question}, headers=headers
+        ) as resp:
+            if not resp.is_success:
+                return str(resp.status_code)
+            body = "".join([chunk async for chunk in resp.aiter_text()])
+        return "stream_error" if "event: error" in body else None
+    except httpx.TimeoutException:
+        return "timeout"
+    except httpx.HTTPError as exc:
+        return type(exc).__name__
+
+
+async def run_load_test(
+    client: httpx.AsyncClient,
+    *,
+    rps: float,
+    duration_seconds: float,
+    chat_ids: Sequence[str],
+    questions: Sequence[str] = QUESTIONS,
+    stream: bool = False,
+    max_in_flight: int = 1000,
+) -> LoadTestResult:
+    """Send turns round-robin over ``chat_ids`` at a fixed arrival rate.
+
+    Arrivals are open-loop: each request is due at ``start + n / rps`` whether or
+    not earlier ones have finished, and its latency is measured from that due
+    time, so a stalling server shows up in the percentiles instead of silently
+    lowering the offered load. Requests that would exceed ``max_in_flight`` are
+    not sent and count as ``client_saturated`` errors.
+    """
+    result = LoadTestResult(target_rps=rps)
+    total = max(1, int(rps * duration_seconds))
+    in_flight: set[asyncio.Task[None]] = set()
+    loop = asyncio.get_running_loop()
+
+    async def fire(index: int, due: float) -> None:
+        chat_id = chat_ids[index % len(chat_ids)]
+        error = await _send_message(
+            client,
+            chat_id,
+            f"load-test-{chat_id}",
+            questions[index % len(questions)],
+            stream,
+        )
+        if error is None:
+            result.latencies.append(loop.time() - due)
+        else:
+            result.errors[error] += 1
+
+    started = loop.time()
+    for index in range(total):
+        due = started + index / rps
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        result.sent += 1
+        if len(in_flight) >= max_in_flight:
+            result.errors["client_saturated"] += 1
+            continue
+        task = asyncio.create_task(fire(index, due))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    result.elapsed_seconds = loop.time() - started
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Drive chat turns against a Market Mind backend at a target request rate. "
+            "Run the backend with FAKE_SERVICES=true to avoid OpenAI and DuckDuckGo."
+        )
+    )
+    parser.add_argument(
+        "--base-url", default="http://localhost:8000", help="Backend to load."
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Serve the app in this process instead (requires FAKE_SERVICES=true).",
+    )
+    parser.add_argument("--rps", type=float, default=5.0, help="Target requests per second.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load.")
+    parser.add_argument("--chats", type=int, default=20, help="Chats to spread turns over.")
+    parser.add_argument(
+        "--stream", action="store_true", help="Use the SSE endpoint and read every event."
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Per-request timeout in seconds."
+    )
+    parser.add_argument(
+        "--max-in-flight", type=int, default=1000, help="Client-side cap on open requests."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> LoadTestResult:
+    async with AsyncExitStack() as stack:
+        transport: httpx.AsyncBaseTransport | None = None
+        base_url = args.base_url
+        if args.in_process:
+            from app.core.config import get_settings
+            from app.main import app
+
+            settings = get_settings()
+            if not settings.fake_services:
+                raise SystemExit("--in-process needs FAKE_SERVICES=true.")
+            print(f"Serving in process against {settings.database_url}.", flush=True)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://load-test"
+
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                base_url=base_url,
+                transport=transport,
+                timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.max_in_flight),
+            )
+        )
+        chat_ids = await create_chats(client, args.chats)
+        return await run_load_test(
+            client,
+            rps=args.rps,
+            duration_seconds=args.duration,
+            chat_ids=chat_ids,
+            stream=args.stream,
+            max_in_flight=args.max_in_flight,
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    result = asyncio.run(_main(args))
+    summary = result.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    latency = summary["latency_seconds"]
+    print(
+        f"Sent {result.sent} turns at {result.target_rps:g} rps over "
+        f"{result.elapsed_seconds:.1f}s: {result.succeeded} ok, {result.failed} failed "
+        f"({result.error_rate:.1%}) {dict(result.errors) or ''}\n"
+        f"Throughput {result.throughput:.2f} rps; latency p50 {latency['p50']:.3f}s, "
+        f"p95 {latency['p95']:.3f}s, p99 {latency['p99']:.3f}s, max {latency['max']:.3f}s.",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
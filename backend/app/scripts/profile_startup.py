@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    depth: int
+    self_seconds: float
+    cumulative_seconds: float
+
+
+@dataclass
+class StartupProfile:
+    import_seconds: float
+    imports: list[ImportTiming] = field(default_factory=list)
+    agent_build_seconds: float | None = None
+    warm_up_seconds: float | None = None
+
+    def slowest(self, count: int, max_depth: int) -> list[ImportTiming]:
+        candidates = [timing for timing in self.imports if timing.depth <= max_depth]
+        return sorted(candidates, key=lambda timing: timing.cumulative_seconds, reverse=True)[
+            :count
+        ]
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse ``python -X importtime`` stderr into per-module timings."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped.strip(),
+                depth=(len(name) - len(stripped) - 1) // 2,
+                self_seconds=int(self_us) / 1_000_000,
+                cumulative_seconds=int(cumulative_us) / 1_000_000,
+            )
+        )
+    return timings
+
+
+def profile_imports(module: str) -> StartupProfile:
+    """Import ``module`` in a fresh interpreter and time every import it triggers."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    imports = parse_importtime(result.stderr)
+    total = sum(timing.cumulative_seconds for timing in imports if timing.depth == 0)
+    return StartupProfile(import_seconds=total, imports=imports)
+
+
+async def profile_warm_up(profile: StartupProfile) -> None:
+    """Time building and warming the agent, as the app does after startup."""
+    from app.services import get_agent_service
+
+    started = time.perf_counter()
+    agent_service = await asyncio.to_thread(get_agent_service)
+    profile.agent_build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    await agent_service.warm_up()
+    profile.warm_up_seconds = time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Profile backend start-up: module imports, then optionally agent warm-up."
+    )
+    parser.add_argument("--module", default="app.main", help="Module to import.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list.")
+    parser.add_argument(
+        "--depth", type=int, default=2, help="Only list imports nested this deep or less."
+    )
+    parser.add_argument(
+        "--warm-up",
+        action="store_true",
+        help="Also build and warm the agent (needs OPENAI_API_KEY or FAKE_SERVICES=true).",
+    )
+    parser.add_argument(
+        "--max-import-seconds",
+        type=float,
+        default=None,
+        help="Exit non-zero when the import takes longer, to catch regressions in CI.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the profile as JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    profile = profile_imports(args.module)
+    if args.warm_up:
+        asyncio.run(profile_warm_up(profile))
+
+    slowest = profile.slowest(args.top, args.depth)
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "module": args.module,
+                    "import_seconds": round(profile.import_seconds, 4),
+                    "agent_build_seconds": profile.agent_build_seconds,
+                    "warm_up_seconds": profile.warm_up_seconds,
+                    "slowest_imports": [
+                        {"module": timing.module, "seconds": round(timing.cumulative_seconds, 4)}
+                        for timing in slowest
+                    ],
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(f"import {args.module}: {profile.import_seconds:.3f}s", flush=True)
+        for timing in slowest:
+            print(f"  {timing.cumulative_seconds:8.3f}s  {'  ' * timing.depth}{timing.module}")
+        if profile.agent_build_seconds is not None:
+            print(
+                f"agent build: {profile.agent_build_seconds:.3f}s, "
+                f"warm-up: {profile.warm_up_seconds:.3f}s",
+                flush=True,
+            )
+
+    if args.max_import_seconds is not None and profile.import_seconds > args.max_import_seconds:
+        raise SystemExit(
+            f"import {args.module} took {profile.import_seconds:.3f}s "
+            f"(limit {args.max_import_seconds:.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,168 @@
 from __future__ import annotations
 
 import argparse
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Tuple
+from typing import Any
 
-from sqlalchemy import delete
+from sqlalchemy import and_, delete, func, or_, select
 
+from app.core.config import get_settings
+from app.core.logging import logger as app_logger
 from app.db import session_scope
-from app.models import ChatSession, Message
+from app.models import ChatSession, ContextBlob, Message
+
+logger = app_logger.getChild(__name__)
+
+# Chroma collections whose documents carry a ``chat_id`` in their metadata.
+VECTOR_COLLECTIONS = ("market-mind", "market-mind-answers")
+
+
+@dataclass
+class PurgeResult:
+    chats: int = 0
+    messages: int = 0
+    blobs: int = 0
+    vectors: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def chats_per_second(self) -> float:
+        return self.chats / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def open_vector_collections(names: Sequence[str] = VECTOR_COLLECTIONS) -> list[Any]:
+    """Existing Chroma collections to purge; no embedding model is needed to delete."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=str(get_settings().chroma_persist_path))
+    existing = {collection.name for collection in client.list_collections()}
+    return [client.get_collection(name) for name in names if name in existing]
+
+
+def _purge_vectors(collections: Sequence[Any], chat_ids: list[str], dry_run: bool) -> int:
+    where = {"chat_id": {"$in": chat_ids}}
+    removed = 0
+    for collection in collections:
+        try:
+            ids = collection.get(where=where, include=[])["ids"]
+            if ids and not dry_run:
+                collection.delete(ids=ids)
+            removed += len(ids)
+        except Exception as exc:  # pragma: no cover - chroma edge case
+            logger.warning("Failed to purge vectors from %s: %s", collection.name, exc)
+    return removed
+
+
+def _batch_blob_hashes(session: Any, chat_ids: list[str]) -> set[str]:
+    rows = session.execute(
+        select(Message.search_results_hash, Message.vector_context_hash).where(
+            Message.chat_session_id.in_(chat_ids),
+            or_(Message.search_results_hash.isnot(None), Message.vector_context_hash.isnot(None)),
+        )
+    )
+    return {value for row in rows for value in row if value is not None}
 
 
-def purge_chats(older_than_hours: int | None = None) -> Tuple[int, int]:
-    """Delete chats (and their messages) older than the provided cutoff."""
+def _unreferenced(hashes: set[str], excluding: list[str] | None = None) -> Any:
+    """Blobs in ``hashes`` no message refers to (ignoring chats in ``excluding``)."""
+    referenced = select(Message.id).where(
+        or_(
+            Message.search_results_hash == ContextBlob.hash,
+            Message.vector_context_hash == ContextBlob.hash,
+        )
+    )
+    if excluding:
+        referenced = referenced.where(Message.chat_session_id.notin_(excluding))
+    return and_(ContextBlob.hash.in_(hashes), ~referenced.exists())
+
+
+def purge_chats(
+    older_than_hours: int | None = None,
+    *,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    vector_collections: Sequence[Any] = (),
+    pause_seconds: float = 0.0,
+) -> PurgeResult:
+    """Delete chats last updated before the cutoff, with their messages and vectors.
+
+    Chats are selected by id in batches of ``batch_size``; each batch deletes the
+    messages of those chats, the context blobs no remaining message refers to, then
+    the chats themselves, and commits, so no lock is held for longer than one batch.
+    Vector memory for the batch is removed once the rows are gone. With ``dry_run``
+    nothing is deleted and the counts report what would be (blobs shared with chats
+    in a later batch are not counted).
+    """
     cutoff = None
     if older_than_hours is not None:
         cutoff = datetime.now(timezone.utc) - timedelta(hours=older_than_hours)
 
-    with session_scope() as session:
-        msg_stmt = delete(Message)
-        chat_stmt = delete(ChatSession)
-
-        if cutoff is not None:
-            msg_stmt = msg_stmt.where(Message.created_at < cutoff)
-            chat_stmt = chat_stmt.where(ChatSession.updated_at < cutoff)
-
-        msg_result = session.execute(msg_stmt)
-        chat_result = session.execute(chat_stmt)
-
-        deleted_messages = msg_result.rowcount or 0
-        deleted_chats = chat_result.rowcount or 0
-
-        return deleted_messages, deleted_chats
+    result = PurgeResult(dry_run=dry_run)
+    started = time.perf_counter()
+    last_id = ""
+    while True:
+        with session_scope() as session:
+            stmt = (
+                select(ChatSession.id)
+                .where(ChatSession.id > last_id)
+                .order_by(ChatSession.id)
+                .limit(batch_size)
+            )
+            if cutoff is not None:
+                stmt = stmt.where(ChatSession.updated_at < cutoff)
+            chat_ids = list(session.scalars(stmt))
+            if not chat_ids:
+                break
+            last_id = chat_ids[-1]
+            hashes = _batch_blob_hashes(session, chat_ids)
+
+            if dry_run:
+                result.messages += session.scalar(
+                    select(func.count())
+                    .select_from(Message)
+                    .where(Message.chat_session_id.in_(chat_ids))
+                ) or 0
+                if hashes:
+                    result.blobs += session.scalar(
+                        select(func.count())
+                        .select_from(ContextBlob)
+                        .where(_unreferenced(hashes, excluding=chat_ids))
+                    ) or 0
+            else:
+                deleted = session.execute(
+                    delete(Message).where(Message.chat_session_id.in_(chat_ids))
+                )
+                result.messages += deleted.rowcount or 0
+                if hashes:
+                    deleted = session.execute(
+                        delete(ContextBlob)
+                        .where(_unreferenced(hashes))
+                        .execution_options(synchronize_session=False)
+                    )
+                    result.blobs += deleted.rowcount or 0
+                session.execute(delete(ChatSession).where(ChatSession.id.in_(chat_ids)))
+            # session_scope commits here, ending the batch's transaction.
+
+        result.chats += len(chat_ids)
+        result.batches += 1
+        result.vectors += _purge_vectors(vector_collections, chat_ids, dry_run)
+        logger.info(
+            "Purge batch %d: %d chats (%d total).", result.batches, len(chat_ids), result.chats
+        )
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
 
 
 def parse_args() -> argparse.Namespace:
@@ -43,17 +175,44 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Only delete chats older than this many hours. Omit to delete everything.",
     )
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="Chats deleted per transaction."
+    )
+    parser.add_argument(
+        "--pause-seconds",
+        type=float,
+        default=0.0,
+        help="Sleep between batches to leave room for other writers.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count what would be deleted."
+    )
+    parser.add_argument(
+        "--skip-vectors",
+        action="store_true",
+        help="Leave vector memory alone (e.g. when Chroma is not mounted).",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    deleted_messages, deleted_chats = purge_chats(args.older_than_hours)
+    result = purge_chats(
+        args.older_than_hours,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        vector_collections=() if args.skip_vectors else open_vector_collections(),
+        pause_seconds=args.pause_seconds,
+    )
     scope = (
         f"older than {args.older_than_hours}h" if args.older_than_hours is not None else "all chats"
     )
+    verb = "Would purge" if result.dry_run else "Purged"
     print(
-        f"Purged {deleted_chats} chats and {deleted_messages} messages ({scope}).",
+        f"{verb} {result.chats} chats, {result.messages} messages, "
+        f"{result.blobs} context blobs and {result.vectors} vectors ({scope}) in {result.batches} batches, "
+        f"{result.elapsed_seconds:.1f}s ({result.chats_per_second:,.0f} chats/s, "
+        f"{result.messages_per_second:,.0f} messages/s).",
         flush=True,
     )
 
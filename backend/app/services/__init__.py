@@ -1,3 +1,17 @@
-from app.services.agent import AgentResponse, AgentService
+from app.services.agent import (
+    AgentResponse,
+    AgentService,
+    aget_agent_service,
+    agent_service_built,
+    get_agent_service,
+    reset_agent_service,
+)
 
-__all__ = ["AgentResponse", "AgentService"]
+__all__ = [
+    "AgentResponse",
+    "AgentService",
+    "aget_agent_service",
+    "agent_service_built",
+    "get_agent_service",
+    "reset_agent_service",
+]
@@ -1,25 +1,50 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import random
+import threading
+from collections.abc import AsyncIterator
+from functools import lru_cache
 from typing import Any
 
-from langchain_chroma import Chroma as ChromaVectorStore
-from langchain_community.tools import DuckDuckGoSearchResults
 from langchain_core.documents import Document
 from langchain_core.messages import AIMessage
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langfuse.langchain import CallbackHandler
-from langgraph.graph import END, StateGraph
 from pydantic import SecretStr
 
 from app.core.config import Settings, get_settings
 from app.core.logging import logger as app_logger
-from app.models.agent_response import AgentResponse
+from app.core.metrics import observe_stage, timed_stage
+from app.models.agent_response import AgentResponse, AgentStreamEvent
 from app.models.agent_state import AgentState
-from app.prompts import build_market_mind_prompt, build_chat_title_prompt
+from app.prompts import (
+    build_chat_summary_prompt,
+    build_chat_title_prompt,
+    build_market_mind_prompt,
+)
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.context_budget import ContextAssembler, TokenCounter
+from app.services.embedding_cache import CachedEmbeddings
+from app.services.llm_limiter import LLMConcurrencyLimiter, LLMOverloadedError
+from app.services.market_search import SearchUnavailableError, build_market_search
+from app.services.market_snapshots import MarketSnapshots, Watchlist
+from app.services.memory_indexer import MemoryIndexer
+from app.services.search_cache import SearchCache
+from app.services.vector_memory import VectorMemory
 
 logger = app_logger.getChild(__name__)
-langfuse_callback = CallbackHandler()
+
+SEARCH_TIMED_OUT = "Live market search timed out; proceeding with existing knowledge."
+SEARCH_UNAVAILABLE = "Live market search unavailable; proceeding with existing knowledge."
+
+
+# LangGraph and the OpenAI, Chroma, DuckDuckGo and Langfuse clients are imported
+# where they are built: together they are most of the app's import time, and the
+# agent itself is only built at warm-up (see ``get_agent_service``).
+@lru_cache(maxsize=1)
+def get_langfuse_callback() -> Any:
+    from langfuse.langchain import CallbackHandler
+
+    return CallbackHandler()
 
 
 class AgentService:
@@ -29,13 +54,53 @@ class AgentService:
         self.settings = settings or get_settings()
         self.llm = self._build_llm()
         self.embeddings = self._build_embeddings()
-        self.vector_store = self._build_vector_store()
+        self.vector_store = self._build_vector_store(
+            "market-mind", self._hnsw_configuration()
+        )
+        self.memory = self._build_memory()
+        self.answer_cache = self._build_answer_cache()
+        self.memory_indexer = MemoryIndexer(
+            self._write_memory_batch,
+            batch_size=self.settings.memory_index_batch_size,
+            flush_interval=self.settings.memory_index_flush_seconds,
+            max_queue=self.settings.memory_index_max_queue,
+        )
+        self.context_assembler = ContextAssembler(
+            TokenCounter(self.settings.openai_model),
+            budget=self.settings.prompt_token_budget,
+            search_max_tokens=self.settings.prompt_search_max_tokens,
+            history_max_tokens=self.settings.prompt_history_max_tokens,
+            memory_max_tokens=self.settings.prompt_memory_max_tokens,
+        )
+        self.llm_limiter = LLMConcurrencyLimiter(
+            max_concurrency=self.settings.llm_max_concurrency,
+            max_queue=self.settings.llm_max_queue,
+            queue_timeout=self.settings.llm_queue_timeout_seconds,
+        )
+        self.market_search = build_market_search(self.settings)
+        self.market_snapshots = self._build_market_snapshots()
+        self.search_cache = SearchCache(
+            ttl_seconds=self.settings.search_cache_ttl_seconds,
+            max_entries=self.settings.search_cache_max_entries,
+        )
         self.prompt = build_market_mind_prompt()
         self.title_prompt = build_chat_title_prompt()
+        self.summary_prompt = build_chat_summary_prompt()
         self.graph = self._build_graph()
 
     def _build_llm(self) -> Any:
+        if self.settings.fake_services:
+            from app.services.fakes import FakeChatModel, LatencyDistribution
+
+            logger.warning("FAKE_SERVICES is set; answering with the offline fake model.")
+            return FakeChatModel(
+                latency=LatencyDistribution.parse(self.settings.fake_llm_latency),
+                token_delay=self.settings.fake_llm_token_delay_seconds,
+                rng=self._fake_rng("llm"),
+            )
         if self.settings.openai_api_key not in {"", "changeme"}:
+            from langchain_openai import ChatOpenAI
+
             logger.info("Using ChatOpenAI for language model.")
             return ChatOpenAI(
                 model=self.settings.openai_model,
@@ -46,148 +111,444 @@ class AgentService:
         raise RuntimeError("OpenAI API key not configured.")
 
     def _build_embeddings(self) -> Any:
-        if self.settings.openai_api_key not in {"", "changeme"}:
+        if self.settings.fake_services:
+            from app.services.fakes import FakeEmbeddings, LatencyDistribution
+
+            logger.warning("FAKE_SERVICES is set; using offline fake embeddings.")
+            embeddings: Any = FakeEmbeddings(
+                LatencyDistribution.parse(self.settings.fake_embedding_latency),
+                rng=self._fake_rng("embeddings"),
+            )
+        elif self.settings.openai_api_key not in {"", "changeme"}:
+            from langchain_openai import OpenAIEmbeddings
+
             logger.info("Using OpenAIEmbeddings for vector memory.")
-            return OpenAIEmbeddings(
+            embeddings = OpenAIEmbeddings(
                 api_key=SecretStr(self.settings.openai_api_key),
-                model="text-embedding-3-small",
+                model=self.settings.embedding_model,
             )
-        logger.warning("Configure OPENAI_API_KEY for vector memory")
-        raise RuntimeError("OpenAI API key not configured.")
+        else:
+            logger.warning("Configure OPENAI_API_KEY for vector memory")
+            raise RuntimeError("OpenAI API key not configured.")
+        return CachedEmbeddings(
+            embeddings,
+            model=self.settings.embedding_model,
+            max_entries=self.settings.embedding_cache_max_entries,
+            disk_path=(
+                self.settings.embedding_cache_path
+                if self.settings.embedding_cache_on_disk
+                else None
+            ),
+        )
+
+    def _fake_rng(self, name: str) -> random.Random:
+        from app.services.fakes import seeded_rng
+
+        return seeded_rng(self.settings.fake_seed, name)
+
+    def _build_market_snapshots(self) -> MarketSnapshots | None:
+        watchlist = Watchlist(self.settings.market_watchlist)
+        if not watchlist.topics:
+            return None
+        from app.db import session as db_session
+
+        return MarketSnapshots(
+            db_session.async_engine,
+            watchlist,
+            max_age_seconds=self.settings.market_snapshot_max_age_seconds,
+        )
+
+    async def warm_up(self) -> None:
+        """Load what the first request would otherwise wait on.
+
+        Opens the Chroma collections, loads the tokenizer used for prompt budgets
+        and creates the Langfuse handler. Failures propagate so the readiness
+        probe can report them.
+        """
+        get_langfuse_callback()
+        await asyncio.to_thread(lambda: self.context_assembler.counter.encoding)
+        answer_store = self.answer_cache.vector_store if self.answer_cache else None
+        for store in (self.vector_store, answer_store):
+            if store is not None:
+                await asyncio.to_thread(store._collection.count)
+
+    def _build_vector_store(
+        self, collection_name: str, hnsw: dict[str, Any]
+    ) -> Any | None:
+        from langchain_chroma import Chroma as ChromaVectorStore
 
-    def _build_vector_store(self) -> Any | None:
         try:
             return ChromaVectorStore(
-                collection_name="market-mind",
+                collection_name=collection_name,
                 embedding_function=self.embeddings,
                 persist_directory=str(self.settings.chroma_persist_path),
+                collection_configuration={"hnsw": hnsw},
             )
         except RuntimeError as exc:
-            logger.warning("Chroma unavailable; disabling vector memory: %s", exc)
+            logger.warning("Chroma unavailable; disabling %s: %s", collection_name, exc)
         return None
 
+    def _build_memory(self) -> VectorMemory | None:
+        if self.vector_store is None:
+            return None
+        return VectorMemory(
+            self.vector_store,
+            self.embeddings,
+            ttl_seconds=self.settings.memory_ttl_seconds,
+            near_duplicate_threshold=self.settings.memory_near_duplicate_threshold,
+        )
+
+    def _build_answer_cache(self) -> SemanticAnswerCache | None:
+        if not self.settings.answer_cache_enabled:
+            return None
+        # Cosine space so the threshold reads as a plain similarity in [0, 1].
+        store = self._build_vector_store("market-mind-answers", {"space": "cosine"})
+        if store is None:
+            return None
+        return SemanticAnswerCache(
+            store,
+            self.embeddings,
+            similarity_threshold=self.settings.answer_cache_similarity_threshold,
+            ttl_seconds=self.settings.answer_cache_ttl_seconds,
+        )
+
+    def _hnsw_configuration(self) -> dict[str, Any]:
+        tuning = {
+            "space": self.settings.chroma_hnsw_space,
+            "ef_construction": self.settings.chroma_hnsw_ef_construction,
+            "ef_search": self.settings.chroma_hnsw_ef_search,
+            "max_neighbors": self.settings.chroma_hnsw_max_neighbors,
+        }
+        return {key: value for key, value in tuning.items() if value is not None}
+
     def _build_graph(self):
+        from langgraph.graph import END, START, StateGraph
+
         graph = StateGraph(AgentState)
-        graph.add_node("search_market", self._search_market)
-        graph.add_node("retrieve_memory", self._retrieve_memory)
-        graph.add_node("compose_answer", self._compose_answer)
-        graph.set_entry_point("search_market")
-        graph.add_edge("search_market", "retrieve_memory")
-        graph.add_edge("retrieve_memory", "compose_answer")
+        for name, node in (
+            ("search_market", self._search_market),
+            ("retrieve_memory", self._retrieve_memory),
+            ("compose_answer", self._compose_answer),
+        ):
+            graph.add_node(name, timed_stage(name)(node))
+        # Web search and vector retrieval are independent: fan out, then join.
+        graph.add_edge(START, "search_market")
+        graph.add_edge(START, "retrieve_memory")
+        graph.add_edge(["search_market", "retrieve_memory"], "compose_answer")
         graph.add_edge("compose_answer", END)
         return graph.compile()
 
-    def _search_market(self, state: AgentState) -> AgentState:
+    async def _search_market(self, state: AgentState) -> AgentState:
         if self.settings.environment == "test":
-            state["search_results"] = ["Test mode: market data unavailable."]
-            return state
+            return {"search_results": ["Test mode: market data unavailable."]}
 
         query = state.get("question") or ""
-        results: list[str] = []
-        raw = ""
-        try:
-            search = DuckDuckGoSearchResults()
-            raw = search.run(query, max_results=3)
-
-            try:
-                items = json.loads(raw)
-                for item in items:
-                    title = item.get("title")
-                    snippet = item.get("body")
-                    source = item.get("source")
-                    if title or snippet:
-                        results.append(f"{title} - {snippet} (source: {source})")
-            except (json.JSONDecodeError, ValueError):
-                # Fallback when the search tool returns plain text or HTML instead of JSON.
-                text = (raw or "").strip()
-                if text:
-                    lines = [line.strip() for line in text.splitlines() if line.strip()]
-                    # Keep a few concise lines as results
-                    for line in lines[:3]:
-                        results.append(
-                            line if len(line) <= 1000 else line[:1000] + "..."
-                        )
-                else:
-                    results.append("Live market search returned no parsable results.")
-        except Exception as exc:  # pragma: no cover - network dependent
-            logger.warning("DuckDuckGo search failed: %s", exc)
-            if raw:
-                # Include a short excerpt of raw output to aid debugging but avoid huge payloads.
-                results.append(f"Live market search returned raw output: {raw[:1000]}")
-            else:
-                results.append(
-                    "Live market search unavailable; proceeding with existing knowledge."
-                )
+        if self.market_snapshots is not None:
+            snapshot = await self.market_snapshots.lookup(query)
+            if snapshot is not None:
+                return {"search_results": snapshot or ["No recent market results."]}
 
-        state["search_results"] = results
-        return state
+        timeout = self.settings.search_timeout_seconds
+        try:
+            results = await asyncio.wait_for(
+                self.search_cache.get_or_fetch(
+                    query,
+                    self.settings.duckduckgo_region,
+                    lambda: self.market_search.search(query),
+                ),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Market search timed out after %.1fs", timeout)
+            results = [SEARCH_TIMED_OUT]
+        except SearchUnavailableError as exc:
+            logger.warning("Market search unavailable: %s", exc)
+            results = [SEARCH_UNAVAILABLE]
+        if not results:
+            results = ["Live market search returned no results."]
+        return {"search_results": results}
 
-    def _retrieve_memory(self, state: AgentState) -> AgentState:
+    async def _retrieve_memory(self, state: AgentState) -> AgentState:
         question = state.get("question") or ""
         docs: list[Document] = []
-        if question and self.vector_store:
+        if question and self.memory:
+            timeout = self.settings.memory_timeout_seconds
+            where = self.memory.retrieval_filter(self._memory_filter(state))
             try:
-                docs = self.vector_store.similarity_search(question, k=4)
+                docs = await asyncio.wait_for(
+                    self._similarity_search(question, where),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Vector store retrieval timed out after %.1fs", timeout)
             except Exception as exc:  # pragma: no cover - chroma edge case
                 logger.warning("Vector store retrieval failed: %s", exc)
-        state["vector_context"] = (
-            "\n---\n".join(doc.page_content for doc in docs) if docs else "None"
-        )
-        return state
+        return {
+            "vector_context": (
+                "\n---\n".join(doc.page_content for doc in docs) if docs else "None"
+            )
+        }
 
-    def _compose_answer(self, state: AgentState) -> AgentState:
-        chain = self.prompt | self.llm
-        rendered = chain.invoke(
-            {
-                "history": state.get("history", "None"),
-                "vector_context": state.get("vector_context", "None"),
-                "search_results": "\n".join(state.get("search_results", []))
-                or "No live data found.",
-                "question": state.get("question", ""),
-            },
-            config={"callbacks": [langfuse_callback]},
+    def _memory_filter(self, state: AgentState) -> dict[str, str] | None:
+        """Restrict retrieval to the configured scope using indexed metadata."""
+        scope = self.settings.memory_scope
+        if scope == "chat" and state.get("chat_id"):
+            return {"chat_id": state["chat_id"]}
+        if scope == "user" and state.get("user_id"):
+            return {"user_id": state["user_id"]}
+        return None
+
+    async def _similarity_search(
+        self, question: str, where: dict[str, Any] | None
+    ) -> list[Document]:
+        # Embed through the shared cache so the vector computed when the question
+        # was indexed (or asked before) is reused instead of re-embedded.
+        embedding = await self.embeddings.aembed_query(question)
+        k = self.settings.memory_top_k
+        if self.settings.memory_use_mmr:
+            with observe_stage("chroma_query"):
+                return await self.vector_store.amax_marginal_relevance_search_by_vector(
+                    embedding,
+                    k=k,
+                    fetch_k=self.settings.memory_mmr_fetch_k,
+                    lambda_mult=self.settings.memory_mmr_lambda,
+                    filter=where,
+                )
+
+        threshold = self.settings.memory_score_threshold
+        if threshold is None:
+            with observe_stage("chroma_query"):
+                return await self.vector_store.asimilarity_search_by_vector(
+                    embedding, k=k, filter=where
+                )
+
+        with observe_stage("chroma_query"):
+            scored = await asyncio.to_thread(
+                self.vector_store.similarity_search_by_vector_with_relevance_scores,
+                embedding,
+                k,
+                where,
+            )
+        # Chroma returns distances; map them onto [0, 1] relevance for the threshold.
+        relevance = self.vector_store._select_relevance_score_fn()
+        return [doc for doc, distance in scored if relevance(distance) >= threshold]
+
+    async def _compose_answer(self, state: AgentState) -> AgentState:
+        context = self.context_assembler.assemble(
+            question=state.get("question", ""),
+            search_results=state.get("search_results", []),
+            history=state.get("history", ""),
+            vector_context=state.get("vector_context", "None"),
         )
+        chain = self.prompt | self.llm
+        async with self.llm_limiter.slot():
+            rendered = await chain.ainvoke(
+                {
+                    "history": context.history,
+                    "vector_context": context.vector_context,
+                    "search_results": context.search_results,
+                    "question": context.question,
+                },
+                config={"callbacks": [get_langfuse_callback()]},
+            )
         if isinstance(rendered, AIMessage):
-            state["answer"] = str(rendered.content)
+            answer = str(rendered.content)
         else:  # pragma: no cover - depends on LLM interface
-            state["answer"] = str(rendered)
-        return state
+            answer = str(rendered)
+        return {"answer": answer}
+
+    async def persist_memory(
+        self, chat_id: str, role: str, content: str, user_id: str | None = None
+    ) -> None:
+        """Index messages into the vector store for long-term recall.
 
-    def persist_memory(self, chat_id: str, role: str, content: str) -> None:
-        """Index messages into the vector store for long-term recall."""
+        While the background indexer is running this only enqueues the text, and
+        drops it when the queue is full; otherwise (scripts, tests) it is written
+        immediately.
+        """
         if not self.vector_store:
             return
-        metadata = {"chat_id": chat_id, "role": role}
+        metadata = {"chat_id": chat_id, "role": role, "user_id": user_id or chat_id}
+        if self.memory_indexer.running:
+            # A full queue means the indexer is behind; writing inline would only
+            # move that load onto the request path.
+            self.memory_indexer.enqueue(content, metadata)
+            return
         try:
-            self.vector_store.add_texts([content], metadatas=[metadata])
+            await self._write_memory_batch([content], [metadata])
         except Exception as exc:  # pragma: no cover - external dependency
             logger.warning("Failed to persist memory: %s", exc)
 
-    def generate_response(
+    async def _write_memory_batch(
+        self, texts: list[str], metadatas: list[dict[str, Any]]
+    ) -> None:
+        if self.memory:
+            await self.memory.write(texts, metadatas)
+
+    def _answer_cache_scope(self, user_id: str, history: str) -> str | None:
+        """Who may share a cached answer for this turn; ``None`` skips the cache.
+
+        Follow-up turns depend on their conversation, so only a chat's opening
+        question is cached. Its answer can still draw on vector memory, so entries
+        are partitioned like retrieval is: per user for the user scope, and shared
+        for the global scope. Under the chat scope an opening question has no chat
+        memory to draw on, so its answer depends only on the question and live data.
+        """
+        if history.strip():
+            return None
+        if self.settings.memory_scope == "user":
+            return f"user:{user_id}"
+        return "global"
+
+    async def _lookup_cached_answer(self, question: str, scope: str | None) -> AgentResponse | None:
+        if not self.answer_cache or scope is None:
+            return None
+        try:
+            return await asyncio.wait_for(
+                self.answer_cache.lookup(question, scope),
+                timeout=self.settings.memory_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Answer cache lookup timed out.")
+        except Exception as exc:  # pragma: no cover - chroma edge case
+            logger.warning("Answer cache lookup failed: %s", exc)
+        return None
+
+    async def _store_cached_answer(
+        self,
+        question: str,
+        scope: str | None,
+        response: AgentResponse,
+        *,
+        chat_id: str,
+        user_id: str,
+    ) -> None:
+        if not self.answer_cache or scope is None:
+            return
+        if {SEARCH_TIMED_OUT, SEARCH_UNAVAILABLE} & set(response.search_results):
+            # Answered without live data; the next asker should get a fresh attempt.
+            return
+        try:
+            await self.answer_cache.store(
+                question, scope, response, chat_id=chat_id, user_id=user_id
+            )
+        except Exception as exc:  # pragma: no cover - chroma edge case
+            logger.warning("Failed to cache answer: %s", exc)
+
+    async def generate_response(
         self, *, chat_id: str, user_id: str, history: str, prompt: str
     ) -> AgentResponse:
         """Generates an agent response given the user prompt and chat history."""
+        cache_scope = self._answer_cache_scope(user_id, history)
+        cached = await self._lookup_cached_answer(prompt, cache_scope)
+        if cached is not None:
+            return cached
+
         try:
-            state = self.graph.invoke(
-                {"question": prompt, "history": history},
-                config={"callbacks": [langfuse_callback]},
+            state = await self.graph.ainvoke(
+                {
+                    "chat_id": chat_id,
+                    "user_id": user_id,
+                    "question": prompt,
+                    "history": history,
+                },
+                config={"callbacks": [get_langfuse_callback()]},
             )
             answer = state.get("answer", "I was unable to generate an answer.")
             search_summary = state.get("search_results", [])
             vector_context = state.get("vector_context", "")
 
+        except LLMOverloadedError:
+            raise
         except Exception as exc:
             logger.exception("Agent generation failed: %s", exc)
 
-            answer = "I encountered an internal error while generating a response."
-            search_summary = ["Agent pipeline failed"]
-            vector_context = "None"
+            return AgentResponse(
+                answer="I encountered an internal error while generating a response.",
+                search_results=["Agent pipeline failed"],
+                vector_context="None",
+            )
 
-        return AgentResponse(
+        response = AgentResponse(
             answer=answer, search_results=search_summary, vector_context=vector_context
         )
+        await self._store_cached_answer(
+            prompt, cache_scope, response, chat_id=chat_id, user_id=user_id
+        )
+        return response
+
+    async def stream_response(
+        self, *, chat_id: str, user_id: str, history: str, prompt: str
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Stream workflow progress and answer tokens, ending with an ``answer`` event.
+
+        When the LLM queue rejects the turn, the stream ends after an ``error`` event
+        without an answer.
+        """
+        cache_scope = self._answer_cache_scope(user_id, history)
+        cached = await self._lookup_cached_answer(prompt, cache_scope)
+        if cached is not None:
+            yield AgentStreamEvent("token", {"content": cached.answer})
+            yield AgentStreamEvent("answer", response=cached)
+            return
+
+        state: AgentState = {}
+        try:
+            async for mode, chunk in self.graph.astream(
+                {
+                    "chat_id": chat_id,
+                    "user_id": user_id,
+                    "question": prompt,
+                    "history": history,
+                },
+                config={"callbacks": [get_langfuse_callback()]},
+                stream_mode=["updates", "messages"],
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    node = metadata.get("langgraph_node")
+                    if node == "compose_answer" and message.content:
+                        yield AgentStreamEvent("token", {"content": str(message.content)})
+                    continue
+
+                for node, update in chunk.items():
+                    state.update(update or {})
+                    if node == "search_market":
+                        yield AgentStreamEvent(
+                            "search", {"results": state.get("search_results", [])}
+                        )
+                    elif node == "retrieve_memory":
+                        yield AgentStreamEvent(
+                            "memory", {"context": state.get("vector_context", "None")}
+                        )
+
+            response = AgentResponse(
+                answer=state.get("answer", "I was unable to generate an answer."),
+                search_results=state.get("search_results", []),
+                vector_context=state.get("vector_context", ""),
+            )
+            await self._store_cached_answer(
+                prompt, cache_scope, response, chat_id=chat_id, user_id=user_id
+            )
+        except LLMOverloadedError as exc:
+            logger.warning("Agent streaming rejected: LLM queue is full.")
+            # No answer event: the caller must not record this turn.
+            yield AgentStreamEvent(
+                "error", {"detail": str(exc), "retry_after": exc.retry_after}
+            )
+            return
+        except Exception as exc:
+            logger.exception("Agent streaming failed: %s", exc)
+            yield AgentStreamEvent("error", {"detail": "Agent pipeline failed"})
+            response = AgentResponse(
+                answer="I encountered an internal error while generating a response.",
+                search_results=["Agent pipeline failed"],
+                vector_context="None",
+            )
+
+        yield AgentStreamEvent("answer", response=response)
 
-    def suggest_title(self, history: str) -> str:
+    async def suggest_title(self, history: str) -> str:
         """Generate a concise chat title from the conversation history."""
         history = history.strip()
         if not history:
@@ -195,13 +556,16 @@ class AgentService:
 
         try:
             chain = self.title_prompt | self.llm
-            rendered = chain.invoke(
-                {"history": history}, config={"callbacks": [langfuse_callback]}
-            )
+            async with self.llm_limiter.slot():
+                rendered = await chain.ainvoke(
+                    {"history": history}, config={"callbacks": [get_langfuse_callback()]}
+                )
             if isinstance(rendered, AIMessage):
                 title = str(rendered.content).strip()
             else:  # pragma: no cover - depends on LLM interface
                 title = str(rendered).strip()
+        except LLMOverloadedError:
+            raise
         except Exception as exc:  # pragma: no cover - LLM or tool failure
             logger.warning("Failed to generate chat title: %s", exc)
             title = ""
@@ -211,3 +575,67 @@ class AgentService:
             preview = history.splitlines()[0] if history else "Market Mind Chat"
             cleaned = preview[:60].rstrip()
         return cleaned or "Market Mind Chat"
+
+    async def summarize_history(self, summary: str | None, messages: str) -> str | None:
+        """Fold new messages into a rolling summary; ``None`` when the LLM fails."""
+        if not messages.strip():
+            return summary
+
+        try:
+            chain = self.summary_prompt | self.llm
+            async with self.llm_limiter.slot():
+                rendered = await chain.ainvoke(
+                    {"summary": summary or "None", "messages": messages},
+                    config={"callbacks": [get_langfuse_callback()]},
+                )
+            if isinstance(rendered, AIMessage):
+                updated = str(rendered.content).strip()
+            else:  # pragma: no cover - depends on LLM interface
+                updated = str(rendered).strip()
+        except Exception as exc:  # pragma: no cover - LLM or tool failure
+            logger.warning("Failed to update conversation summary: %s", exc)
+            return None
+        return updated or None
+
+
+_agent_service: AgentService | None = None
+_agent_service_lock = threading.Lock()
+
+
+def get_agent_service() -> AgentService:
+    """The process-wide agent, built on first use.
+
+    The app builds it during warm-up (see ``app.main``) so requests do not pay
+    for it; scripts and tests get it on demand. The lock keeps a request that
+    arrives mid-warm-up from building a second one.
+    """
+    global _agent_service
+    if _agent_service is None:
+        with _agent_service_lock:
+            if _agent_service is None:
+                _agent_service = AgentService()
+    return _agent_service
+
+
+async def aget_agent_service() -> AgentService:
+    """``get_agent_service`` for coroutines.
+
+    A request that arrives while warm-up is still building the agent waits for
+    it in a worker thread, so the event loop keeps serving other requests and
+    ``/ready`` in the meantime.
+    """
+    if _agent_service is not None:
+        return _agent_service
+    return await asyncio.to_thread(get_agent_service)
+
+
+def agent_service_built() -> bool:
+    """Whether ``get_agent_service`` has built the agent yet, without building it."""
+    return _agent_service is not None
+
+
+def reset_agent_service() -> None:
+    """Forget the built agent so the next ``get_agent_service`` uses fresh settings."""
+    global _agent_service
+    with _agent_service_lock:
+        _agent_service = None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.logging import logger as app_logger
+from app.core.metrics import observe_stage
+from app.models.agent_response import AgentResponse
+
+logger = app_logger.getChild(__name__)
+
+
+@dataclass
+class AnswerCacheStats:
+    hits: int
+    misses: int
+    stores: int
+    similarity_threshold: float
+    ttl_seconds: float
+
+
+class SemanticAnswerCache:
+    """Reuses recent answers to questions that embed close to the new one.
+
+    Questions are stored in their own Chroma collection (cosine space) with the
+    answer in the metadata. A lookup only considers entries in the caller's
+    ``scope`` that are younger than ``ttl_seconds``, and accepts the closest one
+    if its cosine similarity reaches ``similarity_threshold``. The scope decides
+    who may share an answer; see ``AgentService._answer_cache_scope``.
+    """
+
+    # Expired entries are swept once every this many stores.
+    prune_every = 100
+
+    def __init__(
+        self,
+        vector_store: Any,
+        embeddings: Embeddings,
+        similarity_threshold: float,
+        ttl_seconds: float,
+    ) -> None:
+        self.vector_store = vector_store
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    async def lookup(self, question: str, scope: str) -> AgentResponse | None:
+        now = time.time()
+        embedding = await self.embeddings.aembed_query(question)
+        with observe_stage("chroma_query"):
+            scored = await asyncio.to_thread(
+                self.vector_store.similarity_search_by_vector_with_relevance_scores,
+                embedding,
+                1,
+                {
+                    "$and": [
+                        {"scope": scope},
+                        {"created_at": {"$gte": now - self.ttl_seconds}},
+                    ]
+                },
+            )
+        if not scored:
+            self.misses += 1
+            return None
+
+        doc, distance = scored[0]
+        similarity = self.vector_store._select_relevance_score_fn()(distance)
+        if similarity < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        metadata = doc.metadata
+        return AgentResponse(
+            answer=metadata["answer"],
+            search_results=json.loads(metadata.get("search_results") or "[]"),
+            vector_context=metadata.get("vector_context") or "None",
+            answer_cache={
+                "hit": True,
+                "similarity": round(similarity, 4),
+                "age_seconds": round(now - float(metadata["created_at"]), 1),
+            },
+        )
+
+    async def store(
+        self,
+        question: str,
+        scope: str,
+        response: AgentResponse,
+        *,
+        chat_id: str,
+        user_id: str,
+    ) -> None:
+        metadata = {
+            "scope": scope,
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "answer": response.answer,
+            "search_results": json.dumps(response.search_results),
+            "vector_context": response.vector_context,
+            "created_at": time.time(),
+        }
+        # The question was embedded by ``lookup``; the embedding cache serves it again.
+        with observe_stage("chroma_add"):
+            await self.vector_store.aadd_texts([question], metadatas=[metadata])
+        self.stores += 1
+        if self.stores % self.prune_every == 0:
+            await asyncio.to_thread(self.prune)
+
+    def prune(self) -> int:
+        """Delete entries older than the TTL; returns how many were removed."""
+        expired = self.vector_store.get(
+            where={"created_at": {"$lt": time.time() - self.ttl_seconds}}, include=[]
+        )
+        ids = expired.get("ids") or []
+        if ids:
+            self.vector_store.delete(ids=ids)
+        return len(ids)
+
+    def stats(self) -> AnswerCacheStats:
+        return AnswerCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            stores=self.stores,
+            similarity_threshold=self.similarity_threshold,
+            ttl_seconds=self.ttl_seconds,
+        )
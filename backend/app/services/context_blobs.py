@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import Any
+
+from app.models import ContextBlob
+
+# Assistant message context moved out of ``Message.metadata`` into context_blobs,
+# by field name; each maps to the ``Message`` column holding the blob's hash.
+CONTEXT_FIELDS = {
+    "search_results": "search_results_hash",
+    "vector_context": "vector_context_hash",
+}
+# Smaller payloads are stored as plain JSON; zlib rarely pays for its header there.
+COMPRESS_MIN_BYTES = 256
+
+
+def encode_context(value: Any, compress: bool = True) -> ContextBlob:
+    """Build the (unsaved) blob for a context value, keyed by its content hash."""
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode()
+    digest = hashlib.sha256(raw).hexdigest()
+    if compress and len(raw) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            return ContextBlob(hash=digest, encoding="zlib", size=len(raw), data=packed)
+    return ContextBlob(hash=digest, encoding="json", size=len(raw), data=raw)
+
+
+def decode_context(blob: ContextBlob) -> Any:
+    raw = zlib.decompress(blob.data) if blob.encoding == "zlib" else blob.data
+    return json.loads(raw)
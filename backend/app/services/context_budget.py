@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from cachetools import LRUCache
+
+from app.core.logging import logger as app_logger
+from app.services.conversation import RECENT_MESSAGES_HEADER, SUMMARY_HEADER
+
+logger = app_logger.getChild(__name__)
+
+MEMORY_SEPARATOR = "\n---\n"
+# Each message in a transcript starts a line with its role (see format_messages);
+# continuation lines of a multi-line message do not.
+MESSAGE_START = re.compile(r"^(?=(?:user|assistant|system): )", re.MULTILINE)
+
+
+class TokenCounter:
+    """Counts tokens with the model's tiktoken encoding, caching counts per text.
+
+    History messages and memory chunks recur on every turn of a chat, so their counts
+    are served from an LRU cache. When no encoding can be loaded (unknown model,
+    or no network to fetch the BPE file), text is estimated at four characters
+    per token.
+    """
+
+    chars_per_token = 4
+
+    def __init__(self, model: str, max_entries: int = 10000) -> None:
+        self.model = model
+        self._encoding: Any | None = None
+        self._loaded = False
+        self._counts: LRUCache[str, int] = LRUCache(maxsize=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def encoding(self) -> Any | None:
+        if not self._loaded:
+            self._loaded = True
+            try:
+                import tiktoken
+
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as exc:  # pragma: no cover - offline or missing tiktoken
+                logger.warning("tiktoken unavailable; estimating token counts: %s", exc)
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        cached = self._counts.get(text)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        encoding = self.encoding
+        if encoding is not None:
+            tokens = len(encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = -(-len(text) // self.chars_per_token)
+        self._counts[text] = tokens
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Keep roughly the first ``max_tokens`` tokens of ``text``."""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        encoding = self.encoding
+        if encoding is not None:
+            head = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+        else:
+            head = text[: max_tokens * self.chars_per_token]
+        return head.rstrip() + "..."
+
+
+@dataclass
+class PromptContext:
+    """The prompt variables after budgeting, with the tokens each section used."""
+
+    question: str
+    search_results: str
+    history: str
+    vector_context: str
+    tokens: dict[str, int] = field(default_factory=dict)
+    dropped: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+
+class ContextAssembler:
+    """Fits the Market Mind prompt variables into a fixed token budget.
+
+    Sections are filled in priority order, each up to its own cap and never past
+    what is left of ``budget``:
+
+    1. the question, always kept whole;
+    2. live search results, whole results in rank order;
+    3. conversation history: the rolling summary, then the newest messages;
+    4. vector memory, whole chunks in relevance order.
+
+    Whatever does not fit is dropped from the lowest-value end of its section
+    (oldest messages, lowest-ranked results and chunks).
+    """
+
+    # A leading item too long for its section is cut down, unless the room left
+    # is smaller than this and the fragment would be noise.
+    min_fragment_tokens = 32
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        budget: int,
+        search_max_tokens: int,
+        history_max_tokens: int,
+        memory_max_tokens: int,
+    ) -> None:
+        self.counter = counter
+        self.budget = budget
+        self.search_max_tokens = search_max_tokens
+        self.history_max_tokens = history_max_tokens
+        self.memory_max_tokens = memory_max_tokens
+
+    def assemble(
+        self,
+        *,
+        question: str,
+        search_results: Sequence[str],
+        history: str,
+        vector_context: str,
+    ) -> PromptContext:
+        context = PromptContext(question, "", "", "")
+        remaining = self.budget
+
+        context.tokens["question"] = self.counter.count(question)
+        remaining -= context.tokens["question"]
+
+        results, used, dropped = self._fit_items(
+            list(search_results), min(self.search_max_tokens, remaining)
+        )
+        context.search_results = "\n".join(results) or "No live data found."
+        context.tokens["search_results"], context.dropped["search_results"] = used, dropped
+        remaining -= used
+
+        context.history, used, dropped = self._fit_history(
+            history, min(self.history_max_tokens, remaining)
+        )
+        context.tokens["history"], context.dropped["history"] = used, dropped
+        remaining -= used
+
+        chunks = [] if vector_context in ("", "None") else vector_context.split(MEMORY_SEPARATOR)
+        chunks, used, dropped = self._fit_items(chunks, min(self.memory_max_tokens, remaining))
+        context.vector_context = MEMORY_SEPARATOR.join(chunks) or "None"
+        context.tokens["vector_context"], context.dropped["vector_context"] = used, dropped
+
+        if any(context.dropped.values()):
+            logger.debug(
+                "Prompt context trimmed to %d tokens; dropped %s.",
+                context.total_tokens,
+                context.dropped,
+            )
+        return context
+
+    def _fit_items(self, items: list[str], limit: int) -> tuple[list[str], int, int]:
+        """Keep leading items while they fit; a first item that is too long is cut."""
+        kept: list[str] = []
+        used = 0
+        for item in items:
+            tokens = self.counter.count(item)
+            if used + tokens > limit:
+                if not kept and limit >= self.min_fragment_tokens:
+                    head = self.counter.truncate(item, limit)
+                    kept.append(head)
+                    used = self.counter.count(head)
+                break
+            kept.append(item)
+            used += tokens
+        return kept, used, len(items) - len(kept)
+
+    def _fit_history(self, history: str, limit: int) -> tuple[str, int, int]:
+        """Keep the summary (cut to half the limit), then the newest whole messages."""
+        summary, transcript = "", history
+        if history.startswith(SUMMARY_HEADER) and RECENT_MESSAGES_HEADER in history:
+            summary, transcript = history.split(RECENT_MESSAGES_HEADER, 1)
+            summary = self.counter.truncate(summary, limit // 2)
+
+        used = 0
+        if summary:
+            used = self.counter.count(summary) + self.counter.count(RECENT_MESSAGES_HEADER)
+        messages = [
+            message.rstrip("\n") for message in MESSAGE_START.split(transcript) if message.strip()
+        ]
+        kept: list[str] = []
+        for message in reversed(messages):
+            tokens = self.counter.count(message) + 1  # the joining newline
+            if used + tokens > limit:
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+        dropped = len(messages) - len(kept)
+
+        text = "\n".join(kept)
+        if summary:
+            text = f"{summary}{RECENT_MESSAGES_HEADER}{text}"
+        return text or "None", used, dropped
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+from app.core.logging import logger as app_logger
+from app.db import session as db_session
+from app.models import ChatSession, Message
+from app.repositories import ChatRepository
+
+if TYPE_CHECKING:
+    from app.services.agent import AgentService
+
+logger = app_logger.getChild(__name__)
+
+# Recent messages a title is generated from.
+TITLE_HISTORY_MESSAGES = 12
+
+SUMMARY_HEADER = "Summary of earlier conversation:\n"
+RECENT_MESSAGES_HEADER = "\n\nRecent messages:\n"
+
+
+def format_messages(messages: Sequence[Message]) -> str:
+    return "\n".join(f"{msg.role}: {msg.content}" for msg in messages)
+
+
+def build_history_text(chat: ChatSession, recent_messages: Sequence[Message]) -> str:
+    """Combine the chat's rolling summary with its most recent raw messages."""
+    transcript = format_messages(recent_messages)
+    if not chat.summary:
+        return transcript
+    return f"{SUMMARY_HEADER}{chat.summary}{RECENT_MESSAGES_HEADER}{transcript}"
+
+
+async def refresh_chat_summary(
+    agent_service: AgentService,
+    chat_id: str,
+    window: int,
+    batch_size: int,
+) -> None:
+    """Fold messages that left the raw history window into the chat summary.
+
+    Runs after a turn has been answered. Folding only happens once at least
+    ``batch_size`` messages have dropped out of the window, so the summary costs
+    one small LLM call every few turns rather than one per turn.
+    """
+    async with db_session.AsyncSessionLocal() as session:
+        repo = ChatRepository(session)
+        chat = await repo.get_session(chat_id)
+        if not chat:
+            return
+
+        summarized = chat.summarized_message_count or 0
+        fold_until = chat.message_count - window
+        if fold_until - summarized < batch_size:
+            return
+
+        pending = await repo.list_messages_after(
+            chat_id, chat.summarized_through_id, limit=fold_until - summarized
+        )
+        if not pending:
+            return
+        summary = await agent_service.summarize_history(
+            chat.summary, format_messages(pending)
+        )
+        if summary is None:
+            return
+
+        updated = await repo.update_session_summary(
+            chat_id,
+            summary,
+            summarized_message_count=summarized + len(pending),
+            summarized_through_id=pending[-1].id,
+            expected_message_count=summarized,
+        )
+        if not updated:
+            logger.info("Chat %s summary advanced concurrently; skipping.", chat_id)
+
+
+async def generate_chat_title(agent_service: AgentService, chat_id: str) -> None:
+    """Retitle a chat from its recent messages; used by the background scheduler.
+
+    The database session is released while the LLM runs.
+    """
+    async with db_session.AsyncSessionLocal() as session:
+        recent_messages = await ChatRepository(session).list_recent_messages(
+            chat_id, limit=TITLE_HISTORY_MESSAGES
+        )
+    if not recent_messages:
+        return
+
+    title = await agent_service.suggest_title(format_messages(recent_messages))
+
+    async with db_session.AsyncSessionLocal() as session:
+        await ChatRepository(session).update_session_title(chat_id, title)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+from app.core.logging import logger as app_logger
+from app.core.metrics import observe_stage
+
+logger = app_logger.getChild(__name__)
+
+
+@dataclass
+class EmbeddingCacheStats:
+    hits: int
+    disk_hits: int
+    misses: int
+    size: int
+    max_size: int
+    disk_enabled: bool
+
+
+class _DiskEmbeddingStore:
+    """SQLite-backed second tier so vectors survive restarts."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+        found: dict[str, list[float]] = {}
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            found[key] = vector.tolist()
+        return found
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        if not items:
+            return
+        rows = [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that caches vectors by content hash and model name.
+
+    Indexing and retrieval share the cache, so a question embedded for
+    ``persist_memory`` is reused by the similarity search (and vice versa).
+    This relies on query and document embeddings being identical, which holds
+    for OpenAI embedding models.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        max_entries: int,
+        disk_path: Path | None = None,
+    ) -> None:
+        self.underlying = underlying
+        self.model = model
+        self.max_entries = max_entries
+        self._memory: LRUCache[str, list[float]] = LRUCache(maxsize=max_entries)
+        self._disk = _DiskEmbeddingStore(disk_path) if disk_path else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key_for(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup_memory(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    found[key] = vector
+            self.hits += len(found)
+        return found
+
+    def _remember(self, items: dict[str, list[float]]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+
+    def _lookup_disk(self, keys: list[str]) -> dict[str, list[float]]:
+        if not self._disk or not keys:
+            return {}
+        try:
+            found = self._disk.get_many(keys)
+        except sqlite3.Error as exc:  # pragma: no cover - disk edge case
+            logger.warning("Embedding disk cache read failed: %s", exc)
+            return {}
+        with self._lock:
+            self.disk_hits += len(found)
+        self._remember(found)
+        return found
+
+    def _store(self, items: dict[str, list[float]]) -> None:
+        self._remember(items)
+        if not self._disk:
+            return
+        try:
+            self._disk.put_many(items)
+        except sqlite3.Error as exc:  # pragma: no cover - disk edge case
+            logger.warning("Embedding disk cache write failed: %s", exc)
+
+    def _missing(self, keys: list[str], found: dict[str, list[float]]) -> list[str]:
+        # Deduplicate so a batch repeating the same text embeds it once.
+        return list(dict.fromkeys(key for key in keys if key not in found))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self.key_for(text) for text in texts]
+        found = self._lookup_memory(keys)
+        found.update(self._lookup_disk(self._missing(keys, found)))
+        missing = self._missing(keys, found)
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            with observe_stage("embedding"):
+                vectors = self.underlying.embed_documents([text_by_key[k] for k in missing])
+            computed = dict(zip(missing, vectors))
+            with self._lock:
+                self.misses += len(missing)
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self.key_for(text) for text in texts]
+        found = self._lookup_memory(keys)
+        pending = self._missing(keys, found)
+        if pending and self._disk:
+            found.update(await asyncio.to_thread(self._lookup_disk, pending))
+        missing = self._missing(keys, found)
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            with observe_stage("embedding"):
+                vectors = await self.underlying.aembed_documents(
+                    [text_by_key[k] for k in missing]
+                )
+            computed = dict(zip(missing, vectors))
+            with self._lock:
+                self.misses += len(missing)
+            if self._disk:
+                await asyncio.to_thread(self._store, computed)
+            else:
+                self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> EmbeddingCacheStats:
+        return EmbeddingCacheStats(
+            hits=self.hits,
+            disk_hits=self.disk_hits,
+            misses=self.misses,
+            size=len(self._memory),
+            max_size=self.max_entries,
+            disk_enabled=self._disk is not None,
+        )
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from app.services.market_search import SearchHit
+
+# Offline stand-ins for OpenAI and DuckDuckGo, used when FAKE_SERVICES is set. They
+# keep the shape of the real clients and sleep for a latency drawn from a
+# configurable distribution, so load tests run the whole pipeline without network.
+FAKE_ANSWER = (
+    "This is a placeholder response from the offline Market Mind model. "
+    "Live market data and OpenAI calls are disabled while FAKE_SERVICES is set, "
+    "so the figures you asked about are not available here."
+)
+
+
+def seeded_rng(seed: int | None, name: str) -> random.Random:
+    """Per-service RNG so a ``FAKE_SEED`` run replays the same latencies."""
+    return random.Random(None if seed is None else f"{seed}:{name}")
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """A latency distribution in seconds, parsed from ``"<kind>:<a>[,<b>]"``.
+
+    * ``fixed:0.2`` - always 0.2s (a bare number means the same);
+    * ``uniform:0.1,0.5`` - uniform between the two bounds;
+    * ``normal:0.4,0.1`` - mean and standard deviation, clipped at zero;
+    * ``lognormal:0.8,0.5`` - median and sigma, for long-tailed upstream calls.
+    """
+
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> LatencyDistribution:
+        kind, _, params = spec.strip().partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        try:
+            values = [float(value) for value in params.split(",")]
+        except ValueError:
+            raise ValueError(f"Invalid latency distribution {spec!r}") from None
+        expected = 1 if kind == "fixed" else 2
+        if kind not in {"fixed", "uniform", "normal", "lognormal"} or len(values) != expected:
+            raise ValueError(f"Invalid latency distribution {spec!r}")
+        if any(value < 0 for value in values):
+            raise ValueError(f"Latency distribution {spec!r} has a negative parameter")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.a, self.b))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a else 0.0
+        return self.a
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers with ``FAKE_ANSWER`` after a sampled delay.
+
+    ``latency`` is the time to the first token; streaming then emits one word
+    every ``token_delay`` seconds, like a model generating at a fixed rate.
+    """
+
+    latency: LatencyDistribution = LatencyDistribution("fixed", 0.0)
+    token_delay: float = 0.0
+    answer: str = FAKE_ANSWER
+    rng: random.Random = Field(default_factory=random.Random, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "market-mind-fake"
+
+    def _tokens(self) -> list[str]:
+        words = self.answer.split(" ")
+        return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+
+    def _generation_time(self) -> float:
+        return self.latency.sample(self.rng) + self.token_delay * len(self._tokens())
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._generation_time())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._generation_time())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency.sample(self.rng))
+        for index, token in enumerate(self._tokens()):
+            if index:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        for index, token in enumerate(self._tokens()):
+            if index:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic hash-based vectors, one sampled delay per embedding request.
+
+    Equal texts get equal vectors, so the embedding and answer caches behave
+    as they would against OpenAI; unrelated texts are far apart.
+    """
+
+    def __init__(
+        self, latency: LatencyDistribution, size: int = 256, rng: random.Random | None = None
+    ) -> None:
+        self.latency = latency
+        self.rng = rng or random.Random()
+        self._vectors = DeterministicFakeEmbedding(size=size)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency.sample(self.rng))
+        return self._vectors.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency.sample(self.rng))
+        return self._vectors.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        return self._vectors.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        return self._vectors.embed_query(text)
+
+
+class FakeSearchProvider:
+    """Stands in for a market search provider, failing at ``failure_rate``."""
+
+    def __init__(
+        self,
+        name: str,
+        latency: LatencyDistribution,
+        rng: random.Random | None = None,
+        failure_rate: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.latency = latency
+        self.rng = rng or random.Random()
+        self.failure_rate = failure_rate
+
+    async def search(self, query: str, max_results: int) -> list[SearchHit]:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} failed (simulated).")
+        return [
+            SearchHit(
+                title=f"Offline result {rank} for {query[:80]}",
+                snippet="Synthetic market snippet returned while FAKE_SERVICES is set.",
+                url=f"https://{self.name}.invalid/{rank}",
+                source=self.name,
+            )
+            for rank in range(1, max_results + 1)
+        ]
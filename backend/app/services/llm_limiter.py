@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call cannot be admitted; surfaced to clients as a 503."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("The assistant is busy. Please retry shortly.")
+        self.retry_after = retry_after
+
+
+@dataclass
+class LLMLimiterStats:
+    max_concurrency: int
+    max_queue: int
+    active: int
+    waiting: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class LLMConcurrencyLimiter:
+    """Caps concurrent LLM calls, with a bounded FIFO queue in front of the cap.
+
+    A caller that finds ``max_queue`` others already waiting is rejected at once,
+    and a queued caller gives up after ``queue_timeout`` seconds. Either way it
+    gets an ``LLMOverloadedError`` carrying a retry hint derived from how long
+    calls have recently held a slot.
+    """
+
+    # Assumed call duration until the first calls have completed.
+    initial_hold_seconds = 5.0
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_hold = self.initial_hold_seconds
+
+    def retry_after(self) -> float:
+        """Rough seconds until a slot frees up for a caller joining the queue now."""
+        return max(1.0, math.ceil(self._avg_hold * (self.waiting + 1) / self.max_concurrency))
+
+    def admission_check(self) -> None:
+        """Fail fast when a new call would be rejected, before any work is done."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError(self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.admission_check()
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LLMOverloadedError(self.retry_after()) from None
+        finally:
+            self.waiting -= 1
+
+        started_at = loop.time()
+        waited = started_at - queued_at
+        self.admitted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            # Exponential moving average keeps the retry hint tracking current latency.
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (loop.time() - started_at)
+
+    def stats(self) -> LLMLimiterStats:
+        return LLMLimiterStats(
+            max_concurrency=self.max_concurrency,
+            max_queue=self.max_queue,
+            active=self.active,
+            waiting=self.waiting,
+            admitted=self.admitted,
+            rejected=self.rejected,
+            timed_out=self.timed_out,
+            avg_wait_ms=round(self._total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            max_wait_ms=round(self._max_wait * 1000, 1),
+        )
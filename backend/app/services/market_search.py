@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Literal, Protocol
+from urllib.parse import urlsplit
+
+from app.core.config import Settings
+from app.core.logging import logger as app_logger
+from app.core.metrics import observe_stage
+
+logger = app_logger.getChild(__name__)
+
+SearchStrategy = Literal["parallel", "hedged"]
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class SearchUnavailableError(Exception):
+    """Raised when no search provider answered; such lookups are never cached."""
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    title: str
+    snippet: str
+    url: str = ""
+    source: str = ""
+
+    def dedup_key(self) -> str:
+        """Same page, or failing a URL the same headline, from any provider."""
+        if self.url:
+            parts = urlsplit(self.url.lower())
+            return f"{parts.netloc.removeprefix('www.')}{parts.path.rstrip('/')}"
+        return " ".join(self.title.lower().split())
+
+    def format(self) -> str:
+        source = self.source or urlsplit(self.url).netloc or "unknown"
+        return f"{self.title} - {self.snippet} (source: {source})"
+
+
+class SearchProvider(Protocol):
+    name: str
+
+    async def search(self, query: str, max_results: int) -> list[SearchHit]: ...
+
+
+class DuckDuckGoProvider:
+    """DuckDuckGo web (``source="text"``) or news (``source="news"``) results."""
+
+    def __init__(self, name: str, region: str, source: str = "text") -> None:
+        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+
+        self.name = name
+        self.source = source
+        self._wrapper = DuckDuckGoSearchAPIWrapper(region=region, source=source)
+
+    async def search(self, query: str, max_results: int) -> list[SearchHit]:
+        # The client is synchronous; a call abandoned on timeout finishes in its thread.
+        rows = await asyncio.to_thread(
+            self._wrapper.results, query, max_results, source=self.source
+        )
+        return [
+            SearchHit(
+                title=row.get("title", ""),
+                snippet=row.get("snippet", ""),
+                url=row.get("link", ""),
+                source=row.get("source", ""),
+            )
+            for row in rows
+            if row.get("title") or row.get("snippet")
+        ]
+
+
+class CircuitBreaker:
+    """Skips a provider after ``failure_threshold`` consecutive failures.
+
+    The circuit stays open for ``reset_seconds``, then lets a single trial call
+    through (half-open): success closes it again, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_running or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+        self._trial_running = False
+
+    def release(self) -> None:
+        """The call was abandoned without an outcome; let another trial through."""
+        self._trial_running = False
+
+
+@dataclass
+class SearchProviderStats:
+    name: str
+    state: BreakerState
+    calls: int
+    succeeded: int
+    failed: int
+    timed_out: int
+    cancelled: int
+    skipped: int
+    avg_latency_ms: float
+
+
+class _Provider:
+    def __init__(self, provider: SearchProvider, breaker: CircuitBreaker) -> None:
+        self.provider = provider
+        self.breaker = breaker
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.skipped = 0
+        self._total_latency = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    def stats(self) -> SearchProviderStats:
+        return SearchProviderStats(
+            name=self.name,
+            state=self.breaker.state,
+            calls=self.calls,
+            succeeded=self.succeeded,
+            failed=self.failed,
+            timed_out=self.timed_out,
+            cancelled=self.cancelled,
+            skipped=self.skipped,
+            avg_latency_ms=(
+                round(self._total_latency / self.succeeded * 1000, 1) if self.succeeded else 0.0
+            ),
+        )
+
+
+class MarketSearch:
+    """Queries several search providers and merges what the fastest return.
+
+    ``parallel`` starts every provider whose circuit is closed at once; ``hedged``
+    starts them one at a time in priority order, moving to the next when the
+    current one fails or has not answered within ``hedge_delay`` seconds. Either
+    way, once a provider returns results the others get ``merge_window`` more
+    seconds to contribute before they are cancelled, so a slow or failing
+    provider adds at most that to the latency of a lookup. Each call is bounded
+    by ``provider_timeout``; timeouts and errors count towards the provider's
+    circuit breaker.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[SearchProvider],
+        *,
+        strategy: SearchStrategy = "parallel",
+        max_results: int = 3,
+        provider_timeout: float = 5.0,
+        hedge_delay: float = 1.0,
+        merge_window: float = 0.0,
+        failure_threshold: int = 3,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not providers:
+            raise ValueError("MarketSearch needs at least one provider.")
+        self.strategy = strategy
+        self.max_results = max_results
+        self.provider_timeout = provider_timeout
+        self.hedge_delay = hedge_delay
+        self.merge_window = merge_window
+        self._providers = [
+            _Provider(provider, CircuitBreaker(failure_threshold, reset_seconds, clock))
+            for provider in providers
+        ]
+
+    async def search(self, query: str) -> list[str]:
+        """Merged, de-duplicated results as prompt lines.
+
+        Raises ``SearchUnavailableError`` when every provider failed or was
+        skipped by its circuit breaker.
+        """
+        # Circuits are checked as providers are started, so a hedge that is never
+        # needed does not take a half-open provider's single trial call.
+        queue = list(self._providers)
+        running: dict[asyncio.Task[list[SearchHit] | None], _Provider] = {}
+        answered: list[tuple[_Provider, list[SearchHit]]] = []
+        loop = asyncio.get_running_loop()
+        merge_deadline: float | None = None
+
+        def launch() -> None:
+            while queue:
+                provider = queue.pop(0)
+                if provider.breaker.allow():
+                    running[asyncio.create_task(self._call(provider, query))] = provider
+                    return
+                provider.skipped += 1
+
+        launch()
+        while queue and self.strategy == "parallel":
+            launch()
+        if not running:
+            raise SearchUnavailableError("Every search provider is failing.")
+        try:
+            while running:
+                if merge_deadline is not None:
+                    timeout: float | None = max(0.0, merge_deadline - loop.time())
+                elif queue:
+                    timeout = self.hedge_delay
+                else:
+                    timeout = None
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if merge_deadline is not None:
+                        break
+                    launch()  # Hedge: the current providers are slow.
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    hits = task.result()
+                    if hits is not None:
+                        answered.append((provider, hits))
+                    if hits and merge_deadline is None:
+                        merge_deadline = loop.time() + self.merge_window
+                    elif not hits and queue and merge_deadline is None:
+                        launch()  # Failed or empty: try the next provider now.
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        if not answered:
+            raise SearchUnavailableError("No search provider answered.")
+        return [hit.format() for hit in self._merge(answered)]
+
+    async def _call(self, provider: _Provider, query: str) -> list[SearchHit] | None:
+        """Run one provider; ``None`` when it failed or timed out."""
+        provider.calls += 1
+        started = time.perf_counter()
+        try:
+            with observe_stage(f"search_{provider.name}"):
+                hits = await asyncio.wait_for(
+                    provider.provider.search(query, self.max_results),
+                    timeout=self.provider_timeout,
+                )
+        except asyncio.TimeoutError:
+            provider.timed_out += 1
+            provider.breaker.record_failure()
+            logger.warning(
+                "Search provider %s timed out after %.1fs", provider.name, self.provider_timeout
+            )
+            return None
+        except asyncio.CancelledError:
+            provider.cancelled += 1
+            provider.breaker.release()
+            raise
+        except Exception as exc:
+            provider.failed += 1
+            provider.breaker.record_failure()
+            logger.warning("Search provider %s failed: %s", provider.name, exc)
+            return None
+        provider.succeeded += 1
+        provider._total_latency += time.perf_counter() - started
+        provider.breaker.record_success()
+        return hits
+
+    def _merge(self, answered: list[tuple[_Provider, list[SearchHit]]]) -> list[SearchHit]:
+        """Interleave providers' results rank by rank, in priority order, without repeats."""
+        order = {provider.name: index for index, provider in enumerate(self._providers)}
+        ranked = [hits for _, hits in sorted(answered, key=lambda item: order[item[0].name])]
+        merged: list[SearchHit] = []
+        seen: set[str] = set()
+        for rank in range(max(len(hits) for hits in ranked)):
+            for hits in ranked:
+                if rank < len(hits) and (key := hits[rank].dedup_key()) not in seen:
+                    seen.add(key)
+                    merged.append(hits[rank])
+        return merged[: self.max_results]
+
+    def stats(self) -> list[SearchProviderStats]:
+        return [provider.stats() for provider in self._providers]
+
+
+def build_market_search(settings: Settings) -> MarketSearch:
+    """The configured providers; offline stand-ins when ``FAKE_SERVICES`` is set."""
+    providers: list[SearchProvider] = []
+    for name in settings.search_providers:
+        if settings.fake_services:
+            from app.services.fakes import FakeSearchProvider, LatencyDistribution, seeded_rng
+
+            providers.append(
+                FakeSearchProvider(
+                    name,
+                    LatencyDistribution.parse(settings.fake_search_latency),
+                    rng=seeded_rng(settings.fake_seed, f"search:{name}"),
+                    failure_rate=settings.fake_search_failure_rate,
+                )
+            )
+        elif name in {"duckduckgo", "duckduckgo_news"}:
+            source = "news" if name == "duckduckgo_news" else "text"
+            providers.append(DuckDuckGoProvider(name, settings.duckduckgo_region, source=source))
+        else:
+            raise ValueError(f"Unknown search provider {name!r}.")
+    return MarketSearch(
+        providers,
+        strategy=settings.search_strategy,
+        max_results=settings.search_max_results,
+        provider_timeout=settings.search_provider_timeout_seconds,
+        hedge_delay=settings.search_hedge_delay_seconds,
+        merge_window=settings.search_merge_window_seconds,
+        failure_threshold=settings.search_breaker_failure_threshold,
+        reset_seconds=settings.search_breaker_reset_seconds,
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.logging import logger as app_logger
+from app.core.metrics import observe_stage
+from app.models import MarketSnapshot
+
+logger = app_logger.getChild(__name__)
+
+
+@dataclass(frozen=True)
+class WatchTopic:
+    key: str
+    query: str
+    aliases: tuple[str, ...]
+
+
+class Watchlist:
+    """Topics from ``MARKET_WATCHLIST`` entries written ``"query|alias|alias"``.
+
+    The query is what the ingester searches for; a question mentioning the query
+    or any alias as a whole word (case-insensitively) is about the topic.
+    """
+
+    def __init__(self, entries: Sequence[str]) -> None:
+        self.topics: list[WatchTopic] = []
+        self._patterns: list[tuple[WatchTopic, re.Pattern[str]]] = []
+        seen: set[str] = set()
+        for entry in entries:
+            names = [name.strip() for name in entry.split("|") if name.strip()]
+            if not names:
+                continue
+            key = " ".join(names[0].lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            topic = WatchTopic(key=key, query=names[0], aliases=tuple(names))
+            alternatives = "|".join(
+                r"\s+".join(map(re.escape, name.split())) for name in names
+            )
+            self.topics.append(topic)
+            self._patterns.append(
+                (topic, re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE))
+            )
+
+    def match(self, question: str) -> list[WatchTopic]:
+        return [topic for topic, pattern in self._patterns if pattern.search(question)]
+
+
+@dataclass
+class MarketSnapshotStats:
+    topics: int
+    max_age_seconds: float
+    hits: int
+    stale: int
+    unmatched: int
+
+
+class MarketSnapshots:
+    """Search results for watchlist topics, kept fresh by the snapshot ingester.
+
+    ``lookup`` answers a question from the snapshots of the topics it mentions,
+    provided every one of them was fetched within ``max_age_seconds``; otherwise
+    it returns ``None`` and the caller searches live.
+    """
+
+    def __init__(self, engine: AsyncEngine, watchlist: Watchlist, max_age_seconds: float) -> None:
+        self.engine = engine
+        self.watchlist = watchlist
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.stale = 0
+        self.unmatched = 0
+
+    def _insert(self):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(MarketSnapshot)
+        if dialect == "sqlite":
+            return sqlite.insert(MarketSnapshot)
+        raise RuntimeError(f"Market snapshots are not supported on {dialect!r} databases.")
+
+    async def lookup(self, question: str) -> list[str] | None:
+        topics = self.watchlist.match(question)
+        if not topics:
+            self.unmatched += 1
+            return None
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.max_age_seconds)
+        stmt = select(MarketSnapshot.topic, MarketSnapshot.results).where(
+            MarketSnapshot.topic.in_([topic.key for topic in topics]),
+            MarketSnapshot.fetched_at >= cutoff,
+        )
+        try:
+            with observe_stage("snapshot_lookup"):
+                async with self.engine.connect() as conn:
+                    fresh = {row.topic: row.results for row in await conn.execute(stmt)}
+        except SQLAlchemyError as exc:
+            logger.warning("Market snapshot lookup failed: %s", exc)
+            return None
+        if len(fresh) < len(topics):
+            self.stale += 1
+            return None
+        self.hits += 1
+        # Topics in watchlist order; a result shared by two topics is listed once.
+        return list(dict.fromkeys(line for topic in topics for line in fresh[topic.key]))
+
+    async def save(self, topic: WatchTopic, results: list[str]) -> None:
+        stmt = self._insert().values(
+            topic=topic.key,
+            query=topic.query,
+            results=results,
+            fetched_at=datetime.now(timezone.utc),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MarketSnapshot.topic],
+            set_={
+                "query": stmt.excluded.query,
+                "results": stmt.excluded.results,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt)
+
+    def stats(self) -> MarketSnapshotStats:
+        return MarketSnapshotStats(
+            topics=len(self.watchlist.topics),
+            max_age_seconds=self.max_age_seconds,
+            hits=self.hits,
+            stale=self.stale,
+            unmatched=self.unmatched,
+        )
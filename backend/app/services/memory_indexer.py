@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.logging import logger as app_logger
+
+logger = app_logger.getChild(__name__)
+
+BatchWriter = Callable[[list[str], list[dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class PendingMemory:
+    text: str
+    metadata: dict[str, Any]
+
+
+@dataclass
+class MemoryIndexerStats:
+    running: bool
+    queue_depth: int
+    max_queue: int
+    indexed: int
+    failed: int
+    dropped: int
+    batches: int
+
+
+class MemoryIndexer:
+    """Write-behind queue that batches vector-memory writes off the request path.
+
+    Texts are flushed in one ``write_batch`` call once ``batch_size`` items are
+    pending or ``flush_interval`` seconds have passed since the first one arrived.
+    """
+
+    def __init__(
+        self,
+        write_batch: BatchWriter,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+    ) -> None:
+        self._write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[PendingMemory | None] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self.indexed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._run(), name="memory-indexer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the worker."""
+        if not self.running or self._queue is None or self._worker is None:
+            return
+        worker = self._worker
+        self._worker = None
+        await self._queue.put(None)
+        await worker
+
+    def enqueue(self, text: str, metadata: dict[str, Any]) -> bool:
+        """Queue a text for indexing; returns ``False`` if it was not accepted."""
+        if not self.running or self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(PendingMemory(text=text, metadata=metadata))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                "Memory index queue full; dropping message for chat %s.",
+                metadata.get("chat_id"),
+            )
+            return False
+        return True
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Shutdown: drain anything enqueued before the stop marker.
+        pending: list[PendingMemory] = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                pending.append(item)
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start : start + self.batch_size])
+
+    async def _flush(self, batch: list[PendingMemory]) -> None:
+        try:
+            await self._write_batch(
+                [item.text for item in batch], [item.metadata for item in batch]
+            )
+        except Exception as exc:  # pragma: no cover - external dependency
+            self.failed += len(batch)
+            logger.warning("Failed to persist %d memories: %s", len(batch), exc)
+            return
+        self.indexed += len(batch)
+        self.batches += 1
+
+    def stats(self) -> MemoryIndexerStats:
+        return MemoryIndexerStats(
+            running=self.running,
+            queue_depth=self.queue_depth,
+            max_queue=self.max_queue,
+            indexed=self.indexed,
+            failed=self.failed,
+            dropped=self.dropped,
+            batches=self.batches,
+        )
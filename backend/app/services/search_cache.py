@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from cachetools import TTLCache
+
+SearchKey = tuple[str, str]
+
+
+@dataclass
+class SearchCacheStats:
+    hits: int
+    misses: int
+    coalesced: int
+    size: int
+    max_size: int
+    ttl_seconds: float
+
+
+class SearchCache:
+    """TTL + LRU cache for market search results with single-flight lookups.
+
+    Entries are keyed on the normalized query and search region. Concurrent
+    lookups for the same key share one upstream fetch instead of each issuing
+    their own request.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: TTLCache[SearchKey, list[str]] = TTLCache(
+            maxsize=max_entries, ttl=ttl_seconds
+        )
+        self._inflight: dict[SearchKey, asyncio.Future[list[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def key_for(self, query: str, region: str) -> SearchKey:
+        return self.normalize(query), region
+
+    async def get_or_fetch(
+        self,
+        query: str,
+        region: str,
+        fetch: Callable[[], Awaitable[list[str]]],
+    ) -> list[str]:
+        """Return cached results or run ``fetch`` once for all concurrent callers."""
+        key = self.key_for(query, region)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            return list(cached)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, fetch))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        # Shield the shared fetch so one caller timing out doesn't cancel it for the rest.
+        return list(await asyncio.shield(task))
+
+    async def _load(
+        self, key: SearchKey, fetch: Callable[[], Awaitable[list[str]]]
+    ) -> list[str]:
+        try:
+            results = await fetch()
+            self._entries[key] = results
+            return results
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            size=len(self._entries),
+            max_size=self.max_entries,
+            ttl_seconds=self.ttl_seconds,
+        )
+
+
+def _consume_exception(task: asyncio.Future[list[str]]) -> None:
+    # Mark failures as retrieved even if every waiter has already given up.
+    if not task.cancelled():
+        task.exception()
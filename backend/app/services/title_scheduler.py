@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.core.logging import logger as app_logger
+from app.services.llm_limiter import LLMOverloadedError
+
+logger = app_logger.getChild(__name__)
+
+TitleGenerator = Callable[[str], Awaitable[None]]
+
+
+def should_refresh_title(message_count: int, every: int) -> bool:
+    """Whether a chat holding ``message_count`` messages is due for a new title.
+
+    Titles are made after the first exchange and then every ``every`` messages.
+    """
+    if message_count == 2:
+        return True
+    if every <= 0 or message_count < 2:
+        return False
+    # A turn adds two messages, so an odd multiple of ``every`` is never hit
+    # exactly; refresh on the turn that steps over it instead.
+    stepped_over = message_count - 1
+    return message_count % every == 0 or (stepped_over % 2 == 1 and stepped_over % every == 0)
+
+
+@dataclass
+class TitleSchedulerStats:
+    pending: int
+    scheduled: int
+    debounced: int
+    deferred: int
+    generated: int
+    failed: int
+
+
+class TitleScheduler:
+    """Debounced, per-chat background title generation.
+
+    ``schedule`` (re)starts a timer for the chat; the title is generated once the
+    chat has been quiet for ``debounce_seconds``. Generation runs off the request
+    path, at most ``max_concurrency`` at a time, and waits while ``is_busy``
+    reports that chat turns are queued for the LLM.
+    """
+
+    def __init__(
+        self,
+        generate: TitleGenerator,
+        debounce_seconds: float,
+        max_concurrency: int = 1,
+        is_busy: Callable[[], bool] | None = None,
+    ) -> None:
+        self._generate = generate
+        self.debounce_seconds = debounce_seconds
+        self._is_busy = is_busy or (lambda: False)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._timers: dict[str, asyncio.Task[None]] = {}
+        self._generating: set[str] = set()
+        self.scheduled = 0
+        self.debounced = 0
+        self.deferred = 0
+        self.generated = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._timers)
+
+    def schedule(self, chat_id: str) -> None:
+        self.scheduled += 1
+        timer = self._timers.get(chat_id)
+        if timer is not None and not timer.done() and chat_id not in self._generating:
+            timer.cancel()
+            self.debounced += 1
+        self._timers[chat_id] = asyncio.create_task(
+            self._run(chat_id), name=f"chat-title-{chat_id}"
+        )
+
+    async def stop(self) -> None:
+        """Cancel every pending title; they are cheap to regenerate later."""
+        timers = list(self._timers.values())
+        for timer in timers:
+            timer.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+        self._timers.clear()
+
+    async def _run(self, chat_id: str) -> None:
+        task = asyncio.current_task()
+        try:
+            await asyncio.sleep(self.debounce_seconds)
+            # Chat turns take priority over titles for the LLM slots.
+            while self._is_busy():
+                self.deferred += 1
+                await asyncio.sleep(self.debounce_seconds)
+            self._generating.add(chat_id)
+            async with self._semaphore:
+                await self._generate(chat_id)
+            self.generated += 1
+        except asyncio.CancelledError:
+            raise
+        except LLMOverloadedError:
+            self.deferred += 1
+            logger.info("LLM busy; title for chat %s postponed to its next trigger.", chat_id)
+        except Exception as exc:  # pragma: no cover - LLM or database failure
+            self.failed += 1
+            logger.warning("Failed to generate title for chat %s: %s", chat_id, exc)
+        finally:
+            self._generating.discard(chat_id)
+            if self._timers.get(chat_id) is task:
+                del self._timers[chat_id]
+
+    def stats(self) -> TitleSchedulerStats:
+        return TitleSchedulerStats(
+            pending=self.pending,
+            scheduled=self.scheduled,
+            debounced=self.debounced,
+            deferred=self.deferred,
+            generated=self.generated,
+            failed=self.failed,
+        )
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.logging import logger as app_logger
+from app.core.metrics import observe_stage
+
+logger = app_logger.getChild(__name__)
+
+
+def memory_id(text: str, metadata: Mapping[str, Any]) -> str:
+    """Document ID for a message: the same text from the same chat, user and role
+    maps to one ID, ignoring differences in whitespace."""
+    key = "\0".join(
+        [
+            str(metadata.get("chat_id") or ""),
+            str(metadata.get("user_id") or ""),
+            str(metadata.get("role") or ""),
+            " ".join(text.split()),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / norm if norm else 0.0
+
+
+@dataclass
+class VectorMemoryStats:
+    documents: int | None
+    written: int
+    duplicates: int
+    near_duplicates: int
+    expired: int
+    ttl_seconds: float | None
+    near_duplicate_threshold: float | None
+
+
+class VectorMemory:
+    """Writes chat messages to the ``market-mind`` collection for long-term recall.
+
+    Documents are keyed by ``memory_id``, so a message that is already stored only
+    has its ``created_at`` refreshed. With ``near_duplicate_threshold`` set, a new
+    message whose embedding is at least that cosine-similar to one stored for the
+    same chat and role is skipped. With ``ttl_seconds`` set, retrieval ignores
+    documents older than that and expired ones are swept periodically; documents
+    written before ``created_at`` existed count as expired until
+    ``compact_memory`` backfills it.
+    """
+
+    # Expired documents are swept once every this many written batches.
+    prune_every = 50
+
+    def __init__(
+        self,
+        vector_store: Any,
+        embeddings: Embeddings,
+        *,
+        ttl_seconds: float | None = None,
+        near_duplicate_threshold: float | None = None,
+    ) -> None:
+        self.vector_store = vector_store
+        self.embeddings = embeddings
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.batches = 0
+        self.written = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self.expired = 0
+
+    def _fresh(self) -> dict[str, Any] | None:
+        if self.ttl_seconds is None:
+            return None
+        return {"created_at": {"$gte": time.time() - self.ttl_seconds}}
+
+    def retrieval_filter(self, where: dict[str, Any] | None) -> dict[str, Any] | None:
+        """``where`` narrowed to documents that have not expired."""
+        fresh = self._fresh()
+        if fresh is None:
+            return where
+        return {"$and": [where, fresh]} if where else fresh
+
+    async def write(self, texts: list[str], metadatas: list[dict[str, Any]]) -> None:
+        now = time.time()
+        batch: dict[str, tuple[str, dict[str, Any]]] = {}
+        for text, metadata in zip(texts, metadatas):
+            doc_id = memory_id(text, metadata)
+            if doc_id in batch:
+                self.duplicates += 1
+            batch[doc_id] = (text, {**metadata, "created_at": now})
+
+        collection = self.vector_store._collection
+        with observe_stage("chroma_add"):
+            stored = await asyncio.to_thread(collection.get, ids=list(batch), include=[])
+            if stored["ids"]:
+                # Already indexed: restart the TTL without embedding the text again.
+                self.duplicates += len(stored["ids"])
+                await asyncio.to_thread(
+                    collection.update,
+                    ids=stored["ids"],
+                    metadatas=[batch.pop(doc_id)[1] for doc_id in stored["ids"]],
+                )
+            if batch and self.near_duplicate_threshold is not None:
+                batch = await self._without_near_duplicates(batch)
+            if batch:
+                # One add_texts call embeds the whole batch in a single request.
+                await self.vector_store.aadd_texts(
+                    [text for text, _ in batch.values()],
+                    metadatas=[metadata for _, metadata in batch.values()],
+                    ids=list(batch),
+                )
+        self.written += len(batch)
+        self.batches += 1
+        if self.ttl_seconds is not None and self.batches % self.prune_every == 0:
+            await asyncio.to_thread(self.prune)
+
+    async def _without_near_duplicates(
+        self, batch: dict[str, tuple[str, dict[str, Any]]]
+    ) -> dict[str, tuple[str, dict[str, Any]]]:
+        # Embedded through the shared cache, so add_texts reuses these vectors.
+        vectors = await self.embeddings.aembed_documents([text for text, _ in batch.values()])
+        fresh = self._fresh()
+        kept: dict[str, tuple[str, dict[str, Any]]] = {}
+        for (doc_id, (text, metadata)), vector in zip(batch.items(), vectors):
+            clauses: list[dict[str, Any]] = [
+                {"chat_id": metadata.get("chat_id", "")},
+                {"role": metadata.get("role", "")},
+            ]
+            if fresh is not None:
+                clauses.append(fresh)
+            nearest = await asyncio.to_thread(
+                self.vector_store._collection.query,
+                query_embeddings=[vector],
+                n_results=1,
+                where={"$and": clauses},
+                include=["embeddings"],
+            )
+            neighbours = nearest["embeddings"][0]
+            if len(neighbours) and (
+                cosine_similarity(vector, neighbours[0]) >= self.near_duplicate_threshold
+            ):
+                self.near_duplicates += 1
+                continue
+            kept[doc_id] = (text, metadata)
+        return kept
+
+    def prune(self) -> int:
+        """Delete documents older than the TTL; returns how many were removed."""
+        if self.ttl_seconds is None:
+            return 0
+        expired = self.vector_store.get(
+            where={"created_at": {"$lt": time.time() - self.ttl_seconds}}, include=[]
+        )
+        ids = expired.get("ids") or []
+        if ids:
+            self.vector_store.delete(ids=ids)
+        self.expired += len(ids)
+        return len(ids)
+
+    def stats(self) -> VectorMemoryStats:
+        try:
+            documents: int | None = self.vector_store._collection.count()
+        except Exception as exc:  # pragma: no cover - chroma edge case
+            logger.warning("Failed to count vector memory documents: %s", exc)
+            documents = None
+        return VectorMemoryStats(
+            documents=documents,
+            written=self.written,
+            duplicates=self.duplicates,
+            near_duplicates=self.near_duplicates,
+            expired=self.expired,
+            ttl_seconds=self.ttl_seconds,
+            near_duplicate_threshold=self.near_duplicate_threshold,
+        )
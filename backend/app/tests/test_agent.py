@@ -0,0 +1,238 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from langchain_core.documents import Document
+
+import app.services.agent as agent_module
+from app.core.config import Settings
+from app.services.agent import (
+    SEARCH_TIMED_OUT,
+    SEARCH_UNAVAILABLE,
+    AgentService,
+    aget_agent_service,
+    get_agent_service,
+    reset_agent_service,
+)
+from app.services.context_budget import MEMORY_SEPARATOR
+from app.services.market_search import SearchUnavailableError
+
+MEMORIES = [
+    ("chat-1", "alice", "BTC is my largest holding"),
+    ("chat-2", "alice", "I also hold some ETH"),
+    ("chat-3", "bob", "Bob keeps everything in SOL"),
+]
+
+
+@pytest.fixture()
+def make_agent(tmp_path):
+    """An offline agent with its own Chroma directory, built from ``overrides``."""
+
+    def build(**overrides) -> AgentService:
+        settings = Settings(
+            **{
+                "fake_services": True,
+                "fake_llm_latency": "fixed:0",
+                "fake_llm_token_delay_seconds": 0,
+                "fake_embedding_latency": "fixed:0",
+                "fake_search_latency": "fixed:0",
+                "chroma_persist_directory": tmp_path / uuid4().hex[:8],
+                "answer_cache_enabled": False,
+                "market_watchlist": [],
+                "environment": "development",
+                **overrides,
+            }
+        )
+        return AgentService(settings)
+
+    return build
+
+
+async def _seed(agent: AgentService, memories=MEMORIES) -> None:
+    for chat_id, user_id, content in memories:
+        await agent.persist_memory(chat_id, "user", content, user_id=user_id)
+
+
+async def _recall(agent: AgentService, question: str, **state) -> list[str]:
+    context = (await agent._retrieve_memory({"question": question, **state}))["vector_context"]
+    return [] if context == "None" else context.split(MEMORY_SEPARATOR)
+
+
+@pytest.mark.parametrize(
+    ("scope", "expected"),
+    [
+        ("chat", {"BTC is my largest holding"}),
+        ("user", {"BTC is my largest holding", "I also hold some ETH"}),
+        ("global", {content for _, _, content in MEMORIES}),
+    ],
+)
+async def test_memory_scope_limits_which_messages_are_recalled(make_agent, scope, expected):
+    agent = make_agent(memory_scope=scope)
+    await _seed(agent)
+
+    recalled = await _recall(agent, "What do I hold?", chat_id="chat-1", user_id="alice")
+
+    assert set(recalled) == expected
+
+
+async def test_memory_top_k_caps_recalled_messages(make_agent):
+    agent = make_agent(memory_scope="global", memory_top_k=2)
+    await _seed(agent)
+
+    assert len(await _recall(agent, "What do I hold?")) == 2
+
+
+async def test_score_threshold_drops_unrelated_messages(make_agent):
+    agent = make_agent(memory_scope="global")
+    strict = make_agent(memory_scope="global", memory_score_threshold=0.9)
+    for service in (agent, strict):
+        await _seed(service)
+
+    # Fake embeddings only put equal texts close together.
+    assert len(await _recall(agent, "I also hold some ETH")) == 3
+    assert await _recall(strict, "I also hold some ETH") == ["I also hold some ETH"]
+
+
+async def test_mmr_trades_a_repeated_message_for_a_different_one(make_agent):
+    repeated = [*MEMORIES, ("chat-4", "carol", "BTC is my largest holding")]
+    plain = make_agent(memory_scope="global", memory_top_k=2)
+    mmr = make_agent(
+        memory_scope="global", memory_top_k=2, memory_use_mmr=True, memory_mmr_lambda=0.25
+    )
+    for service in (plain, mmr):
+        await _seed(service, repeated)
+
+    assert await _recall(plain, "BTC is my largest holding") == ["BTC is my largest holding"] * 2
+    recalled = await _recall(mmr, "BTC is my largest holding")
+    assert recalled[0] == "BTC is my largest holding"
+    assert recalled[1] != "BTC is my largest holding"
+
+
+def test_hnsw_settings_configure_the_memory_collection(make_agent):
+    tuned = make_agent(
+        chroma_hnsw_space="cosine", chroma_hnsw_ef_search=50, chroma_hnsw_max_neighbors=32
+    )
+    default = make_agent()
+
+    hnsw = tuned.vector_store._collection.configuration["hnsw"]
+    assert (hnsw["space"], hnsw["ef_search"], hnsw["max_neighbors"]) == ("cosine", 50, 32)
+    hnsw = default.vector_store._collection.configuration["hnsw"]
+    assert (hnsw["space"], hnsw["ef_search"], hnsw["max_neighbors"]) == ("l2", 100, 16)
+
+
+def _slow_branches(
+    agent: AgentService, *, search_delay: float, memory_delay: float
+) -> dict[str, tuple[float, float]]:
+    """Replace both branches with sleeps; returns when each one ran."""
+    spans: dict[str, tuple[float, float]] = {}
+
+    class SlowSearch:
+        async def search(self, query):
+            started = time.perf_counter()
+            await asyncio.sleep(search_delay)
+            spans["search"] = (started, time.perf_counter())
+            return ["BTC rallies"]
+
+    async def slow_similarity_search(question, where):
+        started = time.perf_counter()
+        await asyncio.sleep(memory_delay)
+        spans["memory"] = (started, time.perf_counter())
+        return [Document(page_content="alice holds BTC")]
+
+    agent.market_search = SlowSearch()
+    agent._similarity_search = slow_similarity_search
+    return spans
+
+
+async def _run_graph(agent: AgentService) -> tuple[dict, float]:
+    started = time.perf_counter()
+    state = await agent.graph.ainvoke(
+        {"chat_id": "chat-1", "user_id": "alice", "question": "How is BTC?", "history": ""}
+    )
+    return state, time.perf_counter() - started
+
+
+async def test_search_and_memory_branches_run_concurrently(make_agent):
+    agent = make_agent()
+    spans = _slow_branches(agent, search_delay=0.5, memory_delay=0.5)
+
+    state, elapsed = await _run_graph(agent)
+
+    assert state["search_results"] == ["BTC rallies"]
+    assert state["vector_context"] == "alice holds BTC"
+    (search_start, search_end), (memory_start, memory_end) = spans["search"], spans["memory"]
+    assert search_start < memory_end and memory_start < search_end
+    assert elapsed < 0.9  # About the slower branch, not the 1s sum.
+
+
+async def test_slow_search_falls_back_while_memory_is_kept(make_agent):
+    agent = make_agent(search_timeout_seconds=0.2)
+    _slow_branches(agent, search_delay=5.0, memory_delay=0.1)
+
+    state, elapsed = await _run_graph(agent)
+
+    assert state["search_results"] == [SEARCH_TIMED_OUT]
+    assert state["vector_context"] == "alice holds BTC"
+    assert elapsed < 1.0
+
+
+async def test_slow_memory_falls_back_while_search_is_kept(make_agent):
+    agent = make_agent(memory_timeout_seconds=0.2)
+    _slow_branches(agent, search_delay=0.1, memory_delay=5.0)
+
+    state, elapsed = await _run_graph(agent)
+
+    assert state["search_results"] == ["BTC rallies"]
+    assert state["vector_context"] == "None"
+    assert elapsed < 1.0
+
+
+async def test_answers_without_live_search_are_not_cached(make_agent):
+    agent = make_agent(answer_cache_enabled=True)
+    _slow_branches(agent, search_delay=0, memory_delay=0)
+    working_search = agent.market_search
+
+    class DownSearch:
+        async def search(self, query):
+            raise SearchUnavailableError("rate limited")
+
+    agent.market_search = DownSearch()
+    turn = {"chat_id": "chat-1", "user_id": "alice", "history": "", "prompt": "How is BTC?"}
+
+    degraded = await agent.generate_response(**turn)
+    agent.market_search = working_search
+    fresh = await agent.generate_response(**turn)
+    cached = await agent.generate_response(**turn)
+
+    assert degraded.search_results == [SEARCH_UNAVAILABLE]
+    assert fresh.search_results == ["BTC rallies"] and not fresh.answer_cache
+    assert cached.answer_cache["hit"] is True
+    assert agent.answer_cache.stats().stores == 1
+
+
+async def test_waiting_for_the_agent_build_keeps_the_event_loop_running(monkeypatch):
+    class SlowAgent:
+        def __init__(self):
+            time.sleep(0.3)
+
+    monkeypatch.setattr(agent_module, "AgentService", SlowAgent)
+    reset_agent_service()
+    try:
+        # Warm-up builds the agent in a worker thread, holding the build lock.
+        warm_up = asyncio.create_task(asyncio.to_thread(get_agent_service))
+        await asyncio.sleep(0.05)
+        ticks = 0
+
+        async def other_requests():
+            nonlocal ticks
+            while not warm_up.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        agent, _ = await asyncio.gather(aget_agent_service(), other_requests())
+
+        assert agent is await warm_up
+        assert ticks > 5
+    finally:
+        reset_agent_service()
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.models.agent_response import AgentResponse
+from app.services.agent import AgentService
+from app.services.answer_cache import SemanticAnswerCache
+
+
+@pytest.fixture()
+def answer_cache(tmp_path):
+    embeddings = DeterministicFakeEmbedding(size=32)
+    store = Chroma(
+        collection_name=f"answers-{uuid4().hex[:8]}",
+        embedding_function=embeddings,
+        persist_directory=str(tmp_path / "chroma"),
+        collection_configuration={"hnsw": {"space": "cosine"}},
+    )
+    return SemanticAnswerCache(
+        store, embeddings, similarity_threshold=0.95, ttl_seconds=300
+    )
+
+
+async def test_similar_question_is_served_from_cache(answer_cache):
+    await answer_cache.store(
+        "What's moving crypto today?",
+        "user:alice",
+        AgentResponse(
+            answer="BTC is up 3%.", search_results=["BTC rallies"], vector_context="None"
+        ),
+        chat_id="chat-1",
+        user_id="alice",
+    )
+
+    hit = await answer_cache.lookup("What's moving crypto today?", "user:alice")
+
+    assert hit is not None
+    assert hit.answer == "BTC is up 3%."
+    assert hit.search_results == ["BTC rallies"]
+    assert hit.answer_cache["hit"] is True
+    assert hit.answer_cache["similarity"] >= 0.95
+    assert "question" not in hit.answer_cache
+    assert answer_cache.stats().hits == 1
+
+
+async def test_unrelated_question_misses(answer_cache):
+    await answer_cache.store(
+        "What's moving crypto today?",
+        "user:alice",
+        AgentResponse(answer="BTC is up 3%.", search_results=[], vector_context="None"),
+        chat_id="chat-1",
+        user_id="alice",
+    )
+
+    assert await answer_cache.lookup("How did the S&P 500 close?", "user:alice") is None
+    assert answer_cache.stats().misses == 1
+
+
+async def test_expired_answers_are_ignored_and_pruned(answer_cache):
+    await answer_cache.store(
+        "What's moving crypto today?",
+        "user:alice",
+        AgentResponse(answer="BTC is up 3%.", search_results=[], vector_context="None"),
+        chat_id="chat-1",
+        user_id="alice",
+    )
+    answer_cache.ttl_seconds = 0
+
+    assert await answer_cache.lookup("What's moving crypto today?", "user:alice") is None
+    assert answer_cache.prune() == 1
+
+
+async def test_answers_are_not_shared_across_scopes(answer_cache):
+    await answer_cache.store(
+        "What's in my portfolio?",
+        "user:alice",
+        AgentResponse(
+            answer="You hold NVDA.", search_results=[], vector_context="alice holds NVDA"
+        ),
+        chat_id="chat-1",
+        user_id="alice",
+    )
+
+    assert await answer_cache.lookup("What's in my portfolio?", "user:bob") is None
+    assert await answer_cache.lookup("What's in my portfolio?", "user:alice") is not None
+
+
+@pytest.mark.parametrize(
+    ("memory_scope", "history", "expected"),
+    [
+        ("chat", "", "global"),
+        ("user", "", "user:alice"),
+        ("global", "", "global"),
+        ("user", "user: hi\nassistant: hello", None),
+    ],
+)
+def test_answer_cache_scope_follows_memory_scope(memory_scope, history, expected):
+    service = SimpleNamespace(settings=SimpleNamespace(memory_scope=memory_scope))
+
+    assert AgentService._answer_cache_scope(service, "alice", history) == expected
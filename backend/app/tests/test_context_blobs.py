@@ -0,0 +1,17 @@
+from app.services.context_blobs import decode_context, encode_context
+
+
+def test_context_round_trips_and_hashes_by_content():
+    small = encode_context({"b": 1, "a": [1, 2]})
+    large = encode_context(["BTC rallies on ETF inflows"] * 50)
+
+    assert small.encoding == "json"
+    assert large.encoding == "zlib"
+    assert len(large.data) < large.size
+    assert decode_context(small) == {"a": [1, 2], "b": 1}
+    assert decode_context(large) == ["BTC rallies on ETF inflows"] * 50
+    # Key order does not change the hash; compression does not either.
+    assert encode_context({"a": [1, 2], "b": 1}).hash == small.hash
+    uncompressed = encode_context(["BTC rallies on ETF inflows"] * 50, compress=False)
+    assert uncompressed.hash == large.hash
+    assert uncompressed.encoding == "json"
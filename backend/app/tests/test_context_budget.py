@@ -0,0 +1,111 @@
+import pytest
+
+from app.services.context_budget import ContextAssembler, TokenCounter
+
+
+class CharCounter(TokenCounter):
+    """Character-estimate counter, so budgets are exact without tiktoken files."""
+
+    def __init__(self) -> None:
+        super().__init__("test-model")
+        self._loaded = True
+
+
+@pytest.fixture()
+def counter():
+    return CharCounter()
+
+
+def _assembler(counter, budget=1000, search=1000, history=1000, memory=1000):
+    return ContextAssembler(
+        counter,
+        budget=budget,
+        search_max_tokens=search,
+        history_max_tokens=history,
+        memory_max_tokens=memory,
+    )
+
+
+def test_counts_are_cached_per_text(counter):
+    assert counter.count("user: what moved BTC?") == 6
+    assert counter.count("user: what moved BTC?") == 6
+    assert (counter.hits, counter.misses) == (1, 1)
+
+
+def test_small_context_passes_through_unchanged(counter):
+    context = _assembler(counter).assemble(
+        question="How is BTC?",
+        search_results=["BTC up 3%"],
+        history="user: hi\nassistant: hello",
+        vector_context="alice holds BTC",
+    )
+
+    assert context.search_results == "BTC up 3%"
+    assert context.history == "user: hi\nassistant: hello"
+    assert context.vector_context == "alice holds BTC"
+    assert not any(context.dropped.values())
+
+
+def test_history_keeps_summary_and_newest_messages(counter):
+    history = (
+        "Summary of earlier conversation:\nTalked about rates.\n\nRecent messages:\n"
+        + "\n".join(f"user: message number {index:02d}" for index in range(20))
+    )
+
+    context = _assembler(counter, history=40).assemble(
+        question="q", search_results=[], history=history, vector_context="None"
+    )
+
+    assert context.history.startswith("Summary of earlier conversation:\nTalked about rates.")
+    assert context.history.endswith("user: message number 19")
+    assert "message number 00" not in context.history
+    assert context.tokens["history"] <= 40
+    assert context.dropped["history"] > 0
+
+
+def test_lower_priority_sections_get_what_is_left(counter):
+    context = _assembler(counter, budget=30, search=15).assemble(
+        question="q" * 20,
+        search_results=["a" * 40, "b" * 40],
+        history="user: " + "h" * 40,
+        vector_context="m" * 40 + "\n---\n" + "n" * 40,
+    )
+
+    # The question (5) and first result (10) leave 15; the second result is over
+    # the search cap, the history line takes 13 and memory no longer fits.
+    assert context.search_results == "a" * 40
+    assert context.history == "user: " + "h" * 40
+    assert context.vector_context == "None"
+    assert context.total_tokens <= 30
+    assert context.dropped == {"search_results": 1, "history": 0, "vector_context": 2}
+
+
+def test_oversized_first_result_is_truncated(counter):
+    context = _assembler(counter, search=40).assemble(
+        question="q", search_results=["x" * 400], history="", vector_context="None"
+    )
+
+    assert context.search_results == "x" * 160 + "..."
+
+
+def test_history_drops_whole_multi_line_messages(counter):
+    answer = "assistant: BTC outlook:\n- line one setup\n- line two risks\n- line three conclusion"
+    history = (
+        "Summary of earlier conversation:\nTalked about BTC.\n\nRecent messages:\n"
+        f"user: what about BTC?\n{answer}\nuser: and ETH?"
+    )
+
+    fitted = _assembler(counter, history=40).assemble(
+        question="q", search_results=[], history=history, vector_context="None"
+    )
+    roomy = _assembler(counter, history=48).assemble(
+        question="q", search_results=[], history=history, vector_context="None"
+    )
+
+    # The summary (13), header (5) and last message (5) fit in 40 tokens, but the
+    # 22-token answer does not and goes whole rather than losing its first lines.
+    assert fitted.history.endswith("Recent messages:\nuser: and ETH?")
+    assert fitted.dropped["history"] == 2
+    assert fitted.tokens["history"] == 23
+    assert roomy.history.endswith(f"Recent messages:\n{answer}\nuser: and ETH?")
+    assert roomy.dropped["history"] == 1
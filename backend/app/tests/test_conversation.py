@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.db.session as db_session
+from app.db import Base
+from app.models import ChatSession, Message
+from app.repositories import ChatRepository
+from app.services.conversation import build_history_text, refresh_chat_summary
+
+
+class StubSummarizer:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str | None, str]] = []
+
+    async def summarize_history(self, summary, messages):
+        self.calls.append((summary, messages))
+        return f"summary #{len(self.calls)}"
+
+
+@pytest.fixture()
+async def session_factory(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'conversation.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", factory)
+    yield factory
+    await engine.dispose()
+
+
+async def _add_messages(factory, chat_id: str, count: int) -> None:
+    async with factory() as session:
+        repo = ChatRepository(session)
+        for index in range(count):
+            role = "user" if index % 2 == 0 else "assistant"
+            await repo.add_message(chat_id=chat_id, role=role, content=f"message {index}")
+
+
+async def test_summary_folds_messages_outside_window_incrementally(session_factory):
+    async with session_factory() as session:
+        chat = await ChatRepository(session).create_session("BTC")
+    agent = StubSummarizer()
+
+    await _add_messages(session_factory, chat.id, 6)
+    await refresh_chat_summary(agent, chat.id, window=4, batch_size=2)
+    await _add_messages(session_factory, chat.id, 1)
+    await refresh_chat_summary(agent, chat.id, window=4, batch_size=2)
+    await _add_messages(session_factory, chat.id, 1)
+    await refresh_chat_summary(agent, chat.id, window=4, batch_size=2)
+
+    # The first fold covers two messages; the second waits for a full batch and
+    # only sends the newly expired ones along with the previous summary.
+    assert agent.calls == [
+        (None, "user: message 0\nassistant: message 1"),
+        ("summary #1", "user: message 2\nassistant: message 3"),
+    ]
+
+    async with session_factory() as session:
+        repo = ChatRepository(session)
+        stored = await repo.get_session(chat.id)
+        recent = await repo.list_recent_messages(chat.id, limit=4)
+
+    assert stored.summary == "summary #2"
+    assert stored.summarized_message_count == 4
+    history = build_history_text(stored, recent)
+    assert history.startswith("Summary of earlier conversation:\nsummary #2")
+    assert history.endswith(
+        "Recent messages:\nuser: message 4\nassistant: message 5\n"
+        "user: message 0\nuser: message 0"
+    )
+
+
+async def test_summary_folds_seek_past_messages_with_the_same_timestamp(session_factory):
+    async with session_factory() as session:
+        chat = await ChatRepository(session).create_session("BTC")
+    agent = StubSummarizer()
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def add_tied(*ids: str) -> None:
+        async with session_factory() as session:
+            session.add_all(
+                Message(
+                    id=message_id,
+                    chat_session_id=chat.id,
+                    role="user",
+                    content=message_id,
+                    created_at=created_at,
+                )
+                for message_id in ids
+            )
+            stored = await session.get(ChatSession, chat.id)
+            stored.message_count += len(ids)
+            await session.commit()
+
+    await add_tied("m4", "m2", "m3", "m1")
+    await refresh_chat_summary(agent, chat.id, window=2, batch_size=2)
+    await add_tied("m6", "m5")
+    await refresh_chat_summary(agent, chat.id, window=2, batch_size=2)
+
+    # Ties on created_at are broken by id, and each fold picks up after the last
+    # message the summary covers.
+    assert agent.calls == [
+        (None, "user: m1\nuser: m2"),
+        ("summary #1", "user: m3\nuser: m4"),
+    ]
+    async with session_factory() as session:
+        stored = await ChatRepository(session).get_session(chat.id)
+    assert (stored.summarized_message_count, stored.summarized_through_id) == (4, "m4")
@@ -0,0 +1,58 @@
+from langchain_core.embeddings import Embeddings
+
+from app.services.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_indexing_and_query_share_cached_vectors():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="test-model", max_entries=10)
+
+    cache.embed_documents(["What is BTC doing?", "hello", "hello"])
+    vector = cache.embed_query("What is BTC doing?")
+
+    assert underlying.calls == [["What is BTC doing?", "hello"]]
+    assert vector == [18.0, 1.0]
+    assert cache.stats().hits == 1
+
+
+async def test_async_embeddings_use_the_same_cache():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, model="test-model", max_entries=10)
+
+    await cache.aembed_documents(["ETH outlook"])
+    await cache.aembed_query("ETH outlook")
+
+    assert len(underlying.calls) == 1
+
+
+def test_cache_keys_include_model_name():
+    underlying = CountingEmbeddings()
+    small = CachedEmbeddings(underlying, model="small", max_entries=10)
+    large = CachedEmbeddings(underlying, model="large", max_entries=10)
+
+    assert small.key_for("BTC") != large.key_for("BTC")
+
+
+def test_disk_tier_survives_new_instances(tmp_path):
+    path = tmp_path / "embedding-cache.sqlite3"
+    first = CachedEmbeddings(CountingEmbeddings(), "test-model", 10, disk_path=path)
+    first.embed_documents(["SOL news"])
+
+    underlying = CountingEmbeddings()
+    second = CachedEmbeddings(underlying, "test-model", 10, disk_path=path)
+
+    assert second.embed_query("SOL news") == [8.0, 1.0]
+    assert underlying.calls == []
+    assert second.stats().disk_hits == 1
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from app.services.fakes import (
+    FAKE_ANSWER,
+    FakeChatModel,
+    FakeEmbeddings,
+    FakeSearchProvider,
+    LatencyDistribution,
+)
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [
+        ("0.25", LatencyDistribution("fixed", 0.25)),
+        ("fixed:0", LatencyDistribution("fixed", 0.0)),
+        ("uniform:0.1,0.3", LatencyDistribution("uniform", 0.1, 0.3)),
+        ("lognormal:0.8,0.5", LatencyDistribution("lognormal", 0.8, 0.5)),
+    ],
+)
+def test_latency_specs_parse(spec, expected):
+    assert LatencyDistribution.parse(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["gamma:1,2", "uniform:0.1", "fixed:-1", "fast"])
+def test_invalid_latency_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse(spec)
+
+
+def test_samples_stay_in_range_and_replay_with_a_seed():
+    uniform = LatencyDistribution.parse("uniform:0.1,0.3")
+    lognormal = LatencyDistribution.parse("lognormal:0.8,0.5")
+
+    samples = [uniform.sample(random.Random(7)) for _ in range(3)]
+    assert len(set(samples)) == 1
+    assert all(0.1 <= value <= 0.3 for value in samples)
+    assert min(lognormal.sample(random.Random(seed)) for seed in range(200)) > 0
+
+
+async def test_fake_chat_model_streams_the_canned_answer():
+    model = FakeChatModel()
+
+    chunks = [chunk.content async for chunk in model.astream("How is BTC?")]
+    reply = await model.ainvoke("How is BTC?")
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == FAKE_ANSWER == reply.content
+
+
+async def test_fake_embeddings_are_deterministic():
+    embeddings = FakeEmbeddings(LatencyDistribution.parse("fixed:0"))
+
+    first = await embeddings.aembed_query("BTC")
+    assert first == (await embeddings.aembed_documents(["BTC"]))[0]
+    assert first != await embeddings.aembed_query("ETH")
+
+
+async def test_fake_search_provider_returns_hits_or_fails_on_demand():
+    latency = LatencyDistribution.parse("fixed:0")
+
+    hits = await FakeSearchProvider("fake", latency).search("BTC", max_results=3)
+
+    assert len(hits) == 3
+    assert hits[0].format().endswith("(source: fake)")
+    with pytest.raises(ConnectionError):
+        await FakeSearchProvider("fake", latency, failure_rate=1.0).search("BTC", 3)
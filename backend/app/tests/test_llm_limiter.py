@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_limiter import LLMConcurrencyLimiter, LLMOverloadedError
+
+
+async def test_limiter_caps_concurrent_calls():
+    limiter = LLMConcurrencyLimiter(max_concurrency=2, max_queue=10, queue_timeout=5)
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(8)))
+
+    assert peak == 2
+    stats = limiter.stats()
+    assert stats.admitted == 8
+    assert stats.active == 0
+    assert stats.waiting == 0
+    assert stats.max_wait_ms > 0
+
+
+async def _wait_until(predicate, timeout: float = 1.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+
+async def test_full_queue_rejects_immediately_with_retry_hint():
+    limiter = LLMConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()), asyncio.create_task(hold())]
+    try:
+        await _wait_until(lambda: limiter.active == 1 and limiter.waiting == 1)
+
+        with pytest.raises(LLMOverloadedError) as exc_info:
+            async with limiter.slot():
+                pass
+        assert exc_info.value.retry_after >= 1
+        assert limiter.stats().rejected == 1
+    finally:
+        release.set()
+        await asyncio.gather(*tasks)
+
+
+async def test_queued_call_times_out():
+    limiter = LLMConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout=0.01)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    try:
+        await _wait_until(lambda: limiter.active == 1)
+
+        with pytest.raises(LLMOverloadedError):
+            async with limiter.slot():
+                pass
+        assert limiter.stats().timed_out == 1
+        assert limiter.waiting == 0
+    finally:
+        release.set()
+        await holder
@@ -0,0 +1,32 @@
+import httpx
+
+from app.scripts.load_test import percentile, run_load_test
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+async def test_run_load_test_counts_successes_and_errors():
+    sent_to: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_to.append(request.url.path)
+        if request.headers["X-User-Id"] == "load-test-b":
+            return httpx.Response(429, json={"detail": "Rate limit exceeded"})
+        return httpx.Response(200, json={})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        result = await run_load_test(client, rps=200, duration_seconds=0.05, chat_ids=["a", "b"])
+
+    assert result.sent == 10
+    assert result.succeeded == 5
+    assert result.errors == {"429": 5}
+    assert result.error_rate == 0.5
+    assert sorted(set(sent_to)) == ["/api/chats/a/messages", "/api/chats/b/messages"]
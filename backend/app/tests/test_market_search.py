@@ -0,0 +1,193 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.market_search import (
+    CircuitBreaker,
+    MarketSearch,
+    SearchHit,
+    SearchUnavailableError,
+)
+
+
+class StubProvider:
+    def __init__(self, name, delay=0.0, hits=None, error=None):
+        self.name = name
+        self.delay = delay
+        self.hits = hits if hits is not None else [_hit(f"{name} 1"), _hit(f"{name} 2")]
+        self.error = error
+        self.started = 0
+        self.finished = 0
+
+    async def search(self, query, max_results):
+        self.started += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.finished += 1
+        return self.hits[:max_results]
+
+
+def _hit(title, url=None):
+    slug = title.lower().replace(" ", "-")
+    return SearchHit(title=title, snippet="snippet", url=url or f"https://{slug}.test/")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def test_parallel_latency_follows_the_fastest_provider():
+    slow = StubProvider("slow", delay=2.0)
+    fast = StubProvider("fast", delay=0.01)
+    search = MarketSearch([slow, fast], strategy="parallel", merge_window=0.0)
+
+    started = time.perf_counter()
+    results = await search.search("BTC")
+
+    assert time.perf_counter() - started < 0.5
+    assert results == [f"fast {rank} - snippet (source: fast-{rank}.test)" for rank in (1, 2)]
+    assert (slow.started, slow.finished) == (1, 0)
+    stats = {provider.name: provider for provider in search.stats()}
+    assert stats["slow"].cancelled == 1
+    assert stats["slow"].state == "closed"
+
+
+async def test_results_within_the_merge_window_are_interleaved_and_deduplicated():
+    shared = _hit("BTC rallies", url="https://www.news.test/btc/")
+    first = StubProvider("first", delay=0.02, hits=[shared, _hit("first only")])
+    second = StubProvider(
+        "second",
+        delay=0.01,
+        hits=[_hit("BTC Rallies", url="https://news.test/btc"), _hit("second only")],
+    )
+    search = MarketSearch([first, second], max_results=5, merge_window=0.5)
+
+    results = await search.search("BTC")
+
+    # Priority order wins ties: the duplicate is kept from "first", listed first.
+    assert [line.split(" - ")[0] for line in results] == [
+        "BTC rallies",
+        "first only",
+        "second only",
+    ]
+
+
+async def test_hedged_search_only_calls_the_backup_when_the_primary_is_slow():
+    primary = StubProvider("primary", delay=0.01)
+    backup = StubProvider("backup")
+    search = MarketSearch([primary, backup], strategy="hedged", hedge_delay=0.2)
+
+    await search.search("BTC")
+
+    assert backup.started == 0
+
+    primary.delay = 2.0
+    started = time.perf_counter()
+    results = await search.search("ETH")
+
+    assert time.perf_counter() - started < 0.6
+    assert backup.started == 1
+    assert results[0].startswith("backup 1")
+
+
+async def test_hedged_search_fails_over_without_waiting_for_the_hedge_delay():
+    broken = StubProvider("broken", error=ConnectionError("reset"))
+    backup = StubProvider("backup", delay=0.01)
+    search = MarketSearch([broken, backup], strategy="hedged", hedge_delay=5.0)
+
+    started = time.perf_counter()
+    results = await search.search("BTC")
+
+    assert time.perf_counter() - started < 0.5
+    assert results[0].startswith("backup 1")
+
+
+async def test_provider_timeout_counts_as_a_failure():
+    stuck = StubProvider("stuck", delay=5.0)
+    search = MarketSearch([stuck], provider_timeout=0.05, failure_threshold=1)
+
+    with pytest.raises(SearchUnavailableError):
+        await search.search("BTC")
+
+    (stats,) = search.stats()
+    assert (stats.timed_out, stats.state) == (1, "open")
+
+
+async def test_open_circuit_skips_the_provider_until_a_trial_succeeds():
+    clock = FakeClock()
+    flaky = StubProvider("flaky", error=ConnectionError("503"))
+    healthy = StubProvider("healthy")
+    search = MarketSearch(
+        [flaky, healthy], failure_threshold=2, reset_seconds=30, clock=clock
+    )
+
+    for _ in range(2):
+        await search.search("BTC")
+    await search.search("BTC")
+
+    assert flaky.started == 2
+    assert search.stats()[0].skipped == 1
+
+    clock.now = 31
+    flaky.error = None
+    await search.search("BTC")
+
+    assert flaky.started == 3
+    assert search.stats()[0].state == "closed"
+
+
+def test_failed_trial_reopens_the_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    assert (breaker.state, breaker.allow()) == ("open", False)
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time.
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    clock.now = 20
+    assert breaker.state == "half_open"
+
+
+async def test_every_provider_failing_raises():
+    search = MarketSearch(
+        [StubProvider("a", error=RuntimeError("down")), StubProvider("b", error=OSError("down"))]
+    )
+
+    with pytest.raises(SearchUnavailableError):
+        await search.search("BTC")
+
+
+async def test_unneeded_hedge_leaves_a_half_open_backup_its_trial():
+    clock = FakeClock()
+    primary = StubProvider("primary", error=ConnectionError("503"))
+    backup = StubProvider("backup", error=ConnectionError("503"))
+    search = MarketSearch(
+        [primary, backup],
+        strategy="hedged",
+        hedge_delay=0.05,
+        failure_threshold=1,
+        reset_seconds=10,
+        clock=clock,
+    )
+    with pytest.raises(SearchUnavailableError):
+        await search.search("BTC")
+
+    clock.now = 10
+    primary.error = None
+    await search.search("BTC")  # Both half-open; the primary's trial is enough.
+    primary.delay, backup.error = 0.5, None
+    results = await search.search("ETH")
+
+    assert backup.started == 2
+    assert results[0].startswith("backup 1")
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.exc import OperationalError
+
+from app.db import Base
+from app.db.session import create_async_db_engine
+from app.models import MarketSnapshot
+from app.scripts.ingest_market_snapshots import ingest_snapshots
+from app.services.market_search import MarketSearch, SearchHit
+from app.services.market_snapshots import MarketSnapshots, Watchlist
+
+
+class TopicProvider:
+    name = "stub"
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.queries: list[str] = []
+
+    async def search(self, query, max_results):
+        self.queries.append(query)
+        if query in self.failing:
+            raise ConnectionError("503")
+        return [SearchHit(title=f"{query} news", snippet="moves", url=f"https://{query}.test")]
+
+
+@pytest.fixture()
+async def snapshots(tmp_path):
+    url = f"sqlite:///{tmp_path / 'snapshots.db'}"
+    Base.metadata.create_all(create_engine(url))
+    engine = create_async_db_engine(url)
+    watchlist = Watchlist(["bitcoin|BTC", "ethereum|ETH", "S&P 500|S&P"])
+    yield MarketSnapshots(engine, watchlist, max_age_seconds=600)
+    await engine.dispose()
+
+
+def test_watchlist_matches_whole_aliases_case_insensitively():
+    watchlist = Watchlist(["bitcoin|BTC", "S&P 500|S&P", "Federal Reserve|Fed", "Bitcoin|XBT"])
+
+    def topics(question):
+        return [topic.query for topic in watchlist.match(question)]
+
+    assert len(watchlist.topics) == 3  # A repeated query keeps its first entry.
+    assert topics("Is btc up today?") == ["bitcoin"]
+    assert topics("How did the S&P  500 close vs Bitcoin?") == ["bitcoin", "S&P 500"]
+    assert topics("What will the Fed do?") == ["Federal Reserve"]
+    assert topics("Any BTCUSD charts?") == []
+    assert topics("Tell me about feds and btcs") == []
+
+
+async def test_lookup_reads_fresh_snapshots_and_falls_back_when_stale(snapshots):
+    search = MarketSearch([TopicProvider(failing={"ethereum"})])
+
+    result = await ingest_snapshots(snapshots, search)
+
+    assert (result.topics, result.refreshed, result.failed) == (3, 2, ["ethereum"])
+    assert await snapshots.lookup("BTC price?") == ["bitcoin news - moves (source: bitcoin.test)"]
+    assert await snapshots.lookup("BTC vs S&P 500?") == [
+        "bitcoin news - moves (source: bitcoin.test)",
+        "S&P 500 news - moves (source: S&P 500.test)",
+    ]
+    # Any topic without a fresh snapshot sends the question to live search.
+    assert await snapshots.lookup("BTC or ETH?") is None
+    assert await snapshots.lookup("What about Tesla?") is None
+
+    async with snapshots.engine.begin() as conn:
+        await conn.execute(
+            update(MarketSnapshot).values(
+                fetched_at=datetime.now(timezone.utc) - timedelta(seconds=601)
+            )
+        )
+    assert await snapshots.lookup("BTC price?") is None
+    stats = snapshots.stats()
+    assert (stats.hits, stats.stale, stats.unmatched) == (2, 2, 1)
+
+
+async def test_ingest_overwrites_the_previous_snapshot(snapshots):
+    provider = TopicProvider()
+    search = MarketSearch([provider])
+    await ingest_snapshots(snapshots, search)
+    first = await snapshots.lookup("BTC")
+
+    await ingest_snapshots(snapshots, search)
+
+    assert await snapshots.lookup("BTC") == first
+    assert sorted(provider.queries) == sorted(["bitcoin", "ethereum", "S&P 500"] * 2)
+
+
+async def test_a_topic_that_cannot_be_saved_does_not_stop_the_others(snapshots, monkeypatch):
+    save = snapshots.save
+
+    async def flaky_save(topic, results):
+        if topic.query == "bitcoin":
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        await save(topic, results)
+
+    monkeypatch.setattr(snapshots, "save", flaky_save)
+
+    result = await ingest_snapshots(snapshots, MarketSearch([TopicProvider()]))
+
+    assert (result.refreshed, result.failed) == (2, ["bitcoin"])
+    assert await snapshots.lookup("BTC") is None
+    assert await snapshots.lookup("ETH") is not None
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.agent import AgentService
+from app.services.memory_indexer import MemoryIndexer
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def __call__(self, texts, metadatas):
+        assert len(texts) == len(metadatas)
+        self.batches.append(list(texts))
+
+
+async def test_indexer_flushes_full_batches_immediately():
+    writer = RecordingWriter()
+    indexer = MemoryIndexer(writer, batch_size=3, flush_interval=10, max_queue=100)
+    await indexer.start()
+
+    for index in range(3):
+        assert indexer.enqueue(f"text {index}", {"chat_id": "chat-1"})
+    await asyncio.sleep(0.05)
+
+    assert writer.batches == [["text 0", "text 1", "text 2"]]
+    await indexer.stop()
+
+
+async def test_indexer_flushes_partial_batch_after_interval():
+    writer = RecordingWriter()
+    indexer = MemoryIndexer(writer, batch_size=10, flush_interval=0.05, max_queue=100)
+    await indexer.start()
+
+    indexer.enqueue("lonely", {"chat_id": "chat-1"})
+    assert indexer.queue_depth == 1
+    await asyncio.sleep(0.15)
+
+    assert writer.batches == [["lonely"]]
+    assert indexer.stats().indexed == 1
+    await indexer.stop()
+
+
+async def test_indexer_drains_queue_on_stop():
+    writer = RecordingWriter()
+    indexer = MemoryIndexer(writer, batch_size=2, flush_interval=10, max_queue=100)
+    await indexer.start()
+
+    for index in range(5):
+        indexer.enqueue(f"text {index}", {"chat_id": "chat-1"})
+    await indexer.stop()
+
+    assert [text for batch in writer.batches for text in batch] == [
+        f"text {index}" for index in range(5)
+    ]
+    assert not indexer.running
+    assert not indexer.enqueue("late", {"chat_id": "chat-1"})
+
+
+async def test_indexer_drops_when_queue_is_full():
+    writer = RecordingWriter()
+    indexer = MemoryIndexer(writer, batch_size=10, flush_interval=10, max_queue=1)
+    await indexer.start()
+    await asyncio.sleep(0)
+
+    indexer.enqueue("first", {"chat_id": "chat-1"})
+    indexer.enqueue("second", {"chat_id": "chat-1"})
+    accepted = indexer.enqueue("third", {"chat_id": "chat-1"})
+
+    assert not accepted
+    assert indexer.stats().dropped >= 1
+    await indexer.stop()
+
+
+async def test_persist_memory_drops_instead_of_writing_inline_when_queue_is_full():
+    indexer_writer = RecordingWriter()
+    inline_writer = RecordingWriter()
+    indexer = MemoryIndexer(indexer_writer, batch_size=10, flush_interval=10, max_queue=1)
+    service = SimpleNamespace(
+        vector_store=object(), memory_indexer=indexer, _write_memory_batch=inline_writer
+    )
+    await indexer.start()
+    await asyncio.sleep(0)
+
+    for index in range(3):
+        await AgentService.persist_memory(service, "chat-1", "user", f"text {index}")
+
+    assert inline_writer.batches == []
+    assert indexer.stats().dropped >= 1
+    await indexer.stop()
+
+
+async def test_persist_memory_writes_inline_without_indexer():
+    inline_writer = RecordingWriter()
+    indexer = MemoryIndexer(RecordingWriter(), batch_size=10, flush_interval=10, max_queue=1)
+    service = SimpleNamespace(
+        vector_store=object(), memory_indexer=indexer, _write_memory_batch=inline_writer
+    )
+
+    await AgentService.persist_memory(service, "chat-1", "user", "hello")
+
+    assert inline_writer.batches == [["hello"]]
@@ -0,0 +1,158 @@
+import json
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+import app.models  # noqa: F401 - register models on Base.metadata
+from app.db import Base
+from app.db.migrate import build_alembic_config, run_migrations
+
+HEAD = ScriptDirectory.from_config(build_alembic_config()).get_current_head()
+
+
+def _schema_diff(engine):
+    with engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+
+def _revision(engine) -> str:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    run_migrations(engine)
+
+    assert _schema_diff(engine) == []
+    assert _revision(engine) == HEAD
+
+
+def test_unversioned_database_is_stamped_and_upgraded(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # The original create_all schema: no summary columns, counters or composite indexes.
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE chat_sessions (id VARCHAR(36) PRIMARY KEY, title VARCHAR(255) NOT NULL,"
+                " created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE messages (id VARCHAR(36) PRIMARY KEY,"
+                " chat_session_id VARCHAR(36) NOT NULL REFERENCES chat_sessions(id),"
+                " role VARCHAR(20) NOT NULL, content TEXT NOT NULL,"
+                " created_at DATETIME NOT NULL, metadata JSON)"
+            )
+        )
+        connection.execute(
+            text("CREATE INDEX ix_messages_chat_session_id ON messages (chat_session_id)")
+        )
+        connection.execute(
+            text(
+                "INSERT INTO chat_sessions VALUES"
+                " ('c1', 'BTC', '2026-01-01 00:00:00', '2026-01-01 00:00:00')"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO messages VALUES"
+                " ('m1', 'c1', 'user', 'hi', '2026-01-01 00:00:01', NULL),"
+                " ('m2', 'c1', 'assistant', 'hello', '2026-01-01 00:00:02', NULL)"
+            )
+        )
+
+    run_migrations(engine)
+
+    assert _revision(engine) == HEAD
+    columns = {column["name"] for column in inspect(engine).get_columns("chat_sessions")}
+    assert {"summary", "summarized_message_count"} <= columns
+    indexes = {index["name"] for index in inspect(engine).get_indexes("messages")}
+    assert "ix_messages_chat_session_id_created_at_id" in indexes
+    with engine.connect() as connection:
+        count, last = connection.execute(
+            text("SELECT message_count, last_message_at FROM chat_sessions WHERE id = 'c1'")
+        ).one()
+    assert count == 2
+    assert last == "2026-01-01 00:00:02"
+
+
+def test_inline_context_moves_into_deduplicated_blobs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'context.db'}")
+    sources = '[{"title": "BTC rallies"}]'
+    with engine.begin() as connection:
+        config = build_alembic_config(connection)
+        command.upgrade(config, "0004")
+        connection.execute(
+            text(
+                "INSERT INTO chat_sessions (id, title, created_at, updated_at, message_count,"
+                " summarized_message_count) VALUES"
+                " ('c1', 'BTC', '2026-01-01 00:00:00', '2026-01-01 00:00:00', 2, 0)"
+            )
+        )
+        for message_id in ("m1", "m2"):
+            connection.execute(
+                text(
+                    "INSERT INTO messages VALUES (:id, 'c1', 'assistant', 'up',"
+                    " '2026-01-01 00:00:01', :metadata)"
+                ),
+                {
+                    "id": message_id,
+                    "metadata": '{"search_results": %s, "vector_context": "None",'
+                    ' "answer_cache": {"hit": false}}' % sources,
+                },
+            )
+        command.upgrade(config, "0005")
+
+        rows = connection.execute(
+            text("SELECT metadata, search_results_hash FROM messages ORDER BY id")
+        ).all()
+        assert [json.loads(metadata) for metadata, _ in rows] == [
+            {"answer_cache": {"hit": False}}
+        ] * 2
+        assert rows[0].search_results_hash == rows[1].search_results_hash
+        assert connection.execute(text("SELECT count(*) FROM context_blobs")).scalar_one() == 2
+
+        command.downgrade(config, "0004")
+
+        metadata = connection.execute(text("SELECT metadata FROM messages WHERE id = 'm1'"))
+        assert json.loads(metadata.scalar_one()) == {
+            "search_results": json.loads(sources),
+            "vector_context": "None",
+            "answer_cache": {"hit": False},
+        }
+
+
+def test_summary_seek_position_is_backfilled(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'summary.db'}")
+    with engine.begin() as connection:
+        config = build_alembic_config(connection)
+        command.upgrade(config, "0006")
+        connection.execute(
+            text(
+                "INSERT INTO chat_sessions (id, title, created_at, updated_at, message_count,"
+                " summarized_message_count) VALUES"
+                " ('c1', 'BTC', '2026-01-01 00:00:00', '2026-01-01 00:00:00', 3, 2),"
+                " ('c2', 'ETH', '2026-01-01 00:00:00', '2026-01-01 00:00:00', 1, 0)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO messages (id, chat_session_id, role, content, created_at) VALUES"
+                " ('m3', 'c1', 'user', 'c', '2026-01-01 00:00:02'),"
+                " ('m2', 'c1', 'assistant', 'b', '2026-01-01 00:00:01'),"
+                " ('m1', 'c1', 'user', 'a', '2026-01-01 00:00:01'),"
+                " ('m4', 'c2', 'user', 'd', '2026-01-01 00:00:01')"
+            )
+        )
+        command.upgrade(config, "0007")
+
+        rows = connection.execute(
+            text("SELECT id, summarized_through_id FROM chat_sessions ORDER BY id")
+        ).all()
+    assert [tuple(row) for row in rows] == [("c1", "m2"), ("c2", None)]
@@ -0,0 +1,21 @@
+from app.scripts.profile_startup import parse_importtime
+
+
+def test_parse_importtime_reads_depth_and_cumulative_time():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     langgraph.graph",
+            "import time:       300 |       2500 |   app.services.agent",
+            "import time:        50 |       4000 | app.main",
+        ]
+    )
+
+    timings = parse_importtime(output)
+
+    assert [(t.module, t.depth) for t in timings] == [
+        ("langgraph.graph", 2),
+        ("app.services.agent", 1),
+        ("app.main", 0),
+    ]
+    assert timings[-1].cumulative_seconds == 0.004
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import chromadb
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.db.session as db_session
+from app.db import Base
+from app.models import ChatSession, ContextBlob, Message
+from app.scripts.purge_chats import purge_chats
+from app.services.context_blobs import encode_context
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'purge.db'}", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    monkeypatch.setattr(db_session, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture()
+def collection():
+    client = chromadb.EphemeralClient()
+    return client.create_collection(f"memory-{uuid4().hex[:8]}")
+
+
+def _seed(factory, collection, *, age_hours: float, messages: int) -> str:
+    stamp = datetime.now(timezone.utc) - timedelta(hours=age_hours)
+    with factory() as session:
+        chat = ChatSession(title="chat", created_at=stamp, updated_at=stamp)
+        session.add(chat)
+        session.flush()
+        for index in range(messages):
+            session.add(
+                Message(chat_session_id=chat.id, role="user", content=f"m{index}", created_at=stamp)
+            )
+        session.commit()
+        chat_id = chat.id
+    collection.add(
+        ids=[f"{chat_id}-{index}" for index in range(messages)],
+        documents=[f"m{index}" for index in range(messages)],
+        embeddings=[[float(index), 1.0] for index in range(messages)],
+        metadatas=[{"chat_id": chat_id} for _ in range(messages)],
+    )
+    return chat_id
+
+
+def test_purge_deletes_old_chats_in_batches_with_their_vectors(session_factory, collection):
+    old = [_seed(session_factory, collection, age_hours=48, messages=2) for _ in range(3)]
+    recent = _seed(session_factory, collection, age_hours=1, messages=2)
+
+    result = purge_chats(24, batch_size=2, vector_collections=[collection])
+
+    assert (result.chats, result.messages, result.vectors) == (3, 6, 6)
+    assert result.batches == 2
+    with session_factory() as session:
+        assert list(session.scalars(select(ChatSession.id))) == [recent]
+        assert session.scalar(select(func.count()).select_from(Message)) == 2
+    remaining = collection.get(include=["metadatas"])["metadatas"]
+    assert {metadata["chat_id"] for metadata in remaining} == {recent}
+    assert not set(old) & {metadata["chat_id"] for metadata in remaining}
+
+
+def test_dry_run_only_counts(session_factory, collection):
+    _seed(session_factory, collection, age_hours=48, messages=3)
+
+    result = purge_chats(24, dry_run=True, vector_collections=[collection])
+
+    assert (result.chats, result.messages, result.vectors) == (1, 3, 3)
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(Message)) == 3
+    assert collection.count() == 3
+
+
+def test_purge_drops_context_blobs_no_remaining_message_uses(session_factory):
+    shared, own = encode_context(["BTC rallies"]), encode_context(["ETH slips"])
+    with session_factory() as session:
+        session.add_all([shared, own])
+        for name, hours in {"old": 48, "recent": 1}.items():
+            stamp = datetime.now(timezone.utc) - timedelta(hours=hours)
+            chat = ChatSession(title=name, created_at=stamp, updated_at=stamp)
+            session.add(chat)
+            session.flush()
+            session.add(
+                Message(
+                    chat_session_id=chat.id,
+                    role="assistant",
+                    content="answer",
+                    created_at=stamp,
+                    search_results_hash=shared.hash,
+                    vector_context_hash=own.hash if name == "old" else None,
+                )
+            )
+        session.commit()
+
+    assert purge_chats(24, dry_run=True).blobs == 1
+    result = purge_chats(24)
+
+    assert (result.chats, result.messages, result.blobs) == (1, 1, 1)
+    with session_factory() as session:
+        assert list(session.scalars(select(ContextBlob.hash))) == [shared.hash]
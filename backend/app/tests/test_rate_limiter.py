@@ -1,7 +1,11 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
 
-from app.core.rate_limiter import RateLimiter
+from app.core.rate_limiter import GcraRateLimitBackend, RateLimiter, SqlRateLimitBackend
+from app.db import Base
+from app.models import RateLimitCounter
 
 
 def test_rate_limiter_allows_within_limits():
@@ -16,6 +20,17 @@ def test_rate_limiter_allows_within_limits():
     assert result.remaining_daily == 3
 
 
+
+def test_rate_limiter_remaining_is_exact_despite_float_drift(monkeypatch):
+    # At this clock reading ``new_tat - now`` is not exactly one interval.
+    monkeypatch.setattr("app.core.rate_limiter.time.monotonic", lambda: 246197.11463343407)
+    limiter = RateLimiter(hourly_limit=2, daily_limit=5)
+
+    result = limiter.check("user-1")
+
+    assert result.remaining_hourly == 1
+    assert result.remaining_daily == 4
+
 def test_rate_limiter_blocks_when_limit_exceeded():
     limiter = RateLimiter(hourly_limit=1, daily_limit=1)
     limiter.check("user-2")
@@ -24,3 +39,63 @@ def test_rate_limiter_blocks_when_limit_exceeded():
         limiter.check("user-2")
 
     assert exc_info.value.status_code == 429
+
+
+@pytest.fixture()
+async def sql_backend(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'limits.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield SqlRateLimitBackend(engine)
+    await engine.dispose()
+
+
+async def test_sql_backend_shares_counters_between_limiters(sql_backend):
+    # Two limiters on one database behave like two replicas.
+    first = RateLimiter(hourly_limit=3, daily_limit=10, backend=sql_backend)
+    second = RateLimiter(hourly_limit=3, daily_limit=10, backend=sql_backend)
+
+    assert (await first.acheck("user-3")).remaining_hourly == 2
+    assert (await second.acheck("user-3")).remaining_hourly == 1
+    result = await first.acheck("user-3")
+    assert result.remaining_hourly == 0
+    assert result.remaining_daily == 7
+
+    with pytest.raises(HTTPException) as exc_info:
+        await second.acheck("user-3")
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) > 0
+
+    # The rejected request was not counted, and other users are unaffected.
+    async with sql_backend.engine.connect() as conn:
+        counts = (
+            await conn.execute(
+                select(RateLimitCounter.current_count).where(RateLimitCounter.key == "user-3")
+            )
+        ).scalars().all()
+    assert sorted(counts) == [3, 3]
+    assert (await first.acheck("user-4")).remaining_hourly == 2
+
+
+def test_rate_limiter_reports_retry_after_from_bucket_state():
+    limiter = RateLimiter(hourly_limit=2, daily_limit=100)
+    limiter.check("user-5")
+    limiter.check("user-5")
+
+    with pytest.raises(HTTPException) as exc_info:
+        limiter.check("user-5")
+
+    # One request is emitted every 30 minutes once the burst is used up.
+    retry_after = int(exc_info.value.headers["Retry-After"])
+    assert 1790 <= retry_after <= 1800
+    assert exc_info.value.headers["X-RateLimit-Remaining-Hourly"] == "0"
+
+
+def test_gcra_backend_bounds_tracked_users():
+    backend = GcraRateLimitBackend(shards=4, max_keys=40)
+    limiter = RateLimiter(hourly_limit=5, daily_limit=50, backend=backend)
+
+    for index in range(500):
+        limiter.check(f"user-{index}")
+
+    assert len(backend) <= 40
@@ -1,8 +1,14 @@
+import asyncio
 import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from app import main
@@ -12,8 +18,11 @@ import app.db as db_package
 import app.db.session as db_session
 from app.core.config import get_settings
 from app.core.rate_limiter import RateLimiter
-from app.db import Base
-from app.services import AgentService
+from app.models import ContextBlob, Message
+from app.services import get_agent_service, reset_agent_service
+from app.models.agent_response import AgentResponse, AgentStreamEvent
+from app.services.llm_limiter import LLMOverloadedError
+from app.services.title_scheduler import TitleScheduler
 
 
 @pytest.fixture()
@@ -22,6 +31,11 @@ def client(tmp_path, monkeypatch):
     db_path = tmp_path / "test.db"
     os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
     os.environ["CHROMA_PERSIST_DIRECTORY"] = str(tmp_path / "chroma")
+    # Offline fakes for OpenAI, with no artificial latency.
+    monkeypatch.setenv("FAKE_SERVICES", "true")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "fixed:0")
+    monkeypatch.setenv("FAKE_LLM_TOKEN_DELAY_SECONDS", "0")
+    monkeypatch.setenv("FAKE_EMBEDDING_LATENCY", "fixed:0")
 
     get_settings.cache_clear()
     settings = get_settings()
@@ -30,7 +44,11 @@ def client(tmp_path, monkeypatch):
     TestingSessionLocal = sessionmaker(
         bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True
     )
-    Base.metadata.create_all(bind=engine)
+    # Tables are created by the app's startup migrations.
+    async_engine = db_session.create_async_db_engine(settings.database_url)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+    )
 
     def override_get_db():
         db = TestingSessionLocal()
@@ -39,17 +57,32 @@ def client(tmp_path, monkeypatch):
         finally:
             db.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     main.app.dependency_overrides[deps_module.get_db] = override_get_db
+    main.app.dependency_overrides[deps_module.get_async_db] = override_get_async_db
 
     monkeypatch.setattr(main, "settings", settings, raising=False)
     monkeypatch.setattr(db_session, "settings", settings, raising=False)
     monkeypatch.setattr(db_session, "engine", engine, raising=False)
     monkeypatch.setattr(db_session, "SessionLocal", TestingSessionLocal, raising=False)
+    monkeypatch.setattr(db_session, "async_engine", async_engine, raising=False)
+    monkeypatch.setattr(
+        db_session, "AsyncSessionLocal", TestingAsyncSessionLocal, raising=False
+    )
     monkeypatch.setattr(db_package, "engine", engine, raising=False)
     monkeypatch.setattr(db_package, "SessionLocal", TestingSessionLocal, raising=False)
+    monkeypatch.setattr(
+        db_package, "AsyncSessionLocal", TestingAsyncSessionLocal, raising=False
+    )
 
     monkeypatch.setattr(deps_module, "settings", settings, raising=False)
     monkeypatch.setattr(deps_module, "SessionLocal", TestingSessionLocal, raising=False)
+    monkeypatch.setattr(
+        deps_module, "AsyncSessionLocal", TestingAsyncSessionLocal, raising=False
+    )
     monkeypatch.setattr(
         deps_module,
         "rate_limiter",
@@ -57,24 +90,35 @@ def client(tmp_path, monkeypatch):
         raising=False,
     )
 
-    test_agent = AgentService(settings=settings)
+    # Built up front so tests can patch it before the app's warm-up runs.
+    reset_agent_service()
+    get_agent_service()
     monkeypatch.setattr(chats_routes, "settings", settings, raising=False)
-    monkeypatch.setattr(chats_routes, "agent_service", test_agent, raising=False)
+    monkeypatch.setattr(
+        chats_routes,
+        "title_scheduler",
+        TitleScheduler(
+            chats_routes.title_scheduler._generate,
+            debounce_seconds=0,
+            is_busy=lambda: False,
+        ),
+    )
     monkeypatch.setattr(main, "engine", engine, raising=False)
 
     with TestClient(main.app) as test_client:
         yield test_client
 
     main.app.dependency_overrides.clear()
+    reset_agent_service()
 
 
 def test_create_chat_and_send_message(client):
-    create_resp = client.post("/chats", json={"title": "Macro Outlook"})
+    create_resp = client.post("/api/chats", json={"title": "Macro Outlook"})
     assert create_resp.status_code == 201
     chat_id = create_resp.json()["id"]
 
     message_resp = client.post(
-        f"/chats/{chat_id}/messages",
+        f"/api/chats/{chat_id}/messages",
         json={"content": "What is the market sentiment on BTC today?"},
         headers={"X-User-Id": "test-user"},
     )
@@ -86,10 +130,397 @@ def test_create_chat_and_send_message(client):
 
 
 def test_list_chats_returns_created_chat(client):
-    create_resp = client.post("/chats", json={"title": "Equities"})
+    create_resp = client.post("/api/chats", json={"title": "Equities"})
     chat_id = create_resp.json()["id"]
 
-    list_resp = client.get("/chats")
+    list_resp = client.get("/api/chats")
     assert list_resp.status_code == 200
     data = list_resp.json()
-    assert any(chat["id"] == chat_id for chat in data)
+    assert any(chat["id"] == chat_id for chat in data["items"])
+
+
+def test_stream_message_emits_progress_and_done_events(client):
+    create_resp = client.post("/api/chats", json={"title": "Crypto"})
+    chat_id = create_resp.json()["id"]
+
+    with client.stream(
+        "POST",
+        f"/api/chats/{chat_id}/messages/stream",
+        json={"content": "How is ETH trading?"},
+        headers={"X-User-Id": "test-user"},
+    ) as stream_resp:
+        assert stream_resp.status_code == 200
+        assert stream_resp.headers["content-type"].startswith("text/event-stream")
+        body = "".join(stream_resp.iter_text())
+
+    events = [
+        line.removeprefix("event: ")
+        for line in body.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert events[0] == "message"
+    assert "search" in events
+    assert "memory" in events
+    assert events[-1] == "done"
+
+    detail = client.get(f"/api/chats/{chat_id}").json()
+    assert [m["role"] for m in detail["messages"]] == ["user", "assistant"]
+
+
+def test_list_chats_walks_all_chats_with_cursor(client):
+    created = {
+        client.post("/api/chats", json={"title": f"Chat {i}"}).json()["id"]
+        for i in range(5)
+    }
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/chats", params=params).json()
+        assert len(page["items"]) <= 2
+        seen.extend(chat["id"] for chat in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert set(seen) == created
+
+
+def test_list_chat_messages_pages_in_both_directions(client):
+    chat_id = client.post("/api/chats", json={"title": "History"}).json()["id"]
+    with db_session.SessionLocal() as db:
+        for i in range(5):
+            db.add(Message(chat_session_id=chat_id, role="user", content=f"m{i}"))
+            db.commit()
+
+    def collect(order: str) -> list[str]:
+        contents: list[str] = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "order": order}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get(f"/api/chats/{chat_id}/messages", params=params).json()
+            contents.extend(m["content"] for m in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return contents
+
+    assert collect("asc") == ["m0", "m1", "m2", "m3", "m4"]
+    assert collect("desc") == ["m4", "m3", "m2", "m1", "m0"]
+
+
+def test_get_chat_returns_latest_messages_with_cursor_to_older_ones(client):
+    chat_id = client.post("/api/chats", json={"title": "Long"}).json()["id"]
+    with db_session.SessionLocal() as db:
+        for i in range(5):
+            db.add(Message(chat_session_id=chat_id, role="user", content=f"m{i}"))
+            db.commit()
+
+    detail = client.get(f"/api/chats/{chat_id}", params={"limit": 2}).json()
+    older = client.get(
+        f"/api/chats/{chat_id}/messages",
+        params={"order": "desc", "cursor": detail["older_messages_cursor"]},
+    ).json()
+
+    assert [m["content"] for m in detail["messages"]] == ["m3", "m4"]
+    assert [m["content"] for m in older["items"]] == ["m2", "m1", "m0"]
+    assert older["next_cursor"] is None
+
+
+def test_list_chat_messages_rejects_invalid_cursor(client):
+    chat_id = client.post("/api/chats", json={"title": "Bad cursor"}).json()["id"]
+
+    resp = client.get(f"/api/chats/{chat_id}/messages", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_post_message_returns_503_when_llm_queue_is_full(client, monkeypatch):
+    chat_id = client.post("/api/chats", json={"title": "Busy"}).json()["id"]
+
+    def reject() -> None:
+        raise LLMOverloadedError(retry_after=7)
+
+    monkeypatch.setattr(get_agent_service().llm_limiter, "admission_check", reject)
+
+    resp = client.post(
+        f"/api/chats/{chat_id}/messages",
+        json={"content": "What is BTC doing?"},
+        headers={"X-User-Id": "test-user"},
+    )
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    # Nothing was stored for the rejected turn.
+    assert client.get(f"/api/chats/{chat_id}").json()["messages"] == []
+
+
+def test_queue_timeout_during_generation_discards_the_turn(client, monkeypatch):
+    chat_id = client.post("/api/chats", json={"title": "Slow"}).json()["id"]
+
+    async def overloaded(**kwargs):
+        raise LLMOverloadedError(retry_after=3)
+
+    monkeypatch.setattr(get_agent_service(), "generate_response", overloaded)
+
+    resp = client.post(
+        f"/api/chats/{chat_id}/messages",
+        json={"content": "What is BTC doing?"},
+        headers={"X-User-Id": "test-user"},
+    )
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "3"
+    detail = client.get(f"/api/chats/{chat_id}").json()
+    assert detail["messages"] == []
+    assert detail["message_count"] == 0
+
+
+def test_stream_rejected_by_llm_queue_records_no_answer(client, monkeypatch):
+    chat_id = client.post("/api/chats", json={"title": "Slow stream"}).json()["id"]
+
+    async def overloaded(**kwargs):
+        yield AgentStreamEvent("error", {"detail": "busy", "retry_after": 3})
+
+    monkeypatch.setattr(get_agent_service(), "stream_response", overloaded)
+
+    with client.stream(
+        "POST",
+        f"/api/chats/{chat_id}/messages/stream",
+        json={"content": "How is ETH trading?"},
+        headers={"X-User-Id": "test-user"},
+    ) as stream_resp:
+        body = "".join(stream_resp.iter_text())
+
+    assert "event: error" in body
+    assert "event: done" not in body
+    assert client.get(f"/api/chats/{chat_id}").json()["messages"] == []
+
+
+def test_history_covers_every_message_the_summary_does_not(client, monkeypatch):
+    settings = chats_routes.settings
+    monkeypatch.setattr(settings, "history_window_messages", 2)
+    monkeypatch.setattr(settings, "history_summary_batch_messages", 4)
+    agent = get_agent_service()
+    histories: list[str] = []
+
+    async def answer(*, chat_id, user_id, history, prompt):
+        histories.append(history)
+        return AgentResponse(
+            answer=prompt.replace("q", "a"), search_results=[], vector_context="None"
+        )
+
+    async def summarize(summary, messages):
+        return "summary"
+
+    monkeypatch.setattr(agent, "generate_response", answer)
+    monkeypatch.setattr(agent, "summarize_history", summarize)
+    monkeypatch.setattr(agent, "persist_memory", lambda *args, **kwargs: asyncio.sleep(0))
+    chat_id = client.post("/api/chats", json={"title": "Window"}).json()["id"]
+
+    for turn in range(1, 6):
+        resp = client.post(f"/api/chats/{chat_id}/messages", json={"content": f"q{turn}"})
+        assert resp.status_code == 200
+
+    # q1..a2 were folded after turn 3; turn 5 must still see q3..a4 verbatim even
+    # though they are more than a window old and not yet summarized.
+    assert histories[0] == ""
+    last = histories[-1]
+    assert "summary" in last
+    for text in ("user: q3", "assistant: a3", "user: q4", "assistant: a4"):
+        assert text in last
+    assert "q1" not in last
+    assert "q5" not in last
+
+
+def test_title_is_generated_in_the_background_after_first_exchange(client, monkeypatch):
+    agent = get_agent_service()
+    titled_from: list[str] = []
+
+    async def answer(*, chat_id, user_id, history, prompt):
+        return AgentResponse(answer="BTC is up 3%.", search_results=[], vector_context="None")
+
+    async def suggest_title(history):
+        titled_from.append(history)
+        return "BTC sentiment"
+
+    monkeypatch.setattr(agent, "generate_response", answer)
+    monkeypatch.setattr(agent, "suggest_title", suggest_title)
+    monkeypatch.setattr(agent, "persist_memory", lambda *args, **kwargs: asyncio.sleep(0))
+    chat_id = client.post("/api/chats", json={}).json()["id"]
+
+    resp = client.post(f"/api/chats/{chat_id}/messages", json={"content": "How is BTC?"})
+    assert resp.status_code == 200
+
+    deadline = time.monotonic() + 2
+    while client.get(f"/api/chats/{chat_id}").json()["title"] != "BTC sentiment":
+        assert time.monotonic() < deadline, "title was not generated"
+        time.sleep(0.01)
+    assert titled_from == ["user: How is BTC?\nassistant: BTC is up 3%."]
+
+
+def test_new_title_does_not_move_the_chat_up_the_list(client, monkeypatch):
+    monkeypatch.setattr(chats_routes, "_schedule_title_refresh", lambda *args: None)
+    monkeypatch.setattr(get_agent_service(), "suggest_title", _fixed_title)
+    chat_id = client.post("/api/chats", json={}).json()["id"]
+    client.post(f"/api/chats/{chat_id}/messages", json={"content": "How is BTC?"})
+    active_at = client.get(f"/api/chats/{chat_id}").json()["updated_at"]
+
+    resp = client.post(f"/api/chats/{chat_id}/title")
+
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "BTC sentiment"
+    assert resp.json()["updated_at"] == active_at
+
+
+async def _fixed_title(history):
+    return "BTC sentiment"
+
+
+def test_metrics_expose_request_and_repository_latency(client):
+    chat_id = client.post("/api/chats", json={"title": "Metrics"}).json()["id"]
+    client.get(f"/api/chats/{chat_id}")
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert (
+        'market_mind_http_request_duration_seconds_count{method="GET",'
+        'route="/api/chats/{chat_id}",status="200"}'
+    ) in body
+    assert 'market_mind_repository_duration_seconds_count{method="create_session"}' in body
+    assert "market_mind_llm_calls_waiting 0.0" in body
+
+
+def test_ready_reports_warm_up_separately_from_health(client):
+    assert client.get("/health").status_code == 200
+
+    deadline = time.monotonic() + 5
+    while (resp := client.get("/ready")).status_code != 200:
+        assert resp.status_code == 503
+        assert resp.json()["status"] == "starting"
+        assert time.monotonic() < deadline, "agent never became ready"
+        time.sleep(0.01)
+    assert resp.json()["status"] == "ready"
+    assert resp.json()["warm_up_seconds"] >= 0
+    assert get_agent_service().memory_indexer.running
+
+
+async def test_failed_warm_up_is_reported_not_raised(monkeypatch):
+    def broken():
+        raise RuntimeError("OpenAI API key not configured.")
+
+    monkeypatch.setattr(main, "get_agent_service", broken)
+    app_stub = SimpleNamespace(state=SimpleNamespace())
+
+    await main.warm_up(app_stub)
+
+    assert app_stub.state.readiness.status == "failed"
+    assert app_stub.state.readiness.detail == "OpenAI API key not configured."
+
+
+def test_importing_the_app_does_not_build_the_agent():
+    # A fresh interpreter without an API key: the import must neither fail nor
+    # construct the agent.
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    env["FAKE_SERVICES"] = "false"
+    code = (
+        "import app.main\n"
+        "from app.services import agent_service_built\n"
+        "assert not agent_service_built()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_answered_turn_costs_a_few_statements(client, monkeypatch):
+    monkeypatch.setattr(chats_routes, "_schedule_summary_refresh", lambda *args: None)
+    monkeypatch.setattr(chats_routes, "_schedule_title_refresh", lambda *args: None)
+    chat_id = client.post("/api/chats", json={}).json()["id"]
+    client.post(f"/api/chats/{chat_id}/messages", json={"content": "How is BTC?"})
+
+    round_trips: list[str] = []
+    sync_engine = db_session.async_engine.sync_engine
+    listeners = {
+        "before_cursor_execute": lambda conn, cursor, statement, *args: round_trips.append(
+            statement.split()[0].upper()
+        ),
+        "commit": lambda conn: round_trips.append("COMMIT"),
+        "rollback": lambda conn: round_trips.append("ROLLBACK"),
+    }
+    for name, listener in listeners.items():
+        event.listen(sync_engine, name, listener)
+    try:
+        resp = client.post(f"/api/chats/{chat_id}/messages", json={"content": "And ETH?"})
+    finally:
+        for name, listener in listeners.items():
+            event.remove(sync_engine, name, listener)
+
+    assert resp.status_code == 200
+    # Storing each message on its own took ten round-trips: SELECT chat, SELECT
+    # history, then INSERT, UPDATE, COMMIT and a refreshing SELECT per message.
+    # Now the reads end before the LLM call, and the answered turn is written with
+    # one INSERT of its context blobs, one INSERT ... RETURNING of both messages
+    # and one UPDATE in a single transaction.
+    assert round_trips == [
+        "SELECT", "SELECT", "ROLLBACK", "INSERT", "INSERT", "UPDATE", "COMMIT"
+    ]
+    assert resp.json()["message"]["content"] == "And ETH?"
+
+    detail = client.get(f"/api/chats/{chat_id}").json()
+    assert [message["content"] for message in detail["messages"]][-2:] == [
+        "And ETH?",
+        resp.json()["ai_response"]["content"],
+    ]
+
+
+def test_assistant_context_is_stored_once_and_returned_on_request(client, monkeypatch):
+    agent = get_agent_service()
+    sources = [{"title": "BTC rallies", "link": "https://example.com/btc"}] * 20
+
+    async def answer(*, chat_id, user_id, history, prompt):
+        return AgentResponse(answer="BTC is up.", search_results=sources, vector_context="None")
+
+    monkeypatch.setattr(agent, "generate_response", answer)
+    monkeypatch.setattr(agent, "persist_memory", lambda *args, **kwargs: asyncio.sleep(0))
+    monkeypatch.setattr(chats_routes, "_schedule_summary_refresh", lambda *args: None)
+    monkeypatch.setattr(chats_routes, "_schedule_title_refresh", lambda *args: None)
+    chat_id = client.post("/api/chats", json={}).json()["id"]
+
+    plain = client.post(f"/api/chats/{chat_id}/messages", json={"content": "How is BTC?"})
+    expanded = client.post(
+        f"/api/chats/{chat_id}/messages",
+        params={"expand": "search_results"},
+        json={"content": "And now?"},
+    )
+
+    assert plain.json()["ai_response"]["metadata"] == {"answer_cache": {"hit": False}}
+    assert expanded.json()["ai_response"]["metadata"]["search_results"] == sources
+    # Both answers share their search results and empty vector context.
+    with db_session.SessionLocal() as db:
+        blobs = db.scalars(select(ContextBlob)).all()
+    assert len(blobs) == 2
+    assert {blob.encoding for blob in blobs} == {"zlib", "json"}
+
+    messages = client.get(f"/api/chats/{chat_id}").json()["messages"]
+    assert all("search_results" not in (m["metadata"] or {}) for m in messages)
+    detail = client.get(
+        f"/api/chats/{chat_id}", params=[("expand", "search_results"), ("expand", "vector_context")]
+    ).json()
+    answers = [m["metadata"] for m in detail["messages"] if m["role"] == "assistant"]
+    assert [a["search_results"] for a in answers] == [sources, sources]
+    assert [a["vector_context"] for a in answers] == ["None", "None"]
+    page = client.get(
+        f"/api/chats/{chat_id}/messages", params={"expand": "vector_context"}
+    ).json()
+    assert [(m["metadata"] or {}).get("vector_context") for m in page["items"]] == [
+        None, "None", None, "None"
+    ]
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.services.search_cache import SearchCache
+
+
+async def test_search_cache_hits_on_normalized_query():
+    cache = SearchCache(ttl_seconds=60, max_entries=10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return ["BTC - up 2%"]
+
+    first = await cache.get_or_fetch("BTC price", "wt-wt", fetch)
+    second = await cache.get_or_fetch("  btc   PRICE ", "wt-wt", fetch)
+
+    assert first == second == ["BTC - up 2%"]
+    assert calls == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+async def test_search_cache_keys_on_region():
+    cache = SearchCache(ttl_seconds=60, max_entries=10)
+
+    async def fetch():
+        return ["result"]
+
+    await cache.get_or_fetch("BTC price", "wt-wt", fetch)
+    await cache.get_or_fetch("BTC price", "us-en", fetch)
+
+    assert cache.stats().misses == 2
+
+
+async def test_search_cache_coalesces_concurrent_lookups():
+    cache = SearchCache(ttl_seconds=60, max_entries=10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return ["ETH - flat"]
+
+    results = await asyncio.gather(
+        *(cache.get_or_fetch("ETH price", "wt-wt", fetch) for _ in range(5))
+    )
+
+    assert calls == 1
+    assert all(result == ["ETH - flat"] for result in results)
+    assert cache.stats().coalesced == 4
+
+
+async def test_search_cache_does_not_store_failures():
+    cache = SearchCache(ttl_seconds=60, max_entries=10)
+
+    async def failing_fetch():
+        raise RuntimeError("upstream throttled")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("SOL price", "wt-wt", failing_fetch)
+
+    async def fetch():
+        return ["SOL - down 1%"]
+
+    assert await cache.get_or_fetch("SOL price", "wt-wt", fetch) == ["SOL - down 1%"]
+
+
+async def test_search_cache_evicts_least_recently_used():
+    cache = SearchCache(ttl_seconds=60, max_entries=2)
+
+    async def fetch():
+        return ["result"]
+
+    await cache.get_or_fetch("a", "wt-wt", fetch)
+    await cache.get_or_fetch("b", "wt-wt", fetch)
+    await cache.get_or_fetch("a", "wt-wt", fetch)
+    await cache.get_or_fetch("c", "wt-wt", fetch)
+    await cache.get_or_fetch("a", "wt-wt", fetch)
+
+    stats = cache.stats()
+    assert stats.size == 2
+    assert stats.hits == 2
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_limiter import LLMOverloadedError
+from app.services.title_scheduler import TitleScheduler, should_refresh_title
+
+
+async def _wait_until(predicate, timeout: float = 1.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.parametrize(
+    ("message_count", "expected"),
+    [(1, False), (2, True), (4, False), (10, True), (20, True), (21, False)],
+)
+def test_titles_refresh_after_first_exchange_and_every_n_messages(message_count, expected):
+    assert should_refresh_title(message_count, every=10) is expected
+
+
+@pytest.mark.parametrize(
+    ("message_count", "expected"),
+    [(4, False), (6, True), (8, False), (10, True), (12, False), (14, False), (16, True)],
+)
+def test_odd_intervals_refresh_on_the_turn_that_crosses_them(message_count, expected):
+    assert should_refresh_title(message_count, every=5) is expected
+
+
+def test_periodic_refresh_can_be_disabled():
+    assert should_refresh_title(2, every=0)
+    assert not should_refresh_title(10, every=0)
+
+
+async def test_rapid_triggers_for_a_chat_generate_one_title():
+    generated: list[str] = []
+
+    async def generate(chat_id: str) -> None:
+        generated.append(chat_id)
+
+    scheduler = TitleScheduler(generate, debounce_seconds=0.02)
+    for _ in range(3):
+        scheduler.schedule("chat-1")
+    scheduler.schedule("chat-2")
+
+    await _wait_until(lambda: scheduler.pending == 0)
+
+    assert sorted(generated) == ["chat-1", "chat-2"]
+    stats = scheduler.stats()
+    assert stats.debounced == 2
+    assert stats.generated == 2
+
+
+async def test_generation_waits_while_llm_is_busy():
+    generated: list[str] = []
+    busy = True
+
+    async def generate(chat_id: str) -> None:
+        generated.append(chat_id)
+
+    scheduler = TitleScheduler(generate, debounce_seconds=0.01, is_busy=lambda: busy)
+    scheduler.schedule("chat-1")
+
+    await _wait_until(lambda: scheduler.deferred >= 2)
+    assert generated == []
+
+    busy = False
+    await _wait_until(lambda: scheduler.pending == 0)
+    assert generated == ["chat-1"]
+
+
+async def test_overloaded_llm_postpones_the_title():
+    async def generate(chat_id: str) -> None:
+        raise LLMOverloadedError(retry_after=1)
+
+    scheduler = TitleScheduler(generate, debounce_seconds=0)
+    scheduler.schedule("chat-1")
+
+    await _wait_until(lambda: scheduler.pending == 0)
+    assert scheduler.stats().deferred == 1
+    assert scheduler.stats().failed == 0
+
+
+async def test_stop_cancels_pending_titles():
+    generated: list[str] = []
+
+    async def generate(chat_id: str) -> None:
+        generated.append(chat_id)
+
+    scheduler = TitleScheduler(generate, debounce_seconds=10)
+    scheduler.schedule("chat-1")
+
+    await scheduler.stop()
+
+    assert scheduler.pending == 0
+    assert generated == []
@@ -0,0 +1,167 @@
+import string
+import time
+from uuid import uuid4
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+from app.scripts.compact_memory import compact_memory
+from app.services.vector_memory import VectorMemory, memory_id
+
+
+class LetterEmbeddings(Embeddings):
+    """Letter counts: texts differing by a word or two embed close together."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        lowered = text.lower()
+        return [float(lowered.count(letter)) + 0.01 for letter in string.ascii_lowercase]
+
+
+def _metadata(chat_id="chat-1", role="user"):
+    return {"chat_id": chat_id, "role": role, "user_id": chat_id}
+
+
+@pytest.fixture()
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+
+
+@pytest.fixture()
+def store(client):
+    return Chroma(
+        client=client,
+        collection_name=f"memory-{uuid4().hex[:8]}",
+        embedding_function=LetterEmbeddings(),
+    )
+
+
+async def test_exact_duplicates_are_stored_once_and_refreshed(store):
+    memory = VectorMemory(store, store.embeddings)
+
+    await memory.write(
+        ["What moved BTC today?", "What moved  BTC today?"], [_metadata(), _metadata()]
+    )
+    first = store.get(include=["metadatas"])["metadatas"][0]["created_at"]
+    await memory.write(["What moved BTC today?"], [_metadata()])
+    await memory.write(["What moved BTC today?"], [_metadata(chat_id="chat-2")])
+
+    stored = store.get(include=["metadatas"])
+    assert len(stored["ids"]) == 2
+    refreshed = {metadata["chat_id"]: metadata["created_at"] for metadata in stored["metadatas"]}
+    assert refreshed["chat-1"] > first
+    stats = memory.stats()
+    assert (stats.documents, stats.written, stats.duplicates) == (2, 2, 2)
+
+
+async def test_near_duplicates_are_skipped_within_a_chat_and_role(store):
+    memory = VectorMemory(store, store.embeddings, near_duplicate_threshold=0.97)
+    await memory.write(["BTC is up 3% on ETF inflows."], [_metadata()])
+
+    await memory.write(
+        [
+            "BTC is up 3% on ETF inflows!",
+            "How did the S&P 500 close?",
+            "BTC is up 3% on ETF inflows!",
+        ],
+        [_metadata(), _metadata(), _metadata(role="assistant")],
+    )
+
+    documents = sorted(store.get()["documents"])
+    assert documents == [
+        "BTC is up 3% on ETF inflows!",
+        "BTC is up 3% on ETF inflows.",
+        "How did the S&P 500 close?",
+    ]
+    assert memory.stats().near_duplicates == 1
+
+
+async def test_expired_memories_are_not_retrieved_and_are_pruned(store):
+    memory = VectorMemory(store, store.embeddings, ttl_seconds=60)
+    await memory.write(["ETH staking yields"], [_metadata()])
+    store._collection.update(
+        ids=store.get()["ids"], metadatas=[{"created_at": time.time() - 61}]
+    )
+    await memory.write(["ETH gas fees"], [_metadata()])
+
+    where = memory.retrieval_filter({"chat_id": "chat-1"})
+    found = await store.asimilarity_search("ETH", k=4, filter=where)
+
+    assert [doc.page_content for doc in found] == ["ETH gas fees"]
+    assert memory.prune() == 1
+    assert store.get()["documents"] == ["ETH gas fees"]
+
+
+async def test_compaction_rewrites_the_collection_without_stale_or_repeated_documents(client):
+    now = time.time()
+    old = client.create_collection("market-mind", configuration={"hnsw": {"space": "cosine"}})
+    embed = LetterEmbeddings().embed_query
+    rows = [
+        # Legacy random IDs: an exact repeat, a near repeat, an expired and an
+        # untimestamped message.
+        ("a", "BTC is up 3% on ETF inflows.", _metadata(), now - 30),
+        ("b", "BTC is up 3% on ETF inflows.", _metadata(), now - 20),
+        ("c", "BTC is up 3% on ETF inflows!", _metadata(), now - 10),
+        ("d", "Old ETH thread", _metadata(chat_id="chat-2"), now - 7200),
+        ("e", "How did the S&P 500 close?", _metadata(), None),
+    ]
+    old.add(
+        ids=[row[0] for row in rows],
+        documents=[row[1] for row in rows],
+        embeddings=[embed(row[1]) for row in rows],
+        metadatas=[
+            {**row[2], "created_at": row[3]} if row[3] else row[2] for row in rows
+        ],
+    )
+
+    dry = compact_memory(client, ttl_seconds=3600, near_duplicate_threshold=0.97, dry_run=True)
+    assert client.get_collection("market-mind").count() == 5
+
+    result = compact_memory(client, ttl_seconds=3600, near_duplicate_threshold=0.97)
+
+    assert (dry.scanned, dry.expired, dry.duplicates, dry.near_duplicates, dry.kept) == (
+        5, 1, 1, 1, 2
+    )
+    assert (result.kept, result.backfilled, result.rewritten) == (2, 1, True)
+    assert [c.name for c in client.list_collections()] == ["market-mind"]
+    compacted = client.get_collection("market-mind")
+    assert compacted.configuration["hnsw"]["space"] == "cosine"
+    stored = compacted.get(include=["documents", "metadatas"])
+    by_text = dict(zip(stored["documents"], zip(stored["ids"], stored["metadatas"])))
+    assert sorted(by_text) == ["BTC is up 3% on ETF inflows!", "How did the S&P 500 close?"]
+    doc_id, metadata = by_text["BTC is up 3% on ETF inflows!"]
+    assert doc_id == memory_id("BTC is up 3% on ETF inflows!", metadata)
+    assert by_text["How did the S&P 500 close?"][1]["created_at"] >= now
+
+    # The rewritten collection is usable as vector memory again.
+    memory = VectorMemory(
+        Chroma(client=client, collection_name="market-mind", embedding_function=LetterEmbeddings()),
+        LetterEmbeddings(),
+    )
+    await memory.write(["BTC is up 3% on ETF inflows!"], [_metadata()])
+    assert (compacted.count(), memory.stats().duplicates) == (2, 1)
+
+
+def test_in_place_compaction_only_deletes_and_backfills(client):
+    collection = client.create_collection("market-mind")
+    collection.add(
+        ids=["a", "b", "c"],
+        documents=["BTC news", "BTC news", "ETH news"],
+        embeddings=[[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]],
+        metadatas=[
+            {**_metadata(), "created_at": 1.0},
+            {**_metadata(), "created_at": 2.0},
+            _metadata(),
+        ],
+    )
+
+    result = compact_memory(client, in_place=True)
+
+    assert (result.duplicates, result.backfilled, result.rewritten) == (1, 1, False)
+    stored = client.get_collection("market-mind").get(include=["metadatas"])
+    assert sorted(stored["ids"]) == ["b", "c"]
+    assert all("created_at" in metadata for metadata in stored["metadatas"])
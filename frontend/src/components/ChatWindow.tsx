@@ -45,10 +45,11 @@ const markdownComponents: Components = {
 };
 
 export function ChatWindow() {
-  const { activeChatId, chats, sendMessage, deleteChat, loading, error } = useChatStore((state) => ({
+  const { activeChatId, chats, sendMessage, deleteChat, loadOlderMessages, loading, error } = useChatStore((state) => ({
     activeChatId: state.activeChatId,
     chats: state.chats,
     sendMessage: state.sendMessage,
+    loadOlderMessages: state.loadOlderMessages,
     deleteChat: state.deleteChat,
     loading: state.loading,
     error: state.error
@@ -58,10 +59,12 @@ export function ChatWindow() {
   const messagesEndRef = useRef<HTMLDivElement | null>(null);
   const activeChat = activeChatId ? chats[activeChatId] : null;
   const conversation = activeChat?.messages ?? [];
+  const lastMessageId = conversation[conversation.length - 1]?.id;
 
+  // Follow new messages, but stay put when earlier ones are loaded above.
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
-  }, [conversation.length, activeChatId]);
+  }, [lastMessageId, activeChatId]);
 
   const handleSuggestionSelect = (prompt: string) => {
     setMessage(prompt);
@@ -197,7 +200,20 @@ export function ChatWindow() {
             </div>
           </>
         ) : (
-          conversation.map(renderMessage)
+          <>
+            {activeChat?.older_messages_cursor ? (
+              <div className="mb-6 flex justify-center">
+                <button
+                  type="button"
+                  onClick={() => loadOlderMessages(activeChatId)}
+                  className="rounded-md px-3 py-1 text-xs font-medium text-slate-500 transition hover:bg-slate-200 dark:text-slate-400 dark:hover:bg-slate-800"
+                >
+                  Load earlier messages
+                </button>
+              </div>
+            ) : null}
+            {conversation.map(renderMessage)}
+          </>
         )}
         <div ref={messagesEndRef} />
       </div>
@@ -8,14 +8,27 @@ interface SidebarProps {
 }
 
 export function Sidebar({ className = "" }: SidebarProps) {
-  const { chatOrder, chats, activeChatId, createChat, selectChat, deleteChat, loading, error } = useChatStore(
+  const {
+    chatOrder,
+    chats,
+    chatsCursor,
+    activeChatId,
+    createChat,
+    selectChat,
+    deleteChat,
+    loadMoreChats,
+    loading,
+    error
+  } = useChatStore(
     (state) => ({
       chatOrder: state.chatOrder,
       chats: state.chats,
+      chatsCursor: state.chatsCursor,
       activeChatId: state.activeChatId,
       createChat: state.createChat,
       selectChat: state.selectChat,
       deleteChat: state.deleteChat,
+      loadMoreChats: state.loadMoreChats,
       loading: state.loading,
       error: state.error
     })
@@ -106,6 +119,16 @@ export function Sidebar({ className = "" }: SidebarProps) {
             </div>
           );
         })}
+        {chatsCursor ? (
+          <button
+            type="button"
+            onClick={() => loadMoreChats()}
+            disabled={loading}
+            className="w-full rounded-md px-3 py-2 text-left text-xs font-medium text-slate-500 transition hover:bg-slate-100 disabled:opacity-50 dark:text-slate-400 dark:hover:bg-slate-800"
+          >
+            Load more chats
+          </button>
+        ) : null}
       </nav>
     </aside>
   );
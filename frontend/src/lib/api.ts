@@ -1,5 +1,5 @@
 import axios from "axios";
-import type { ChatResponse, ChatSession } from "@/types/chat";
+import type { ChatResponse, ChatSession, ChatSessionPage, MessagePage } from "@/types/chat";
 import { getUserId } from "./user";
 
 const api = axios.create({
@@ -14,13 +14,22 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
-export async function fetchChats(): Promise<ChatSession[]> {
-  const { data } = await api.get<ChatSession[]>("/api/chats");
+export async function fetchChats(cursor?: string): Promise<ChatSessionPage> {
+  const { data } = await api.get<ChatSessionPage>("/api/chats", { params: { cursor } });
   return data;
 }
 
-export async function fetchChatById(chatId: string): Promise<ChatSession> {
-  const { data } = await api.get<ChatSession>(`/api/chats/${chatId}`);
+export async function fetchChatById(chatId: string, limit?: number): Promise<ChatSession> {
+  const { data } = await api.get<ChatSession>(`/api/chats/${chatId}`, {
+    params: { expand: "search_results", limit },
+  });
+  return data;
+}
+
+export async function fetchOlderMessages(chatId: string, cursor: string): Promise<MessagePage> {
+  const { data } = await api.get<MessagePage>(`/api/chats/${chatId}/messages`, {
+    params: { cursor, order: "desc", expand: "search_results" },
+  });
   return data;
 }
 
@@ -30,7 +39,11 @@ export async function createChat(title?: string): Promise<ChatSession> {
 }
 
 export async function sendMessage(chatId: string, content: string): Promise<ChatResponse> {
-  const { data } = await api.post<ChatResponse>(`/api/chats/${chatId}/messages`, { content });
+  const { data } = await api.post<ChatResponse>(
+    `/api/chats/${chatId}/messages`,
+    { content },
+    { params: { expand: "search_results" } }
+  );
   return data;
 }
 
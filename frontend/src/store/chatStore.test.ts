@@ -4,12 +4,14 @@ import { useChatStore } from "./chatStore";
 
 const mockFetchChats = vi.fn();
 const mockFetchChatById = vi.fn();
+const mockFetchOlderMessages = vi.fn();
 const mockCreateChat = vi.fn();
 const mockSendMessage = vi.fn();
 
 vi.mock("@/lib/api", () => ({
-  fetchChats: () => mockFetchChats(),
-  fetchChatById: (chatId: string) => mockFetchChatById(chatId),
+  fetchChats: (cursor?: string) => mockFetchChats(cursor),
+  fetchChatById: (chatId: string, limit?: number) => mockFetchChatById(chatId, limit),
+  fetchOlderMessages: (chatId: string, cursor: string) => mockFetchOlderMessages(chatId, cursor),
   createChat: (title?: string) => mockCreateChat(title),
   sendMessage: (chatId: string, content: string) => mockSendMessage(chatId, content)
 }));
@@ -19,6 +21,7 @@ describe("chat store", () => {
     useChatStore.setState({
       chats: {},
       chatOrder: [],
+      chatsCursor: null,
       activeChatId: null,
       loading: false,
       error: null,
@@ -26,32 +29,88 @@ describe("chat store", () => {
     });
     mockFetchChats.mockReset();
     mockFetchChatById.mockReset();
+    mockFetchOlderMessages.mockReset();
     mockCreateChat.mockReset();
     mockSendMessage.mockReset();
   });
 
   afterEach(() => {
     vi.clearAllMocks();
+    vi.useRealTimers();
   });
 
-  it("loads chats from the API", async () => {
-    mockFetchChats.mockResolvedValueOnce([
-      {
-        id: "1",
-        title: "USD Liquidity",
-        created_at: "2024-01-01T00:00:00Z",
-        updated_at: "2024-01-01T00:00:00Z",
-        messages: []
-      }
-    ]);
+  it("loads chats from the API one page at a time", async () => {
+    mockFetchChats
+      .mockResolvedValueOnce({
+        items: [
+          {
+            id: "1",
+            title: "USD Liquidity",
+            created_at: "2024-01-01T00:00:00Z",
+            updated_at: "2024-01-01T00:00:00Z"
+          }
+        ],
+        next_cursor: "page-2"
+      })
+      .mockResolvedValueOnce({
+        items: [
+          {
+            id: "0",
+            title: "Gold",
+            created_at: "2023-12-31T00:00:00Z",
+            updated_at: "2023-12-31T00:00:00Z"
+          }
+        ],
+        next_cursor: null
+      });
 
     await act(async () => {
       await useChatStore.getState().fetchChats();
     });
+    expect(useChatStore.getState().chatsCursor).toBe("page-2");
+
+    await act(async () => {
+      await useChatStore.getState().loadMoreChats();
+    });
 
     const state = useChatStore.getState();
-    expect(state.chatOrder).toEqual(["1"]);
+    expect(mockFetchChats).toHaveBeenLastCalledWith("page-2");
+    expect(state.chatOrder).toEqual(["1", "0"]);
     expect(state.chats["1"].title).toBe("USD Liquidity");
+    expect(state.chatsCursor).toBeNull();
+  });
+
+  it("prepends earlier messages from the chat's cursor", async () => {
+    useChatStore.setState({
+      chats: {
+        "4": {
+          id: "4",
+          title: "Oil",
+          created_at: "2024-01-01T00:00:00Z",
+          updated_at: "2024-01-01T00:00:00Z",
+          messages: [{ id: "m3", role: "user", content: "third", created_at: "2024-01-01T00:00:03Z" }],
+          older_messages_cursor: "older"
+        }
+      },
+      chatOrder: ["4"],
+      activeChatId: "4"
+    });
+    mockFetchOlderMessages.mockResolvedValueOnce({
+      items: [
+        { id: "m2", role: "assistant", content: "second", created_at: "2024-01-01T00:00:02Z" },
+        { id: "m1", role: "user", content: "first", created_at: "2024-01-01T00:00:01Z" }
+      ],
+      next_cursor: null
+    });
+
+    await act(async () => {
+      await useChatStore.getState().loadOlderMessages("4");
+    });
+
+    const chat = useChatStore.getState().chats["4"];
+    expect(mockFetchOlderMessages).toHaveBeenCalledWith("4", "older");
+    expect(chat.messages?.map((message) => message.id)).toEqual(["m1", "m2", "m3"]);
+    expect(chat.older_messages_cursor).toBeNull();
   });
 
   it("creates a chat and sets it active", async () => {
@@ -79,7 +138,8 @@ describe("chat store", () => {
     expect(state.chats["2"]).toBeDefined();
   });
 
-  it("appends messages when sending", async () => {
+  it("appends messages when sending and picks up the background title later", async () => {
+    vi.useFakeTimers();
     useChatStore.setState({
       chats: {
         "3": {
@@ -91,6 +151,7 @@ describe("chat store", () => {
         }
       },
       chatOrder: ["3"],
+      chatsCursor: null,
       activeChatId: "3",
       loading: false,
       error: null,
@@ -111,12 +172,31 @@ describe("chat store", () => {
       }
     });
 
+    mockFetchChatById.mockResolvedValueOnce({
+      id: "3",
+      title: "Rate outlook",
+      created_at: "2024-01-01T00:00:00Z",
+      updated_at: "2024-01-01T00:00:00Z",
+      messages: []
+    });
+
     await act(async () => {
       await useChatStore.getState().sendMessage("Hi");
     });
 
-    const state = useChatStore.getState();
+    let state = useChatStore.getState();
     expect(state.chats["3"].messages?.length).toBe(2);
+    expect(state.chats["3"].title).toBe("Rates");
     expect(mockSendMessage).toHaveBeenCalledWith("3", "Hi");
+    expect(mockFetchChats).not.toHaveBeenCalled();
+
+    await act(async () => {
+      await vi.advanceTimersByTimeAsync(8000);
+    });
+
+    state = useChatStore.getState();
+    expect(mockFetchChatById).toHaveBeenCalledWith("3", 1);
+    expect(state.chats["3"].title).toBe("Rate outlook");
+    expect(state.chats["3"].messages?.length).toBe(2);
   });
 });
@@ -2,6 +2,7 @@ import { create } from "zustand";
 import {
   fetchChatById,
   fetchChats,
+  fetchOlderMessages,
   createChat as createChatApi,
   sendMessage as sendMessageApi,
   deleteChat as deleteChatApi,
@@ -11,14 +12,22 @@ import type { ChatSession, ChatResponse } from "@/types/chat";
 
 type ThemeMode = "light" | "dark";
 
+// Titles are generated in the background once a chat has been quiet for the
+// backend's TITLE_DEBOUNCE_SECONDS (5s by default); look for one a little later.
+const TITLE_CHECK_DELAY_MS = 8000;
+const titleChecks = new Map<string, ReturnType<typeof setTimeout>>();
+
 interface ChatState {
   chats: Record<string, ChatSession>;
   chatOrder: string[];
+  chatsCursor: string | null;
   activeChatId: string | null;
   loading: boolean;
   error: string | null;
   theme: ThemeMode;
   fetchChats: () => Promise<void>;
+  loadMoreChats: () => Promise<void>;
+  loadOlderMessages: (chatId: string) => Promise<void>;
   createChat: (title?: string) => Promise<void>;
   selectChat: (chatId: string) => Promise<void>;
   sendMessage: (content: string) => Promise<ChatResponse | null>;
@@ -44,6 +53,7 @@ function applyTheme(theme: ThemeMode) {
 export const useChatStore = create<ChatState>((set, get) => ({
   chats: {},
   chatOrder: [],
+  chatsCursor: null,
   activeChatId: null,
   loading: false,
   error: null,
@@ -52,13 +62,14 @@ export const useChatStore = create<ChatState>((set, get) => ({
   fetchChats: async () => {
     set({ loading: true, error: null });
     try {
-      const chats = await fetchChats();
+      const page = await fetchChats();
       set({
-        chats: chats.reduce<Record<string, ChatSession>>((acc, chat) => {
+        chats: page.items.reduce<Record<string, ChatSession>>((acc, chat) => {
           acc[chat.id] = { ...chat, messages: chat.messages ?? [] };
           return acc;
         }, {}),
-        chatOrder: chats.map((chat) => chat.id),
+        chatOrder: page.items.map((chat) => chat.id),
+        chatsCursor: page.next_cursor,
         loading: false
       });
     } catch (error) {
@@ -66,6 +77,52 @@ export const useChatStore = create<ChatState>((set, get) => ({
     }
   },
 
+  loadMoreChats: async () => {
+    const cursor = get().chatsCursor;
+    if (!cursor) return;
+    try {
+      const page = await fetchChats(cursor);
+      set((state) => ({
+        chats: page.items.reduce<Record<string, ChatSession>>(
+          (acc, chat) => {
+            acc[chat.id] = acc[chat.id] ?? { ...chat, messages: [] };
+            return acc;
+          },
+          { ...state.chats }
+        ),
+        chatOrder: [
+          ...state.chatOrder,
+          ...page.items.map((chat) => chat.id).filter((id) => !state.chatOrder.includes(id))
+        ],
+        chatsCursor: page.next_cursor
+      }));
+    } catch (error) {
+      set({ error: "Unable to fetch chats. Please try again." });
+    }
+  },
+
+  loadOlderMessages: async (chatId: string) => {
+    const cursor = get().chats[chatId]?.older_messages_cursor;
+    if (!cursor) return;
+    try {
+      const page = await fetchOlderMessages(chatId, cursor);
+      // Pages come newest first; the conversation is kept oldest first.
+      const older = [...page.items].reverse();
+      set((state) => ({
+        chats: {
+          ...state.chats,
+          [chatId]: {
+            ...state.chats[chatId],
+            messages: [...older, ...(state.chats[chatId]?.messages ?? [])],
+            older_messages_cursor: page.next_cursor
+          }
+        }
+      }));
+    } catch (error) {
+      set({ error: "Unable to load conversation history." });
+    }
+  },
+
   createChat: async (title?: string) => {
     set({ loading: true, error: null });
     try {
@@ -176,21 +233,24 @@ export const useChatStore = create<ChatState>((set, get) => ({
           loading: false
         };
       });
-      try {
-        const updated = await refreshChatTitleApi(chatId);
-        set((state) => ({
-          chats: {
-            ...state.chats,
-            [chatId]: {
-              ...state.chats[chatId],
-              title: updated.title,
-              updated_at: updated.updated_at
-            }
+      // Each message restarts the backend's debounce, so only the last check runs.
+      clearTimeout(titleChecks.get(chatId));
+      titleChecks.set(
+        chatId,
+        setTimeout(async () => {
+          titleChecks.delete(chatId);
+          try {
+            const latest = await fetchChatById(chatId, 1);
+            set((state) =>
+              state.chats[chatId]
+                ? { chats: { ...state.chats, [chatId]: { ...state.chats[chatId], title: latest.title } } }
+                : {}
+            );
+          } catch (_error) {
+            // Non-critical failure: keep the current title.
           }
-        }));
-      } catch (_error) {
-        // Non-critical failure: keep existing title if refresh fails.
-      }
+        }, TITLE_CHECK_DELAY_MS)
+      );
       return response;
     } catch (error) {
       set({ error: "Failed to send message. Please try again.", loading: false });
@@ -14,6 +14,17 @@ export interface ChatSession {
   created_at: string;
   updated_at: string;
   messages?: Message[];
+  older_messages_cursor?: string | null;
+}
+
+export interface ChatSessionPage {
+  items: ChatSession[];
+  next_cursor: string | null;
+}
+
+export interface MessagePage {
+  items: Message[];
+  next_cursor: string | null;
 }
 
 export interface ChatResponse {